@@ -1,10 +1,27 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Player, Team, TournamentConfig, TournamentSettings, AuctionAction, Jersey, ExtraJerseyMember, AuctionState, Match
+from .services.event_service import EventService
+
+
+class PublishOnSaveMixin:
+    """Admin edits bypass the services, so tell open public pages to reload."""
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        EventService().publish("ADMIN", reload=True)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        EventService().publish("ADMIN", reload=True)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        EventService().publish("ADMIN", reload=True)
 
 
 @admin.register(Player)
-class PlayerAdmin(admin.ModelAdmin):
+class PlayerAdmin(PublishOnSaveMixin, admin.ModelAdmin):
     list_display       = ("serial_number", "name", "role", "place", "status_badge", "team", "sold_price", "rebid_count")
     list_display_links = ("name",)
     list_filter        = ("role", "status", "team")
@@ -12,7 +29,7 @@ class PlayerAdmin(admin.ModelAdmin):
     ordering           = ("serial_number",)
     readonly_fields    = ("serial_number", "rebid_count")
     fieldsets = (
-        ("Player Info", {"fields": ("serial_number", "name", "role", "place", "phone", "photo", "notes")}),
+        ("Player Info", {"fields": ("serial_number", "name", "role", "place", "phone", "photo", "notes", "preferred_jersey_number")}),
         ("Auction",     {"fields": ("base_price", "sold_price", "team", "status", "rebid_count")}),
     )
 
@@ -32,38 +49,41 @@ class PlayerAdmin(admin.ModelAdmin):
 
 
 @admin.register(Team)
-class TeamAdmin(admin.ModelAdmin):
+class TeamAdmin(PublishOnSaveMixin, admin.ModelAdmin):
     list_display       = ("team_serial_number", "name", "short_name", "owners", "remaining_points")
     list_display_links = ("name",)
     ordering           = ("team_serial_number",)
+    # Kept up to date with F() updates by Player.save(); an editable copy
+    # would write back the values the form loaded over a concurrent sale
+    readonly_fields    = ("squad_size", "sold_ar", "sold_bat", "sold_bowl", "sold_ply", "version")
 
 
 @admin.register(TournamentConfig)
-class TournamentConfigAdmin(admin.ModelAdmin):
+class TournamentConfigAdmin(PublishOnSaveMixin, admin.ModelAdmin):
     list_display = ("id", "total_points", "bidding_slots", "max_squad_size", "created_at")
 
 
 @admin.register(AuctionAction)
 class AuctionActionAdmin(admin.ModelAdmin):
-    list_display = ("timestamp", "player", "action", "team", "amount", "category", "round")
+    list_display = ("timestamp", "player", "action", "team", "amount", "category", "round", "reverted_by")
     list_filter  = ("action", "category")
     ordering     = ("-timestamp",)
 
 
 @admin.register(AuctionState)
-class AuctionStateAdmin(admin.ModelAdmin):
+class AuctionStateAdmin(PublishOnSaveMixin, admin.ModelAdmin):
     list_display = ("id", "phase", "current_category", "category_pass", "auction_round",
                     "is_active", "awaiting_transition", "current_player", "updated_at")
 
 
 @admin.register(Jersey)
-class JerseyAdmin(admin.ModelAdmin):
-    list_display = ("player", "jersey_name", "jersey_number", "size_text", "sponsor")
+class JerseyAdmin(PublishOnSaveMixin, admin.ModelAdmin):
+    list_display = ("player", "team", "jersey_name", "jersey_number", "size_text", "sponsor")
     ordering     = ("jersey_number",)
 
 
 @admin.register(TournamentSettings)
-class TournamentSettingsAdmin(admin.ModelAdmin):
+class TournamentSettingsAdmin(PublishOnSaveMixin, admin.ModelAdmin):
     list_display = ("tournament_name", "auction_date", "match_date", "banner_path")
     fieldsets = (
         (None, {"fields": ("tournament_name", "auction_date", "match_date", "banner_path")}),
@@ -71,7 +91,7 @@ class TournamentSettingsAdmin(admin.ModelAdmin):
 
 
 @admin.register(ExtraJerseyMember)
-class ExtraJerseyMemberAdmin(admin.ModelAdmin):
+class ExtraJerseyMemberAdmin(PublishOnSaveMixin, admin.ModelAdmin):
     list_display  = ("name", "role_label", "member_type", "team", "group_name", "jersey_name", "jersey_number")
     list_filter   = ("member_type", "team")
     search_fields = ("name", "role_label", "group_name")
@@ -79,7 +99,7 @@ class ExtraJerseyMemberAdmin(admin.ModelAdmin):
 
 
 @admin.register(Match)
-class MatchAdmin(admin.ModelAdmin):
+class MatchAdmin(PublishOnSaveMixin, admin.ModelAdmin):
     list_display  = ("match_number", "round_label", "team1", "team2", "winner", "status", "scheduled_date", "venue")
     list_filter   = ("status", "round_label")
     ordering      = ("match_number",)
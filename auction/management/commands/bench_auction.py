@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.simulation import AuctionSimulator
+
+RESULTS_DIR = os.path.join(settings.BASE_DIR, "benchmarks", "results")
+
+
+class Command(BaseCommand):
+
+    help = ("Simulate a full auction day on a throwaway test database and report per-operation "
+            "latency percentiles and query counts; results are saved as JSON for comparison.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teams",   type=int, default=16)
+        parser.add_argument("--players", type=int, default=200)
+        parser.add_argument("--seed",    type=int, default=1)
+        parser.add_argument("--output",  help="JSON file to write (default benchmarks/results/<commit>-<time>.json)")
+        parser.add_argument("--compare", help="Earlier results JSON to diff against")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Can't read {options['compare']}: {e}")
+
+        # Never touch the real database: run inside a fresh test DB
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = AuctionSimulator(options["teams"], options["players"], options["seed"]).run()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        results["commit"]   = self.git_commit()
+        results["database"] = connection.vendor
+        results["run_at"]   = datetime.now().isoformat(timespec="seconds")
+
+        path = options["output"] or os.path.join(
+            RESULTS_DIR, f"{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+        self.print_table(results, baseline)
+        self.stdout.write(self.style.SUCCESS(f"Saved {path}"))
+
+    def print_table(self, results, baseline):
+        before = (baseline or {}).get("ops", {})
+        self.stdout.write(f"{'op':<12}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+                          + ("   p95 vs baseline" if baseline else ""))
+        for op, row in results["ops"].items():
+            line = (f"{op:<12}{row['count']:>7}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+                    f"{row['p99_ms']:>10.2f}{row['queries_mean']:>9.1f}")
+            if op in before and before[op]["p95_ms"]:
+                change = (row["p95_ms"] - before[op]["p95_ms"]) / before[op]["p95_ms"] * 100
+                line  += f"   {change:+.0f}% (queries {before[op]['queries_mean']:.1f})"
+            self.stdout.write(line)
+        self.stdout.write(f"Outcome: {results['outcome']}")
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
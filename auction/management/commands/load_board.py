@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+from auction.services.auction_engine import AuctionEngine
+from benchmarks.board_load import BoardLoadTest, QueryCounter, MODE_STREAM, MODE_POLL
+from benchmarks.simulation import AuctionSimulator
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledWSGIServer(ThreadedWSGIServer):
+
+    """
+    Fixed pool of request threads, like gunicorn's gthread worker: once
+    every thread is busy (e.g. holding a board stream) new requests queue.
+    """
+
+    def __init__(self, *args, threads=64, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="load-server")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        # Streams notice the closed socket on their next heartbeat
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class Command(BaseCommand):
+
+    help = ("Load-test the public board: K spectators holding the board stream open (or reloading "
+            "the board) while one auctioneer sells. Without --url a server with a fixed thread pool "
+            "is started on a throwaway seeded database and DB queries are counted too.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spectators",    type=int,   default=300)
+        parser.add_argument("--duration",      type=float, default=30, help="Seconds")
+        parser.add_argument("--mode", choices=[MODE_STREAM, MODE_POLL], default=MODE_STREAM,
+                            help="stream: hold /board/stream/ open like a browser; poll: reload the board")
+        parser.add_argument("--baseline",      type=float, default=5, help="Seconds the auctioneer runs alone first")
+        parser.add_argument("--interval",      type=float, default=1.0,
+                            help="Seconds between board reloads (poll mode, and stream fallback)")
+        parser.add_argument("--sell-interval", type=float, default=0.5, help="Seconds between auctioneer actions")
+        parser.add_argument("--no-etag", action="store_true", help="Spectators never send If-None-Match")
+        parser.add_argument("--teams",   type=int, default=16)
+        parser.add_argument("--players", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=64, help="Local server request threads (gunicorn --threads)")
+        parser.add_argument("--url",       help="Hit this running server instead (e.g. a local gunicorn)")
+        parser.add_argument("--sessionid", default="", help="Logged-in session cookie for --url")
+        parser.add_argument("--output",    help="Write the results as JSON")
+
+    def handle(self, *args, **options):
+        load = dict(
+            spectators=options["spectators"], duration=options["duration"], interval=options["interval"],
+            sell_interval=options["sell_interval"], etag=not options["no_etag"],
+            mode=options["mode"], baseline=options["baseline"],
+        )
+        if options["url"]:
+            results = BoardLoadTest(options["url"], sessionid=options["sessionid"], **load).run()
+        else:
+            results = self.run_local(options, load)
+
+        self.print_report(results)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Saved {options['output']}"))
+
+    # ─────────────────────────────────────────────
+    # LOCAL SERVER ON A THROWAWAY DATABASE
+    # ─────────────────────────────────────────────
+
+    def run_local(self, options, load):
+        db       = settings.DATABASES["default"]
+        old_name = db["NAME"]
+        tmp      = None
+        if connection.vendor == "sqlite":
+            # Server threads need a shared file, not a private in-memory DB
+            tmp = tempfile.mkdtemp()
+            db.setdefault("TEST", {})["NAME"] = os.path.join(tmp, "load.sqlite3")
+        db["CONN_MAX_AGE"] = 0   # one connection per request, closed when it ends
+
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        counter = QueryCounter()
+        server  = None
+        try:
+            AuctionSimulator(options["teams"], options["players"]).seed_data()
+            AuctionEngine().activate_auction()
+            client = Client()
+            client.force_login(User.objects.create_superuser("loadtest", "", None))
+            sessionid = client.cookies[settings.SESSION_COOKIE_NAME].value
+            connections.close_all()
+
+            app    = counter.wsgi(get_wsgi_application(),
+                                  lambda path: "auctioneer" if path.startswith("/auction/") else "board")
+            server = PooledWSGIServer(("127.0.0.1", 0), QuietHandler, allow_reuse_address=False,
+                                      threads=options["threads"])
+            server.set_app(app)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            connection_created.connect(counter.install)
+
+            results = BoardLoadTest(f"http://127.0.0.1:{server.server_port}", sessionid=sessionid, **load).run()
+        finally:
+            connection_created.disconnect(counter.install)
+            if server:
+                server.shutdown()
+                server.server_close()
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmp:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+        spectator = ("board", "stream")
+        requests  = {"board": sum(results["ops"].get(op, {}).get("count", 0) for op in spectator)}
+        requests["auctioneer"] = sum(row["count"] for op, row in results["ops"].items() if op not in spectator)
+        results["queries"] = {
+            kind: {"total": total, "per_request": round(total / max(1, requests.get(kind, 0)), 1)}
+            for kind, total in counter.counts.items()
+        }
+        results["database"] = connection.vendor
+        return results
+
+    # ─────────────────────────────────────────────
+    # REPORT
+    # ─────────────────────────────────────────────
+
+    def print_report(self, results):
+        self.stdout.write(f"{'op':<15}{'count':>8}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+        for op, row in results["ops"].items():
+            self.stdout.write(
+                f"{op:<15}{row['count']:>8}{row['per_sec']:>8.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}  {row['statuses']}"
+            )
+        if results["streams"]:
+            s = results["streams"]
+            self.stdout.write(f"Streams: {s.get('opened', 0)} opened, {s.get('max_open', 0)} open at once, "
+                              f"{s.get('events', 0)} events, {s.get('fallbacks', 0)} fell back to polling")
+        for op, row in results["slowdown"].items():
+            self.stdout.write(f"{op} with spectators: p50 {row['added_p50_ms']:+} ms, p95 {row['added_p95_ms']:+} ms "
+                              f"(idle p95 {row['idle_p95_ms']} → {row['loaded_p95_ms']})")
+        for kind, row in results.get("queries", {}).items():
+            self.stdout.write(f"DB queries ({kind}): {row['total']} total, {row['per_request']} per request")
+        if results["errors"]:
+            self.stdout.write(self.style.WARNING(f"Errors: {results['errors']}"))
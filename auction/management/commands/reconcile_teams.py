@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from auction.models import Team
+
+
+class Command(BaseCommand):
+
+    help = "Check Team squad counters against sold players; --fix rewrites the ones that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rewrite counters that disagree")
+
+    def handle(self, *args, **options):
+        counts = Team.squad_counts()
+        teams  = Team.objects.annotate(**{f"expected_{f}": expr for f, expr in counts.items()})
+
+        drifted = 0
+        for team in teams:
+            diffs = [
+                f"{f} {getattr(team, f)} → {getattr(team, f'expected_{f}')}"
+                for f in counts if getattr(team, f) != getattr(team, f"expected_{f}")
+            ]
+            if diffs:
+                drifted += 1
+                self.stdout.write(f"{team.name}: " + ", ".join(diffs))
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All team counters match."))
+            return
+
+        if not options["fix"]:
+            raise CommandError(f"{drifted} team(s) out of step — rerun with --fix.")
+
+        Team.objects.update(version=F("version") + 1, **counts)
+        self.stdout.write(self.style.SUCCESS(f"Fixed {drifted} team(s)."))
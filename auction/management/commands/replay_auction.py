@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from auction.models import AuctionSnapshot, AuctionState
+from auction.services.replay_service import ReplayService
+
+
+class Command(BaseCommand):
+
+    help = ("Rebuild players, wallets and auction state from the action log and compare with the "
+            "live tables; --fix rewrites what drifted, --snapshot takes the live tables as the baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rewrite rows that disagree with the log")
+        parser.add_argument("--snapshot", action="store_true",
+                            help="Take the current tables as the new baseline (run once on an existing "
+                                 "auction, or after checking a manual fix)")
+
+    def handle(self, *args, **options):
+        replay = ReplayService()
+
+        if options["snapshot"]:
+            with transaction.atomic():
+                AuctionState.lock()
+                snap = replay.snapshot(AuctionSnapshot.REASON_MANUAL, from_tables=True)
+            self.stdout.write(self.style.SUCCESS(f"Snapshot #{snap.pk} at action {snap.last_action_id}."))
+            return
+
+        diffs = replay.verify()
+        for line in diffs:
+            self.stdout.write(line)
+
+        if not diffs:
+            self.stdout.write(self.style.SUCCESS("Live tables match the action log."))
+            return
+
+        if not options["fix"]:
+            raise CommandError(f"{len(diffs)} difference(s) from the action log — rerun with --fix.")
+
+        replay.apply()
+        self.stdout.write(self.style.SUCCESS(f"Fixed {len(diffs)} difference(s)."))
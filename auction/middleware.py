@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import connection
+
+from auction.utils import metrics, state_cache
+
+
+class StateCacheMiddleware:
+    """Loads AuctionState / TournamentConfig / TournamentSettings at most once per request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with state_cache.request_scope():
+            return self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """Query count, DB time, template time and total time per view (see utils/metrics.py)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS:
+            return self.get_response(request)
+
+        metrics.start()
+        try:
+            with connection.execute_wrapper(metrics.timed_query):
+                response = self.get_response(request)
+        except Exception:
+            metrics.finish(self.view_name(request), request.method, 500)
+            raise
+        metrics.finish(self.view_name(request), request.method, response.status_code)
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, "resolver_match", None)
+        return (match.url_name or match.view_name) if match else "unresolved"
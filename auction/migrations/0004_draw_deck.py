@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0003_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DrawDeck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=10)),
+                ('phase', models.CharField(max_length=10)),
+                ('category_pass', models.IntegerField(default=1)),
+                ('lap', models.IntegerField(default=1)),
+                ('seed', models.BigIntegerField()),
+                ('order', models.JSONField(default=list)),
+                ('pointer', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'phase', 'category_pass'), name='unique_deck_per_slot')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Team   = apps.get_model("auction", "Team")
+    Player = apps.get_model("auction", "Player")
+
+    def sold(**filters):
+        return Coalesce(Subquery(
+            Player.objects.filter(team=OuterRef("pk"), status="SOLD", **filters)
+            .values("team").annotate(n=Count("pk")).values("n")
+        ), 0)
+
+    Team.objects.update(
+        squad_size=sold(),
+        sold_ar=sold(role="AR"),
+        sold_bat=sold(role="BAT"),
+        sold_bowl=sold(role="BOWL"),
+        sold_ply=sold(role="PLY"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0004_draw_deck'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='sold_ar',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='sold_bat',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='sold_bowl',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='sold_ply',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='squad_size',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:54
+
+from django.db import migrations, models
+
+
+def dedupe_names(apps, schema_editor):
+    """Older data may repeat a name; suffix the later rows " (2)", " (3)", ... before the unique constraints."""
+    for model_name in ("Player", "Team"):
+        model = apps.get_model("auction", model_name)
+        taken = set()
+        for obj in model.objects.order_by("pk"):
+            name, n = obj.name, 1
+            while name in taken:
+                n += 1
+                name = f"{obj.name} ({n})"
+            taken.add(name)
+            if name != obj.name:
+                model.objects.filter(pk=obj.pk).update(name=name[:100])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0006_import_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auctionaction',
+            index=models.Index(fields=['timestamp', 'id'], name='action_timestamp_id'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['team1', 'team2'], name='match_pair'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['role', 'status'], name='player_role_status'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['team', 'status'], name='player_team_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='player',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_player_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='team',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_team_name'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def chain_existing_actions(apps, schema_editor):
+    # Undo used to delete its target, so every forward row left is live:
+    # chain them in id order and point the head cursor at the newest.
+    AuctionAction = apps.get_model("auction", "AuctionAction")
+    AuctionState  = apps.get_model("auction", "AuctionState")
+    Player        = apps.get_model("auction", "Player")
+
+    AuctionAction.objects.filter(action="UNSOLD").update(rebid=True)
+
+    # A PLY player out of rebids was dropped automatically: logged as
+    # NOT_PLAYING, but the drop came from a rebid and counted in
+    # rebid_count like UNSOLD. Whatever a player's rebid_count holds
+    # beyond their UNSOLD rows belongs to their newest NOT_PLAYING rows.
+    unsold = dict(
+        AuctionAction.objects.filter(action="UNSOLD")
+        .values("player").annotate(n=Count("id")).values_list("player", "n")
+    )
+    for player_id, rebids in Player.objects.filter(rebid_count__gt=0).values_list("pk", "rebid_count"):
+        dropped = rebids - unsold.get(player_id, 0)
+        if dropped > 0:
+            ids = list(
+                AuctionAction.objects.filter(player_id=player_id, action="NOT_PLAYING")
+                .order_by("-id").values_list("id", flat=True)[:dropped]
+            )
+            AuctionAction.objects.filter(pk__in=ids).update(rebid=True)
+
+    previous = None
+    for action in AuctionAction.objects.exclude(action="UNDO").order_by("id").iterator():
+        if previous is not None:
+            AuctionAction.objects.filter(pk=action.pk).update(parent_id=previous)
+        previous = action.pk
+
+    AuctionState.objects.filter(pk=1).update(head_action_id=previous)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auctionaction',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='auction.auctionaction'),
+        ),
+        migrations.AddField(
+            model_name='auctionaction',
+            name='prev_status',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='auctionaction',
+            name='rebid',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='auctionaction',
+            name='reverted_by',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reverts', to='auction.auctionaction'),
+        ),
+        migrations.AddField(
+            model_name='auctionstate',
+            name='head_action',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='auction.auctionaction'),
+        ),
+        migrations.AddField(
+            model_name='auctionstate',
+            name='redo_action',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='auction.auctionaction'),
+        ),
+        migrations.RunPython(chain_existing_actions, migrations.RunPython.noop),
+    ]
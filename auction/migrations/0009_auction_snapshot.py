@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0008_action_event_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_action_id', models.IntegerField(default=0)),
+                ('reason', models.CharField(max_length=20)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-last_action_id', '-id'],
+            },
+        ),
+    ]
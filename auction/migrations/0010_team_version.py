@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:15
+
+import auction.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0009_auction_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='version',
+            field=models.BigIntegerField(default=auction.models.version_stamp),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_player_teams(apps, schema_editor):
+    # One jersey per player: the newest is the one every page showed, so
+    # older duplicates go. Then point each jersey at its sold player's
+    # team; where two in a team share a number, the newest keeps it and
+    # the others go to 0.
+    Jersey = apps.get_model("auction", "Jersey")
+
+    seen = set()
+    for pk, player_id in Jersey.objects.order_by("-id").values_list("id", "player_id"):
+        if player_id in seen:
+            Jersey.objects.filter(pk=pk).delete()
+        seen.add(player_id)
+
+    taken = set()
+    for jersey in Jersey.objects.select_related("player").order_by("-id").iterator():
+        player  = jersey.player
+        team_id = player.team_id if player.status == "SOLD" else None
+        number  = jersey.jersey_number
+        if team_id and number > 0:
+            if (team_id, number) in taken:
+                number = 0
+            else:
+                taken.add((team_id, number))
+        Jersey.objects.filter(pk=jersey.pk).update(team_id=team_id, jersey_number=number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0010_team_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jersey',
+            name='team',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jerseys', to='auction.team'),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='preferred_jersey_number',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Used by jersey auto-assign when it is free in the team', null=True),
+        ),
+        migrations.RunPython(copy_player_teams, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='jersey',
+            constraint=models.UniqueConstraint(fields=('player',), name='unique_player_jersey'),
+        ),
+        migrations.AddConstraint(
+            model_name='jersey',
+            constraint=models.UniqueConstraint(condition=models.Q(('jersey_number__gt', 0), ('team__isnull', False)), fields=('team', 'jersey_number'), name='unique_team_jersey_number'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:26
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+KNOCKOUT_WORDS = ("final", "quarter", "semi", "eliminator", "qualifier", "round of")
+
+
+def classify_stages(apps, schema_editor):
+    # Knockout rounds are recognised by their label alone. A league pairing
+    # entered twice cannot get the unique pair constraint, and guessing which
+    # copy holds the real result would corrupt the points table, so the
+    # migration stops and lists them for an admin to fix first.
+    Match = apps.get_model("auction", "Match")
+
+    knockout, league = [], {}
+    for match in Match.objects.select_related("team1", "team2").order_by("match_number", "id"):
+        if any(w in match.round_label.lower() for w in KNOCKOUT_WORDS):
+            knockout.append(match.pk)
+        else:
+            league.setdefault(frozenset((match.team1_id, match.team2_id)), []).append(match)
+
+    duplicates = [matches for matches in league.values() if len(matches) > 1]
+    if duplicates:
+        lines = [
+            f"  {m[0].team1.name} v {m[0].team2.name}: matches "
+            + ", ".join(f"#{x.match_number} (id {x.pk})" for x in m)
+            for m in duplicates
+        ]
+        raise RuntimeError(
+            "League pairs entered more than once:\n" + "\n".join(lines) + "\n"
+            "Delete the extra match, or give it a knockout round label "
+            "(e.g. Final, Semi-Final), then run migrate again."
+        )
+
+    Match.objects.filter(pk__in=knockout).update(stage="KNOCKOUT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction', '0011_jersey_team_numbers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='bracket_slot',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='round_number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='stage',
+            field=models.CharField(choices=[('LEAGUE', 'League'), ('KNOCKOUT', 'Knockout')], default='LEAGUE', max_length=10),
+        ),
+        migrations.RunPython(classify_stages, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Least('team1', 'team2'), django.db.models.functions.comparison.Greatest('team1', 'team2'), condition=models.Q(('stage', 'LEAGUE')), name='unique_league_pair'),
+        ),
+    ]
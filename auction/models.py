@@ -1,4 +1,19 @@
-from django.db import models
+import json
+import time
+
+from django.db import models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from auction.utils import state_cache
+from config.logging_config import auction_logger
+
+
+def version_stamp():
+    """Starting point for a Team.version: a re-used pk never meets an old stamp."""
+    return time.time_ns() // 1000
 
 
 # =========================
@@ -15,6 +30,82 @@ class Team(models.Model):
     notes              = models.TextField(blank=True)
     remaining_points   = models.IntegerField(default=0)
 
+    # Squad counters — maintained by Player.save() alongside the wallet,
+    # rebuilt by AuctionEngine.recalculate_points / `manage.py reconcile_teams`
+    squad_size = models.IntegerField(default=0)
+    sold_ar    = models.IntegerField(default=0)
+    sold_bat   = models.IntegerField(default=0)
+    sold_bowl  = models.IntegerField(default=0)
+    sold_ply   = models.IntegerField(default=0)
+
+    # Bumped whenever the board card could change (wallet, squad, jerseys,
+    # team edits); rendered cards are cached per (pk, version)
+    version = models.BigIntegerField(default=version_stamp)
+
+    ROLE_COUNTERS = {"AR": "sold_ar", "BAT": "sold_bat", "BOWL": "sold_bowl", "PLY": "sold_ply"}
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["name"], name="unique_team_name"),
+        ]
+
+    @classmethod
+    def adjust(cls, team_id, points=0, role=None, players=0):
+        """
+        Atomic wallet / squad change in the DB.
+        points: negative = debit. players: +1 joins the squad, -1 leaves it.
+        """
+        changes = {}
+        if points:
+            changes["remaining_points"] = models.F("remaining_points") + points
+        if players:
+            changes["squad_size"] = models.F("squad_size") + players
+            field = cls.ROLE_COUNTERS.get(role)
+            if field:
+                changes[field] = models.F(field) + players
+        if changes:
+            cls.objects.filter(pk=team_id).update(version=models.F("version") + 1, **changes)
+
+    @classmethod
+    def lock(cls, team_ids):
+        """Row-lock teams (in pk order) for the rest of the current transaction; returns their pks."""
+        return set(cls.objects.select_for_update().filter(pk__in=team_ids).order_by("pk").values_list("pk", flat=True))
+
+    @classmethod
+    def touch(cls, *team_ids):
+        """Bump the version of teams whose board card changed without a wallet move."""
+        ids = [pk for pk in team_ids if pk]
+        if ids:
+            cls.objects.filter(pk__in=ids).update(version=models.F("version") + 1)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version = version_stamp()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def squad_counts(cls):
+        """
+        Counter values recomputed from Player rows, as expressions for
+        Team.objects.update(**Team.squad_counts()).
+        """
+        def sold(**filters):
+            return Coalesce(Subquery(
+                Player.objects.filter(team=OuterRef("pk"), status=Player.STATUS_SOLD, **filters)
+                .values("team").annotate(n=Count("pk")).values("n")
+            ), 0)
+
+        counts = {"squad_size": sold()}
+        for role, field in cls.ROLE_COUNTERS.items():
+            counts[field] = sold(role=role)
+        return counts
+
+    def sold_in_role(self, role):
+        field = self.ROLE_COUNTERS.get(role)
+        return getattr(self, field) if field else 0
+
     def get_short(self):
         """Return short_name if set, else auto-generate from name."""
         if self.short_name:
@@ -75,48 +166,90 @@ class Player(models.Model):
     notes       = models.TextField(blank=True)
     photo       = models.ImageField(upload_to="players/", null=True, blank=True)
 
+    preferred_jersey_number = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Used by jersey auto-assign when it is free in the team"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["name"], name="unique_player_name"),
+        ]
+        indexes = [
+            models.Index(fields=["role", "status"], name="player_role_status"),   # pools, pool counts
+            models.Index(fields=["team", "status"], name="player_team_status"),   # squads, wallets
+        ]
+
+    # ─────────────────────────────────────────────
+    # WALLET / SQUAD LEDGER
+    # The sold state (status, team, price, role) as last read from /
+    # written to the DB is kept on the instance, so save() knows what to
+    # refund and what to charge without re-reading the row. Wallets and
+    # squad counters move with atomic F() updates, never read-modify-write.
+    # ─────────────────────────────────────────────
+
+    LEDGER_FIELDS = {"status", "team_id", "sold_price", "role"}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not cls.LEDGER_FIELDS & instance.get_deferred_fields():
+            instance._ledger = instance._ledger_entry()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._ledger = self._ledger_entry()
+
+    def _ledger_entry(self):
+        """(team_id, price, role) this player counts against, or (None, 0, None) if not sold."""
+        if self.status == self.STATUS_SOLD and self.team_id:
+            return (self.team_id, self.sold_price or 0, self.role)
+        return (None, 0, None)
+
     def save(self, *args, **kwargs):
-        """Auto-adjust team remaining_points whenever sold status/price/team changes."""
-        if self.pk:
-            try:
-                prev        = Player.objects.get(pk=self.pk)
-                prev_status = prev.status
-                prev_team   = prev.team
-                prev_price  = prev.sold_price or 0
-            except Player.DoesNotExist:
-                prev_status = None
-                prev_team   = None
-                prev_price  = 0
+        """Auto-adjust team remaining_points and squad counters whenever sold status/price/team changes."""
+        if hasattr(self, "_ledger") or self._state.adding:
+            prev = getattr(self, "_ledger", (None, 0, None))
         else:
-            prev_status = None
-            prev_team   = None
-            prev_price  = 0
+            # Loaded with .only()/.defer() — fall back to reading the saved row
+            prev = Player.objects.get(pk=self.pk)._ledger
 
         super().save(*args, **kwargs)
 
-        new_status = self.status
-        new_team   = self.team
-        new_price  = self.sold_price or 0
-
-        already_same = (
-            prev_status == self.STATUS_SOLD
-            and prev_team  == new_team
-            and prev_price == new_price
-            and new_status == self.STATUS_SOLD
-        )
+        new          = self._ledger_entry()
+        self._ledger = new
 
-        if already_same:
+        if prev == new:
+            Team.touch(new[0])   # name / role edits still show on the squad card
             return  # Nothing changed financially
 
-        # Always refund previous team if was SOLD
-        if prev_status == self.STATUS_SOLD and prev_team and prev_price:
-            prev_team.remaining_points += prev_price
-            prev_team.save()
-
-        # Deduct from new team if now SOLD
-        if new_status == self.STATUS_SOLD and new_team and new_price:
-            new_team.remaining_points -= new_price
-            new_team.save()
+        prev_team_id, prev_price, prev_role = prev
+        new_team_id,  new_price,  new_role  = new
+
+        if prev_team_id != new_team_id:
+            Jersey.follow_players([self.pk])
+
+        if prev_team_id and prev_team_id == new_team_id and prev_role == new_role:
+            self._charge(new_team_id, new_price - prev_price)
+            return
+
+        # Release from previous team, charge new team
+        if prev_team_id:
+            self._charge(prev_team_id, -prev_price, prev_role, -1)
+        if new_team_id:
+            self._charge(new_team_id, new_price, new_role, 1)
+
+    def _charge(self, team_id, amount, role=None, players=0):
+        Team.adjust(team_id, points=-amount, role=role, players=players)
+        # Keep an already-loaded team instance in step with the DB
+        if Player.team.is_cached(self) and self.team and self.team.pk == team_id:
+            team = self.team
+            team.remaining_points -= amount
+            if players:
+                team.squad_size += players
+                field = Team.ROLE_COUNTERS.get(role)
+                if field:
+                    setattr(team, field, getattr(team, field) + players)
 
     def __str__(self):
         return self.name
@@ -148,8 +281,10 @@ class TournamentSettings(models.Model):
 
     @classmethod
     def get(cls):
-        obj, _ = cls.objects.get_or_create(pk=1, defaults={"tournament_name": "KPL Auction"})
-        return obj
+        def load():
+            obj, _ = cls.objects.get_or_create(pk=1, defaults={"tournament_name": "KPL Auction"})
+            return obj
+        return state_cache.get("tournament_settings", load)
 
 
 # =========================
@@ -177,9 +312,21 @@ class TournamentConfig(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def current(cls):
+        """The active config, or None before the auction is started."""
+        return state_cache.get("tournament_config", cls.objects.first)
+
     def get_category_order(self):
         return [c.strip().upper() for c in self.category_order.split(",") if c.strip()]
 
+    def get_size_mapping(self):
+        """{size number: label} from size_mapping; {} if the JSON is malformed."""
+        try:
+            return {int(k): str(v) for k, v in json.loads(self.size_mapping).items()}
+        except (ValueError, TypeError, AttributeError):
+            return {}
+
     def base_price_for_role(self, role):
         return {"AR": self.base_price_AR, "BAT": self.base_price_BAT,
                 "BOWL": self.base_price_BOWL, "PLY": self.base_price_PLY}.get(role, 0)
@@ -194,12 +341,21 @@ class TournamentConfig(models.Model):
 
 class AuctionAction(models.Model):
 
+    """
+    Append-only event log. Forward actions (SELL / UNSOLD / NOT_PLAYING)
+    chain to the action that was head when they were recorded (parent);
+    an UNDO row never deletes anything — it sets reverted_by on its target,
+    and a redo sets reverted_by on the UNDO row. AuctionState.head_action
+    and redo_action are the two cursors into this log.
+    """
+
     ACTION_CHOICES = [
         ("SELL",        "SELL"),
         ("UNSOLD",      "UNSOLD"),
         ("NOT_PLAYING", "NOT_PLAYING"),
         ("UNDO",        "UNDO"),
     ]
+    FORWARD_ACTIONS = {"SELL", "UNSOLD", "NOT_PLAYING"}
 
     player    = models.ForeignKey(Player, on_delete=models.CASCADE)
     team      = models.ForeignKey(Team, null=True, blank=True, on_delete=models.SET_NULL)
@@ -209,6 +365,19 @@ class AuctionAction(models.Model):
     category  = models.CharField(max_length=10, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    # Event-log links (see class docstring)
+    parent      = models.ForeignKey("self", null=True, blank=True, on_delete=models.SET_NULL,
+                                    related_name="+")
+    reverted_by = models.OneToOneField("self", null=True, blank=True, on_delete=models.SET_NULL,
+                                       related_name="reverts")
+    prev_status = models.CharField(max_length=20, blank=True)   # player status before this action
+    rebid       = models.BooleanField(default=False)             # counted towards player.rebid_count
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="action_timestamp_id"),   # audit log order
+        ]
+
     def __str__(self):
         return f"{self.player.name} - {self.action}"
 
@@ -243,6 +412,14 @@ class AuctionState(models.Model):
     awaiting_transition = models.BooleanField(default=False)
     transition_message  = models.CharField(max_length=200, blank=True)
 
+    # Undo / redo cursors into the AuctionAction log
+    head_action = models.ForeignKey(
+        "AuctionAction", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    redo_action = models.ForeignKey(
+        "AuctionAction", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+
     class Meta:
         verbose_name = "Auction State"
 
@@ -251,10 +428,96 @@ class AuctionState(models.Model):
 
     @classmethod
     def get(cls):
-        state, _ = cls.objects.get_or_create(pk=1)
+        def load():
+            state, _ = cls.objects.get_or_create(pk=1)
+            return state
+        return state_cache.get("auction_state", load)
+
+    @classmethod
+    def lock(cls):
+        """
+        Row-lock the state for the rest of the current transaction.
+        Every auction command takes this lock first, so commands from
+        different workers run one after another.
+        """
+        state = cls.objects.select_for_update().filter(pk=1).first()
+        if state is None:
+            cls.objects.get_or_create(pk=1)
+            state = cls.objects.select_for_update().get(pk=1)
+        state_cache.put("auction_state", state)
         return state
 
 
+# =========================
+# DRAW DECK (shuffled draw order per slot)
+# =========================
+
+class DrawDeck(models.Model):
+    """
+    Shuffled draw order for one slot (category · phase · pass), built
+    when the slot opens. Advancing moves `pointer` along `order`; `seed`
+    reproduces the shuffle, so the order can be audited afterwards.
+    When the deck runs out and the pool still has players (rebid laps,
+    late imports) a new lap is shuffled from the live pool.
+    """
+
+    category      = models.CharField(max_length=10)
+    phase         = models.CharField(max_length=10)
+    category_pass = models.IntegerField(default=1)
+    lap           = models.IntegerField(default=1)
+    seed          = models.BigIntegerField()
+    order         = models.JSONField(default=list)   # Player pks
+    pointer       = models.IntegerField(default=0)
+    updated_at    = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["category", "phase", "category_pass"], name="unique_deck_per_slot"),
+        ]
+
+    def __str__(self):
+        return f"{self.category} {self.phase} Pass{self.category_pass} · {self.pointer}/{len(self.order)}"
+
+    @property
+    def remaining(self):
+        return max(0, len(self.order) - self.pointer)
+
+    @classmethod
+    def for_slot(cls, state):
+        return cls.objects.filter(
+            category=state.current_category, phase=state.phase, category_pass=state.category_pass
+        ).first()
+
+
+# =========================
+# AUCTION SNAPSHOT (replay checkpoints)
+# =========================
+
+class AuctionSnapshot(models.Model):
+    """
+    Player / wallet / state image after every AuctionAction up to
+    `last_action_id`. ReplayService starts from the newest snapshot and
+    folds only the actions after it.
+    """
+
+    REASON_START      = "START"
+    REASON_TRANSITION = "TRANSITION"
+    REASON_RESET      = "RESET"
+    REASON_PERIODIC   = "PERIODIC"
+    REASON_MANUAL     = "MANUAL"
+
+    last_action_id = models.IntegerField(default=0)
+    reason         = models.CharField(max_length=20)
+    data           = models.JSONField(default=dict)
+    created_at     = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-last_action_id", "-id"]
+
+    def __str__(self):
+        return f"#{self.pk} {self.reason} @ action {self.last_action_id}"
+
+
 # =========================
 # JERSEY
 # =========================
@@ -268,6 +531,83 @@ class Jersey(models.Model):
     size_text     = models.CharField(max_length=10)
     sponsor       = models.CharField(max_length=100, blank=True)
 
+    # The team the player is sold to (copied from Player, kept in step by
+    # Player.save / follow_players) so numbers can be unique per team.
+    # 0 means no number yet.
+    team = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="jerseys"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["player"], name="unique_player_jersey"),
+            models.UniqueConstraint(
+                fields=["team", "jersey_number"],
+                condition=models.Q(team__isnull=False, jersey_number__gt=0),
+                name="unique_team_jersey_number",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.team_id = self.player._ledger_entry()[0]
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "team"}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def follow_players(cls, player_ids=None):
+        """
+        Re-point jerseys at their player's current team (all jerseys if
+        player_ids is None). A number already worn in the new team (by a
+        squad jersey or a team extra) is cleared to 0 rather than failing
+        the sale; each clearing goes to the auction log. Returns the
+        cleared jerseys with the number they lost.
+        """
+        with transaction.atomic():
+            jerseys = cls.objects.select_related("player").order_by("-pk")
+            if player_ids is not None:
+                jerseys = jerseys.filter(player__in=player_ids)
+            moving = [j for j in jerseys if j.team_id != j.player._ledger_entry()[0]]
+            if not moving:
+                return []
+
+            targets = {j.player._ledger_entry()[0] for j in moving} - {None}
+            # Squad and extra numbers share one range with no DB constraint
+            # across the two tables: the team row lock keeps them in step
+            # with the jersey page (see JerseyNumberIndex).
+            Team.lock(targets)
+            taken = set(
+                cls.objects.filter(team__in=targets, jersey_number__gt=0)
+                .exclude(pk__in=[j.pk for j in moving])
+                .values_list("team_id", "jersey_number")
+            ) | set(
+                ExtraJerseyMember.objects.filter(team__in=targets, member_type=ExtraJerseyMember.TYPE_TEAM,
+                                                 jersey_number__gt=0)
+                .values_list("team_id", "jersey_number")
+            )
+
+            cleared = []
+            for j in moving:
+                j.team_id = j.player._ledger_entry()[0]
+                if j.team_id and j.jersey_number > 0:
+                    if (j.team_id, j.jersey_number) in taken:
+                        cleared.append((j, j.jersey_number))
+                        j.jersey_number = 0
+                    else:
+                        taken.add((j.team_id, j.jersey_number))
+
+            # Detach first so no row briefly clashes inside the bulk UPDATE
+            cls.objects.filter(pk__in=[j.pk for j in moving]).update(team=None)
+            cls.objects.bulk_update(moving, ["team", "jersey_number"], batch_size=500)
+            Team.touch(*targets)
+
+        for j, number in cleared:
+            auction_logger.warning(
+                f"Jersey #{number} of {j.player.name} cleared: already worn in team {j.team_id}; "
+                f"pick a new number on the jersey page"
+            )
+        return cleared
+
     def __str__(self):
         return f"{self.player.name} #{self.jersey_number}"
 
@@ -328,6 +668,17 @@ class Match(models.Model):
         (STATUS_CANCELLED, "Cancelled"),
     ]
 
+    STAGE_LEAGUE   = "LEAGUE"
+    STAGE_KNOCKOUT = "KNOCKOUT"
+
+    STAGE_CHOICES = [
+        (STAGE_LEAGUE,   "League"),
+        (STAGE_KNOCKOUT, "Knockout"),
+    ]
+
+    # Round labels that mean a knockout match when entered by hand
+    KNOCKOUT_WORDS = ("final", "quarter", "semi", "eliminator", "qualifier", "round of")
+
     match_number   = models.IntegerField()
     round_label    = models.CharField(max_length=50, default="League",
                                       help_text="e.g. League, Quarter-Final, Semi-Final, Final")
@@ -345,8 +696,31 @@ class Match(models.Model):
     notes          = models.TextField(blank=True)
     created_at     = models.DateTimeField(auto_now_add=True)
 
+    # League pairs are unique either way round; knockouts may repeat them.
+    # round_number is the match day within the stage (no team plays twice
+    # in one); bracket_slot is the knockout position, winners of slots
+    # 2k and 2k+1 meet in slot k of the next round.
+    stage          = models.CharField(max_length=10, choices=STAGE_CHOICES, default=STAGE_LEAGUE)
+    round_number   = models.IntegerField(null=True, blank=True)
+    bracket_slot   = models.IntegerField(null=True, blank=True)
+
     class Meta:
         ordering = ["match_number"]
+        indexes = [
+            models.Index(fields=["team1", "team2"], name="match_pair"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                Least("team1", "team2"), Greatest("team1", "team2"),
+                condition=models.Q(stage="LEAGUE"),
+                name="unique_league_pair",
+            ),
+        ]
+
+    @classmethod
+    def stage_for(cls, round_label):
+        label = round_label.lower()
+        return cls.STAGE_KNOCKOUT if any(w in label for w in cls.KNOCKOUT_WORDS) else cls.STAGE_LEAGUE
 
     def __str__(self):
         return f"M{self.match_number}: {self.team1.name} vs {self.team2.name}"
@@ -357,3 +731,155 @@ class Match(models.Model):
         if self.winner == self.team2:
             return self.team1
         return None
+
+
+# =========================
+# BOARD EVENT (live public board feed)
+# =========================
+
+class BoardEvent(models.Model):
+    """
+    One row per change the public board should react to.
+    Rows carry pre-rendered HTML fragments so every spectator gets the
+    same patch without re-running the board view.
+    """
+
+    kind       = models.CharField(max_length=20)
+    payload    = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind}"
+
+
+# =========================
+# IDEMPOTENCY KEY (auction command retries)
+# =========================
+
+class IdempotencyKey(models.Model):
+    """
+    One row per client-supplied key on an auction command.
+    A retry with the same key gets the stored response instead of
+    running the command again.
+    """
+
+    key        = models.CharField(max_length=64, unique=True)
+    endpoint   = models.CharField(max_length=100)
+    response   = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key}"
+
+
+# =========================
+# IMPORT JOB (background CSV import)
+# =========================
+
+class ImportJob(models.Model):
+    """
+    One uploaded CSV being imported in the background (see ImportService).
+    Progress fields are written after every batch so the upload page can poll.
+    """
+
+    STATUS_QUEUED  = "QUEUED"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_DONE    = "DONE"
+    STATUS_FAILED  = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED,  "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE,    "Done"),
+        (STATUS_FAILED,  "Failed"),
+    ]
+
+    csv_type     = models.CharField(max_length=10, default="players")
+    file         = models.FileField(upload_to="imports/")
+    status       = models.CharField(max_length=10, default=STATUS_QUEUED, choices=STATUS_CHOICES)
+    rows_done    = models.IntegerField(default=0)
+    created      = models.IntegerField(default=0)
+    error_count  = models.IntegerField(default=0)
+    errors       = models.JSONField(default=list, blank=True)   # first MAX_ERRORS messages
+    message      = models.CharField(max_length=300, blank=True)  # fatal error, if any
+    created_at   = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at  = models.DateTimeField(null=True, blank=True)
+
+    MAX_ERRORS = 200
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.csv_type} import #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    def as_dict(self):
+        return {
+            "id":          self.pk,
+            "csv_type":    self.csv_type,
+            "status":      self.status,
+            "rows_done":   self.rows_done,
+            "created":     self.created,
+            "error_count": self.error_count,
+            "errors":      self.errors,
+            "message":     self.message,
+            "finished":    self.is_finished,
+        }
+
+
+# =========================
+# SINGLETON CACHE INVALIDATION (see utils/state_cache.py)
+# =========================
+
+@receiver(post_save, sender=AuctionState)
+def _cache_saved_state(sender, instance, **kwargs):
+    if instance.pk == 1:
+        state_cache.put("auction_state", instance)
+
+
+@receiver(post_save, sender=TournamentSettings)
+def _cache_saved_settings(sender, instance, **kwargs):
+    if instance.pk == 1:
+        state_cache.put("tournament_settings", instance)
+
+
+@receiver(post_save, sender=TournamentConfig)
+@receiver(post_delete, sender=TournamentConfig)
+def _drop_cached_config(sender, **kwargs):
+    state_cache.invalidate("tournament_config")
+
+
+@receiver(post_delete, sender=AuctionState)
+@receiver(post_delete, sender=TournamentSettings)
+def _drop_cached_singleton(sender, **kwargs):
+    state_cache.invalidate("auction_state" if sender is AuctionState else "tournament_settings")
+
+
+# =========================
+# SQUAD COUNTERS — a sold player deleted outright leaves the squad
+# and their price goes back to the wallet
+# =========================
+
+@receiver(post_delete, sender=Player)
+def _release_deleted_player(sender, instance, **kwargs):
+    team_id, price, role = getattr(instance, "_ledger", None) or instance._ledger_entry()
+    if team_id:
+        Team.adjust(team_id, points=price, role=role, players=-1)
+
+
+# =========================
+# BOARD CARDS — jersey edits show on the team's card
+# =========================
+
+@receiver(post_save, sender=Jersey)
+@receiver(post_delete, sender=Jersey)
+def _touch_jersey_team(sender, instance, **kwargs):
+    Team.objects.filter(player__pk=instance.player_id).update(version=models.F("version") + 1)
@@ -1,6 +1,12 @@
 import random
 
-from auction.models import Player, Team, TournamentConfig, AuctionState
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from auction.models import Player, Team, TournamentConfig, AuctionState, AuctionSnapshot, DrawDeck, Jersey
+from auction.services.event_service import EventService
+from auction.services.replay_service import ReplayService
 
 ICON_CATEGORIES = {"AR", "BAT", "BOWL"}
 
@@ -24,8 +30,11 @@ def round_label(cat, phase, pass_num):
 
 class AuctionEngine:
 
-    def __init__(self):
-        self.config = TournamentConfig.objects.first()
+    def __init__(self, rng=None):
+        self.config = TournamentConfig.current()
+        self.events = EventService()
+        self.replay = ReplayService()
+        self.rng    = rng or random
 
     # ─────────────────────────────────────────────
     # PUBLIC: get state
@@ -58,25 +67,49 @@ class AuctionEngine:
         state.awaiting_transition   = True
         state.transition_message    = f"{ROUND_DISPLAY.get(first_cat, first_cat)} Round – Press Start to begin"
         state.save()
+        DrawDeck.objects.all().delete()
+        self.replay.snapshot(AuctionSnapshot.REASON_START, from_tables=True)   # wallets were just refilled
+        self.events.publish("TRANSITION")
 
     # ─────────────────────────────────────────────
     # PUBLIC: confirm transition (admin clicks Continue)
     # ─────────────────────────────────────────────
 
     def confirm_transition(self):
-        state = AuctionState.get()
-        state.awaiting_transition = False
-        state.transition_message  = ""
-        state.save()
-        return self.advance_to_next_player()
+        with transaction.atomic():
+            state = AuctionState.lock()
+            if not state.awaiting_transition:
+                return state.current_player   # already confirmed (double click)
+            state.awaiting_transition = False
+            state.transition_message  = ""
+            state.save()
+            self.replay.snapshot(AuctionSnapshot.REASON_TRANSITION)
+            return self.advance_to_next_player()
 
     # ─────────────────────────────────────────────
     # PUBLIC: advance to next player
     # ─────────────────────────────────────────────
 
     def advance_to_next_player(self):
-        state = AuctionState.get()
-
+        with transaction.atomic():
+            return self._advance(AuctionState.lock())
+
+    def ensure_current_player(self):
+        """
+        Auto-advance for the control page: pick a player only if nobody
+        is on the block yet. Runs under the state lock so two page loads
+        can't each pick (and overwrite) a player.
+        """
+        with transaction.atomic():
+            state = AuctionState.lock()
+            if (state.current_player_id is None
+                    and not state.awaiting_transition
+                    and state.phase != AuctionState.PHASE_DONE
+                    and state.is_active):
+                return self._advance(state)
+            return state.current_player
+
+    def _advance(self, state):
         if state.phase == AuctionState.PHASE_DONE:
             return None
 
@@ -84,6 +117,7 @@ class AuctionEngine:
             # Still waiting for admin to click Continue
             state.current_player = None
             state.save()
+            self.events.publish("PLAYER")
             return None
 
         player = self._pick_from_current_slot(state)
@@ -91,13 +125,15 @@ class AuctionEngine:
         if player:
             state.current_player = player
             state.save()
+            self.events.publish("PLAYER")
             return player
 
         # Pool exhausted — determine next transition
         self._set_next_transition(state)
-        state = AuctionState.get()  # re-fetch after _set_next_transition saves
         state.current_player = None
         state.save()
+        self.replay.snapshot(AuctionSnapshot.REASON_TRANSITION)
+        self.events.publish("TRANSITION")
         return None
 
     # ─────────────────────────────────────────────
@@ -105,34 +141,95 @@ class AuctionEngine:
     # ─────────────────────────────────────────────
 
     def _pick_from_current_slot(self, state):
-        cat      = state.current_category
-        phase    = state.phase
-        pass_num = state.category_pass
+        """
+        Next player from the slot's draw deck: one deck read, one
+        primary-key lookup and a pointer update, however big the pool.
+        Players that left the pool since the shuffle are skipped; once
+        the deck is used up, whoever is still in the pool (rebids, late
+        imports) is shuffled into a new lap.
+        """
+        pool = self._slot_pool(state)
+        if pool is None:
+            return None
+
+        deck  = DrawDeck.for_slot(state)
+        fresh = deck is None
+        if fresh:
+            deck = self._shuffle(DrawDeck(
+                category=state.current_category, phase=state.phase, category_pass=state.category_pass
+            ), pool)
+
+        player = self._draw(deck, pool)
+        if player is None and not fresh:
+            deck.lap += 1
+            player = self._draw(self._shuffle(deck, pool), pool)
+
+        deck.save(update_fields=["pointer", "updated_at"])
+        return player
+
+    def _shuffle(self, deck, pool):
+        deck.seed    = self.rng.getrandbits(32)
+        deck.order   = list(pool.order_by("pk").values_list("pk", flat=True))
+        deck.pointer = 0
+        random.Random(deck.seed).shuffle(deck.order)
+        deck.save()
+        return deck
+
+    def _draw(self, deck, pool):
+        while deck.pointer < len(deck.order):
+            pk            = deck.order[deck.pointer]
+            deck.pointer += 1
+            player        = pool.filter(pk=pk).first()
+            if player:
+                return player
+        return None
 
+    def _slot_pool(self, state):
+        return self._pool(state.current_category, state.phase, state.category_pass)
+
+    def _pool(self, cat, phase, pass_num):
         if phase == AuctionState.PHASE_MAIN:
             if pass_num == 1:
                 # Pass 1: only AVAILABLE
-                pool = list(Player.objects.filter(status=Player.STATUS_AVAILABLE, role=cat))
-            else:
-                # Pass 2: AVAILABLE + UNSOLD (item 16)
-                pool = list(Player.objects.filter(
-                    role=cat,
-                    status__in=[Player.STATUS_AVAILABLE, Player.STATUS_UNSOLD]
-                ))
-            return random.choice(pool) if pool else None
+                return Player.objects.filter(status=Player.STATUS_AVAILABLE, role=cat)
+            # Pass 2: AVAILABLE + UNSOLD (item 16)
+            return Player.objects.filter(
+                role=cat,
+                status__in=[Player.STATUS_AVAILABLE, Player.STATUS_UNSOLD]
+            )
 
         elif phase == AuctionState.PHASE_REBID:
-            pool = list(Player.objects.filter(status=Player.STATUS_UNSOLD, role=cat))
-            return random.choice(pool) if pool else None
+            return Player.objects.filter(status=Player.STATUS_UNSOLD, role=cat)
 
         return None
 
+    def _open_deck(self, cat, phase, pass_num):
+        """
+        Shuffle the deck for a slot we may move to, before the move.
+        Its length says whether the slot has anyone to draw, and the
+        first pick then finds the deck already built.
+        """
+        deck = DrawDeck.objects.filter(category=cat, phase=phase, category_pass=pass_num).first()
+        if deck is not None and deck.remaining:
+            return deck
+        if deck is None:
+            deck = DrawDeck(category=cat, phase=phase, category_pass=pass_num)
+        else:
+            deck.lap += 1
+        return self._shuffle(deck, self._pool(cat, phase, pass_num))
+
     # ─────────────────────────────────────────────
     # INTERNAL: set next transition when slot exhausted
     # (items 4, 10, 15, 16, 17)
     # ─────────────────────────────────────────────
 
     def _set_next_transition(self, state):
+        """
+        Runs once the slot's deck and a fresh lap of its pool came up
+        empty, so that pool is known to be empty here. The follow-on
+        slot is opened (its deck shuffled) to see whether it has anyone
+        to draw, instead of asking the Player table separately.
+        """
         config         = self.config
         cat            = state.current_category
         phase          = state.phase
@@ -141,25 +238,22 @@ class AuctionEngine:
         base           = ROUND_DISPLAY.get(cat, cat)
 
         if phase == AuctionState.PHASE_MAIN and pass_num == 1:
-            # Pass 1 exhausted
+            # Pass 1 exhausted: nobody AVAILABLE is left, so a rebid and
+            # pass 2 would both draw the same players, the unsold ones
             all_have_one = self._all_teams_have_icon(cat) if cat in ICON_CATEGORIES else True
-            unsold_exist = Player.objects.filter(status=Player.STATUS_UNSOLD, role=cat).exists()
 
-            if not all_have_one and unsold_exist:
-                # Rebid: some teams still need an icon
-                state.phase         = AuctionState.PHASE_REBID
-                state.auction_round += 1
-                state.awaiting_transition = True
-                state.transition_message  = f"{base} Pass 1 complete · Starting {base} Rebid"
-                state.save()
-                return
+            if not all_have_one:
+                if self._open_deck(cat, AuctionState.PHASE_REBID, 1).remaining:
+                    # Rebid: some teams still need an icon
+                    state.phase         = AuctionState.PHASE_REBID
+                    state.auction_round += 1
+                    state.awaiting_transition = True
+                    state.transition_message  = f"{base} Pass 1 complete · Starting {base} Rebid"
+                    state.save()
+                    return
 
-            # Check pass 2
-            if cat in ICON_CATEGORIES:
-                more_players = Player.objects.filter(
-                    role=cat
-                ).exclude(status__in=[Player.STATUS_NOT_PLAYING, Player.STATUS_SOLD]).exists()
-                if more_players:
+            elif cat in ICON_CATEGORIES:
+                if self._open_deck(cat, AuctionState.PHASE_MAIN, 2).remaining:
                     state.phase            = AuctionState.PHASE_MAIN
                     state.category_pass    = 2
                     state.auction_round   += 1
@@ -172,12 +266,10 @@ class AuctionEngine:
             self._transition_to_next_category(state, cat, category_order)
 
         elif phase == AuctionState.PHASE_REBID:
-            # Rebid exhausted
+            # Rebid exhausted: nobody UNSOLD is left, so pass 2 would draw
+            # only players made AVAILABLE again since pass 1 (undo, import)
             if cat in ICON_CATEGORIES and pass_num == 1:
-                more_available = Player.objects.filter(
-                    role=cat, status=Player.STATUS_AVAILABLE
-                ).exists()
-                if more_available:
+                if self._open_deck(cat, AuctionState.PHASE_MAIN, 2).remaining:
                     state.phase            = AuctionState.PHASE_MAIN
                     state.category_pass    = 2
                     state.auction_round   += 1
@@ -189,16 +281,9 @@ class AuctionEngine:
             self._transition_to_next_category(state, cat, category_order)
 
         elif phase == AuctionState.PHASE_MAIN and pass_num == 2:
-            # Pass 2 exhausted
-            unsold_exist = Player.objects.filter(status=Player.STATUS_UNSOLD, role=cat).exists()
-            if unsold_exist:
-                state.phase            = AuctionState.PHASE_REBID
-                state.auction_round   += 1
-                state.awaiting_transition = True
-                state.transition_message  = f"{base} Pass 2 complete · Starting {base} Rebid Pass 2"
-                state.save()
-                return
-
+            # Pass 2 exhausted. Its pool includes UNSOLD players and laps
+            # until they are sold or dropped, so there is nobody left for
+            # a second rebid.
             self._transition_to_next_category(state, cat, category_order)
 
     def _transition_to_next_category(self, state, current_cat, category_order):
@@ -209,6 +294,9 @@ class AuctionEngine:
             remaining_cats = []
 
         for next_cat in remaining_cats:
+            # Not a deck check: a category can open with only SOLD/UNSOLD
+            # players (imports, edits); pass 1 then passes straight on to
+            # its rebid or pass 2, as it always has.
             has_players = Player.objects.filter(role=next_cat).exclude(
                 status=Player.STATUS_NOT_PLAYING
             ).exists()
@@ -235,7 +323,8 @@ class AuctionEngine:
     # Pass 2: no blocking
     # ─────────────────────────────────────────────
 
-    def get_blocked_team_ids(self, state):
+    def get_blocked_team_ids(self, state, teams=None):
+        """`teams` (already loaded) turns this into an in-memory check on the counters."""
         cat      = state.current_category
         phase    = state.phase
         pass_num = state.category_pass
@@ -245,10 +334,10 @@ class AuctionEngine:
 
         # Block in pass 1 main AND rebid pass 1
         if pass_num == 1 and phase in (AuctionState.PHASE_MAIN, AuctionState.PHASE_REBID):
-            blocked = Team.objects.filter(
-                player__role=cat, player__status=Player.STATUS_SOLD
-            ).distinct().values_list("team_serial_number", flat=True)
-            return set(blocked)
+            if teams is not None:
+                return {t.team_serial_number for t in teams if t.sold_in_role(cat)}
+            field = Team.ROLE_COUNTERS[cat]
+            return set(Team.objects.filter(**{f"{field}__gt": 0}).values_list("team_serial_number", flat=True))
 
         return set()
 
@@ -257,11 +346,23 @@ class AuctionEngine:
     # ─────────────────────────────────────────────
 
     def _all_teams_have_icon(self, cat):
-        total_teams    = Team.objects.count()
-        teams_with_one = Team.objects.filter(
-            player__role=cat, player__status=Player.STATUS_SOLD
-        ).distinct().count()
-        return teams_with_one >= total_teams
+        return not Team.objects.filter(**{Team.ROLE_COUNTERS[cat]: 0}).exists()
+
+    # ─────────────────────────────────────────────
+    # PUBLIC: complete auction
+    # ─────────────────────────────────────────────
+
+    def complete_auction(self):
+        with transaction.atomic():
+            state = AuctionState.lock()
+            if state.phase == AuctionState.PHASE_DONE:
+                return   # already completed (double click)
+            state.phase          = AuctionState.PHASE_DONE
+            state.is_active      = False
+            state.current_player = None
+            state.save()
+            self.replay.snapshot(AuctionSnapshot.REASON_TRANSITION)
+            self.events.publish("COMPLETE")
 
     # ─────────────────────────────────────────────
     # PUBLIC: clear current player after action
@@ -288,16 +389,22 @@ class AuctionEngine:
     # ─────────────────────────────────────────────
 
     def recalculate_points(self):
+        """Rebuild every wallet and squad counter from sold players in one UPDATE."""
         config = self.config
         if not config:
             return
-        from django.db.models import Sum
-        for team in Team.objects.all():
-            spent = Player.objects.filter(
-                team=team, status=Player.STATUS_SOLD
-            ).aggregate(total=Sum("sold_price"))["total"] or 0
-            team.remaining_points = config.total_points - spent
-            team.save()
+        spent = (
+            Player.objects.filter(team=OuterRef("pk"), status=Player.STATUS_SOLD)
+            .values("team")
+            .annotate(total=Sum("sold_price"))
+            .values("total")
+        )
+        Team.objects.update(
+            remaining_points=config.total_points - Coalesce(Subquery(spent), 0),
+            version=F("version") + 1,
+            **Team.squad_counts(),
+        )
+        self.events.publish("REFRESH", Team.objects.values_list("team_serial_number", flat=True))
 
     # ─────────────────────────────────────────────
     # PUBLIC: reset auction
@@ -308,10 +415,13 @@ class AuctionEngine:
             sold_price=None, team=None,
             status=Player.STATUS_AVAILABLE, rebid_count=0
         )
-        config = TournamentConfig.objects.first()
-        for team in Team.objects.all():
-            team.remaining_points = config.total_points if config else 0
-            team.save()
+        config = TournamentConfig.current()
+        Team.objects.update(
+            remaining_points=config.total_points if config else 0,
+            squad_size=0, sold_ar=0, sold_bat=0, sold_bowl=0, sold_ply=0,
+            version=F("version") + 1,
+        )
+        Jersey.objects.update(team=None)   # numbers stay; they are re-checked on the next sale
 
         state                     = AuctionState.get()
         state.current_player      = None
@@ -322,6 +432,11 @@ class AuctionEngine:
         state.is_active           = False
         state.awaiting_transition = False
         state.transition_message  = ""
+        state.head_action         = None   # history stays in the log; it just can't be undone
+        state.redo_action         = None
         state.save()
 
         TournamentConfig.objects.all().delete()
+        DrawDeck.objects.all().delete()
+        self.replay.snapshot(AuctionSnapshot.REASON_RESET, from_tables=True)
+        self.events.publish("RESET")
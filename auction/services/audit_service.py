@@ -1,4 +1,12 @@
-from auction.models import AuctionAction
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from auction.models import AuctionAction, Player
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
 
 
 class AuditService:
@@ -28,6 +36,111 @@ class AuditService:
         return AuctionAction.objects.order_by("-timestamp")
 
 
+    # -------------------------------------
+    # FILTERS (category / round / team / action)
+    # Only known values are kept; anything else is ignored
+    # -------------------------------------
+
+    PAGE_SIZE = 50
+
+    def parse_filters(self, params):
+
+        filters = {}
+
+        category = params.get("category", "").upper()
+        if category in dict(Player.ROLE_CHOICES):
+            filters["category"] = category
+
+        for key in ("round", "team"):
+            value = params.get(key, "")
+            if value.isdigit():
+                filters[key] = int(value)
+
+        action = params.get("action", "").upper()
+        if action in dict(AuctionAction.ACTION_CHOICES):
+            filters["action"] = action
+
+        return filters
+
+    def filtered_actions(self, filters):
+
+        qs = AuctionAction.objects.select_related("player", "team")
+
+        if "category" in filters:
+            qs = qs.filter(category=filters["category"])
+        if "round" in filters:
+            qs = qs.filter(round=filters["round"])
+        if "team" in filters:
+            qs = qs.filter(team_id=filters["team"])
+        if "action" in filters:
+            qs = qs.filter(action=filters["action"])
+
+        return qs.order_by("-timestamp", "-id")
+
+
+    # -------------------------------------
+    # KEYSET PAGE (newest first)
+    # cursor = "<microseconds since epoch>.<id>" of the last row shown,
+    # so every page is an index range scan, however deep
+    # -------------------------------------
+
+    def page(self, filters, cursor=None, size=PAGE_SIZE):
+
+        qs  = self.filtered_actions(filters)
+        key = self.decode_cursor(cursor)
+
+        if key:
+            ts, pk = key
+            qs = qs.filter(Q(timestamp__lt=ts) | Q(timestamp=ts, id__lt=pk))
+
+        rows     = list(qs[:size + 1])
+        has_more = len(rows) > size
+        rows     = rows[:size]
+
+        return rows, (self.encode_cursor(rows[-1]) if has_more else None)
+
+    def encode_cursor(self, action):
+
+        ts = action.timestamp
+        if timezone.is_naive(ts):
+            ts = ts.replace(tzinfo=dt_timezone.utc)
+        delta = ts - EPOCH
+        return f"{(delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds}.{action.pk}"
+
+    def decode_cursor(self, cursor):
+
+        try:
+            micros, pk = (int(part) for part in (cursor or "").split("."))
+        except ValueError:
+            return None
+
+        ts = EPOCH + timedelta(microseconds=micros)
+        if not settings.USE_TZ:
+            ts = ts.replace(tzinfo=None)
+        return ts, pk
+
+
+    # -------------------------------------
+    # EXPORT — rows straight off a server-side iterator
+    # -------------------------------------
+
+    EXPORT_COLUMNS = ["id", "timestamp", "player", "team", "action", "amount", "round", "category"]
+
+    def export_rows(self, filters):
+
+        for a in self.filtered_actions(filters).iterator(chunk_size=2000):
+            yield {
+                "id":        a.pk,
+                "timestamp": a.timestamp.isoformat(),
+                "player":    a.player.name,
+                "team":      a.team.name if a.team else "",
+                "action":    a.action,
+                "amount":    a.amount,
+                "round":     a.round,
+                "category":  a.category,
+            }
+
+
     # -------------------------------------
     # GET LAST ACTION
     # -------------------------------------
@@ -1,13 +1,26 @@
-from auction.models import Player, Team, AuctionAction, AuctionState
+from django.db import transaction
+
+from auction.models import Player, Team, AuctionAction, AuctionState, AuctionSnapshot
 from auction.services.auction_engine import AuctionEngine
+from auction.services.event_service import EventService
+from auction.services.replay_service import ReplayService
 
 ICON_CATEGORIES = {"AR", "BAT", "BOWL"}
 
 
 class BiddingService:
 
+    """
+    Every command runs in one transaction that locks AuctionState first,
+    then the Player, then the Team (always in that order, so two workers
+    can never deadlock). A second click on the same player waits for the
+    first to commit and then finds it already handled.
+    """
+
     def __init__(self):
         self.engine = AuctionEngine()
+        self.events = EventService()
+        self.replay = ReplayService()
 
     # ─────────────────────────────────────────────
     # VALIDATE BID
@@ -39,8 +52,7 @@ class BiddingService:
 
         # Rule 3: safe bid — enough left to fill remaining slots
         if config:
-            squad_size      = team.player_set.filter(status=Player.STATUS_SOLD).count()
-            remaining_slots = config.bidding_slots - squad_size
+            remaining_slots = config.bidding_slots - team.squad_size
             if remaining_slots > 1:
                 min_per_slot   = config.total_points / 100
                 points_after   = team.remaining_points - amount
@@ -64,39 +76,38 @@ class BiddingService:
         Returns (success, error_message, allow_force).
         allow_force=True means a Force Sell button should be shown.
         """
-        player = Player.objects.get(serial_number=player_id)
-        team   = Team.objects.get(team_serial_number=team_id)
         amount = int(amount)
 
-        if not force:
-            error = self.validate_bid(player, team, amount)
-            if error:
-                return False, error, True  # allow_force=True for all bid errors
-
-        # Check if team is over slots (item 20)
-        config      = self.engine.config
-        squad_size  = team.player_set.filter(status=Player.STATUS_SOLD).count()
-        over_slots  = config and squad_size >= config.bidding_slots
-
-        if over_slots and not force:
-            return False, None, False  # signal: confirm_extra required
-
-        player.team       = team
-        player.sold_price = amount
-        player.status     = Player.STATUS_SOLD
-        player.save()   # model save() handles point deduction
-
-        state = AuctionState.get()
-        AuctionAction.objects.create(
-            player   = player,
-            team     = team,
-            action   = "SELL",
-            amount   = amount,
-            round    = state.auction_round,
-            category = state.current_category,
-        )
+        with transaction.atomic():
+            state  = AuctionState.lock()
+            player = Player.objects.select_for_update().get(serial_number=player_id)
+            team   = Team.objects.select_for_update().get(team_serial_number=team_id)
+
+            if player.status == Player.STATUS_SOLD:
+                return False, f"{player.name} is already sold.", False
+
+            if not force:
+                error = self.validate_bid(player, team, amount)
+                if error:
+                    return False, error, True  # allow_force=True for all bid errors
+
+            # Check if team is over slots (item 20)
+            config      = self.engine.config
+            over_slots  = config and team.squad_size >= config.bidding_slots
+
+            if over_slots and not force:
+                return False, None, False  # signal: confirm_extra required
+
+            prev_status       = player.status
+            player.team       = team
+            player.sold_price = amount
+            player.status     = Player.STATUS_SOLD
+            player.save()   # model save() handles point deduction
 
-        self.engine.clear_current_player()
+            self._record(state, player, "SELL", prev_status, team=team, amount=amount)
+
+            self.engine.clear_current_player()
+            self.events.publish("SELL", [team.team_serial_number])
         return True, None, False
 
     # ─────────────────────────────────────────────
@@ -106,84 +117,165 @@ class BiddingService:
     # ─────────────────────────────────────────────
 
     def mark_unsold(self, player_id):
-        player    = Player.objects.get(serial_number=player_id)
-        config    = self.engine.config
-        state     = AuctionState.get()
-
-        player.rebid_count += 1
-        player.status       = Player.STATUS_UNSOLD
-        action_type         = "UNSOLD"
-
-        # Auto-drop only for PLY
-        if player.role not in ICON_CATEGORIES and config:
-            if player.rebid_count >= config.max_rebid_attempts:
-                player.status = Player.STATUS_NOT_PLAYING
-                action_type   = "NOT_PLAYING"
-
-        player.save()
-
-        AuctionAction.objects.create(
-            player   = player,
-            action   = action_type,
-            round    = state.auction_round,
-            category = state.current_category,
-        )
+        with transaction.atomic():
+            state  = AuctionState.lock()
+            player = Player.objects.select_for_update().get(serial_number=player_id)
+            config = self.engine.config
+
+            # Already handled by an earlier click / another worker
+            if state.current_player_id != player.pk:
+                return
+
+            prev_status         = player.status
+            player.rebid_count += 1
+            player.status       = Player.STATUS_UNSOLD
+            action_type         = "UNSOLD"
+
+            # Auto-drop only for PLY
+            if player.role not in ICON_CATEGORIES and config:
+                if player.rebid_count >= config.max_rebid_attempts:
+                    player.status = Player.STATUS_NOT_PLAYING
+                    action_type   = "NOT_PLAYING"
+
+            player.save()
 
-        self.engine.clear_current_player()
+            self._record(state, player, action_type, prev_status, rebid=True)
+
+            self.engine.clear_current_player()
+            self.events.publish(action_type)
 
     # ─────────────────────────────────────────────
     # NOT PLAYING
     # ─────────────────────────────────────────────
 
     def mark_not_playing(self, player_id):
-        player = Player.objects.get(serial_number=player_id)
-        state  = AuctionState.get()
+        with transaction.atomic():
+            state  = AuctionState.lock()
+            player = Player.objects.select_for_update().get(serial_number=player_id)
 
-        player.status = Player.STATUS_NOT_PLAYING
-        player.save()
+            if state.current_player_id != player.pk:
+                return
 
-        AuctionAction.objects.create(
-            player   = player,
-            action   = "NOT_PLAYING",
-            round    = state.auction_round,
-            category = state.current_category,
-        )
+            prev_status   = player.status
+            player.status = Player.STATUS_NOT_PLAYING
+            player.save()
 
-        self.engine.clear_current_player()
+            self._record(state, player, "NOT_PLAYING", prev_status)
+
+            self.engine.clear_current_player()
+            self.events.publish("NOT_PLAYING")
 
     # ─────────────────────────────────────────────
-    # UNDO LAST ACTION
+    # UNDO / REDO
+    # The log is append-only: undo reverts state.head_action and links it
+    # to a new UNDO row; redo re-applies the UNDO row's target as a fresh
+    # action. Both follow one pointer — no scan of the log.
     # ─────────────────────────────────────────────
 
     def undo_last_action(self):
-        action = AuctionAction.objects.exclude(action="UNDO").last()
-        if not action:
-            return
+        with transaction.atomic():
+            state  = AuctionState.lock()
+            action = state.head_action
+            if not action:
+                return
+
+            player      = Player.objects.select_for_update().get(pk=action.player_id)
+            prev_status = player.status
+            self._revert(player, action)
+
+            undo = AuctionAction.objects.create(
+                player      = player,
+                action      = "UNDO",
+                round       = state.auction_round,
+                category    = state.current_category,
+                parent_id   = state.redo_action_id,
+                prev_status = prev_status,
+            )
+            action.reverted_by = undo
+            action.save(update_fields=["reverted_by"])
+
+            state.head_action_id = action.parent_id
+            state.redo_action    = undo
+            state.save(update_fields=["head_action", "redo_action", "updated_at"])
+
+            self.engine.restore_player(player)
+            self.replay.maybe_snapshot(undo)
+            self.events.publish("UNDO", [action.team_id])
+
+    def redo_last_undo(self):
+        """Returns False when there is nothing (valid) to redo."""
+        with transaction.atomic():
+            state = AuctionState.lock()
+            undo  = state.redo_action
+            if not undo:
+                return False
+
+            action = undo.reverts
+            player = Player.objects.select_for_update().get(pk=action.player_id)
+
+            # Player was changed outside the undo stack — redo would not restore the same state
+            if player.status != (action.prev_status or Player.STATUS_AVAILABLE):
+                state.redo_action = None
+                state.save(update_fields=["redo_action", "updated_at"])
+                self.replay.snapshot(AuctionSnapshot.REASON_MANUAL)
+                return False
+
+            prev_status = player.status
+            self._apply(player, action)
+
+            redo = self._record(state, player, action.action, prev_status,
+                                team_id=action.team_id, amount=action.amount,
+                                rebid=action.rebid, redo_action_id=undo.parent_id)
+            undo.reverted_by = redo
+            undo.save(update_fields=["reverted_by"])
+
+            if state.current_player_id == player.pk:
+                self.engine.clear_current_player()
+            self.events.publish("REDO", [action.team_id])
+        return True
 
-        player = action.player
+    # ─────────────────────────────────────────────
+    # EVENT LOG HELPERS
+    # ─────────────────────────────────────────────
 
+    def _record(self, state, player, action_type, prev_status, redo_action_id=None, **fields):
+        """Append a forward action and move the head cursor onto it. A new action clears the redo stack."""
+        action = AuctionAction.objects.create(
+            player      = player,
+            action      = action_type,
+            round       = state.auction_round,
+            category    = state.current_category,
+            parent_id   = state.head_action_id,
+            prev_status = prev_status,
+            **fields,
+        )
+        state.head_action    = action
+        state.redo_action_id = redo_action_id
+        state.save(update_fields=["head_action", "redo_action", "updated_at"])
+        self.replay.maybe_snapshot(action)
+        return action
+
+    @staticmethod
+    def _apply(player, action):
+        """Re-apply a forward action to the (locked) player."""
         if action.action == "SELL":
-            player.team       = None
-            player.sold_price = None
-            player.status     = Player.STATUS_AVAILABLE
-            player.save()   # model save() handles refund
-
+            player.team_id    = action.team_id
+            player.sold_price = action.amount
+            player.status     = Player.STATUS_SOLD
         elif action.action == "UNSOLD":
-            if player.rebid_count > 0:
-                player.rebid_count -= 1
-            player.status = Player.STATUS_AVAILABLE
-            player.save()
-
+            player.status = Player.STATUS_UNSOLD
         elif action.action == "NOT_PLAYING":
-            player.status = Player.STATUS_AVAILABLE
-            player.save()
+            player.status = Player.STATUS_NOT_PLAYING
+        player.rebid_count += int(action.rebid)
+        player.save()   # model save() handles the wallet
 
-        state = AuctionState.get()
-        AuctionAction.objects.create(
-            player   = player,
-            action   = "UNDO",
-            round    = state.auction_round,
-            category = state.current_category,
-        )
-        action.delete()
-        self.engine.restore_player(player)
+    @staticmethod
+    def _revert(player, action):
+        """Put the (locked) player back the way it was before the action."""
+        if action.action == "SELL":
+            player.team       = None
+            player.sold_price = None
+        if action.rebid and player.rebid_count > 0:
+            player.rebid_count -= 1
+        player.status = action.prev_status or Player.STATUS_AVAILABLE
+        player.save()   # model save() handles refund
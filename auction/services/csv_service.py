@@ -1,43 +1,119 @@
+import codecs
 import csv
+import os
 import re
 
+from django.db import IntegrityError, transaction
+
 from auction.models import Player, Team
 
 
 class CSVService:
 
+    """
+    Rows are parsed and validated one at a time; duplicates are checked
+    against a set of names loaded in one query, and valid rows are written
+    with bulk_create in batches, all inside one transaction. The unique
+    name constraints back that check up: a batch that still collides
+    (e.g. the same name added in the admin meanwhile) is retried row by
+    row and the losing rows are reported as duplicates.
+
+    `source` is a file path or an iterable of byte chunks (an upload's
+    .chunks()); chunks are decoded as they arrive, so memory stays at one
+    chunk plus one batch. `on_progress(rows, created, errors)` is called
+    after every batch and once at the end.
+    """
+
     PLAYER_REQUIRED = ["name", "role", "phone", "place"]
     TEAM_REQUIRED   = ["name"]
     VALID_ROLES     = ["BAT", "BOWL", "AR", "PLY"]
+    BATCH_SIZE      = 500
 
     def valid_phone(self, phone):
         return re.match(r"^\+?[0-9]{10,12}$", phone)
 
+    # ─────────────────────────────────────────────
+    # SOURCE → LINES (path or byte chunks)
+    # ─────────────────────────────────────────────
+
+    LINE = re.compile(r".*?(?:\r\n|\r|\n)", re.S)
+
+    def _lines(self, source):
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, newline="", encoding="utf-8") as f:
+                yield from f
+            return
+
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        tail    = ""
+        for chunk in source:
+            text = tail + decoder.decode(chunk)
+            # A trailing \r may be the first half of \r\n — wait for the next chunk
+            end  = len(text) - 1 if text.endswith("\r") else len(text)
+            pos  = 0
+            for m in self.LINE.finditer(text, 0, end):
+                yield m.group()
+                pos = m.end()
+            tail = text[pos:]
+
+        tail += decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    # ─────────────────────────────────────────────
+    # WRITE ONE BATCH — returns how many rows were rejected
+    # ─────────────────────────────────────────────
+
+    def _flush(self, model, batch, errors, label):
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in batch])
+            return 0
+        except IntegrityError:
+            pass
+
+        rejected = 0
+        for i, obj in batch:
+            try:
+                with transaction.atomic():
+                    obj.save()
+            except IntegrityError:
+                errors.append(f"Row {i} ({obj.name}): duplicate {label}")
+                rejected += 1
+        return rejected
+
     # ─────────────────────────────────────────────
     # VALIDATE PLAYERS CSV (no DB write) — item 2
     # ─────────────────────────────────────────────
 
-    def validate_players_csv(self, filepath):
-        return self._process_players_csv(filepath, dry_run=True)
+    def validate_players_csv(self, source, on_progress=None):
+        return self._process_players_csv(source, dry_run=True, on_progress=on_progress)
 
     # ─────────────────────────────────────────────
     # IMPORT PLAYERS CSV
     # ─────────────────────────────────────────────
 
-    def import_players(self, filepath):
-        return self._process_players_csv(filepath, dry_run=False)
+    def import_players(self, source, on_progress=None):
+        return self._process_players_csv(source, dry_run=False, on_progress=on_progress)
 
-    def _process_players_csv(self, filepath, dry_run=False):
+    def _process_players_csv(self, source, dry_run=False, on_progress=None):
         created = 0
         errors  = []
+        batch   = []
+        names   = set() if dry_run else set(Player.objects.values_list("name", flat=True))
 
-        with open(filepath, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+        with transaction.atomic():
+            reader = csv.DictReader(self._lines(source))
 
             if not reader.fieldnames or not all(c in reader.fieldnames for c in self.PLAYER_REQUIRED):
                 raise Exception(f"Invalid CSV header. Required columns: {', '.join(self.PLAYER_REQUIRED)}")
 
+            rows = 0
             for i, row in enumerate(reader, start=2):
+                if on_progress and rows and rows % self.BATCH_SIZE == 0:
+                    on_progress(rows, created, errors)
+                rows += 1
+
                 name  = row.get("name", "").strip()
                 role  = row.get("role", "").strip().upper()
                 phone = row.get("phone", "").strip()
@@ -52,47 +128,60 @@ class CSVService:
                 if not self.valid_phone(phone):
                     errors.append(f"Row {i} ({name}): invalid phone '{phone}'")
                     continue
-                if not dry_run and Player.objects.filter(name=name).exists():
+                if not dry_run and name in names:
                     errors.append(f"Row {i} ({name}): duplicate player")
                     continue
 
-                if not dry_run:
-                    try:
-                        Player.objects.create(name=name, role=role, phone=phone,
-                                              place=place, base_price=0, status="AVAILABLE")
-                        created += 1
-                    except Exception as e:
-                        errors.append(f"Row {i} ({name}): {e}")
-                else:
-                    created += 1  # count valid rows in dry-run
+                created += 1  # in dry-run: count valid rows
+                if dry_run:
+                    continue
+
+                names.add(name)
+                batch.append((i, Player(name=name, role=role, phone=phone,
+                                        place=place, base_price=0, status="AVAILABLE")))
+                if len(batch) >= self.BATCH_SIZE:
+                    created -= self._flush(Player, batch, errors, "player")
+                    batch = []
+
+            if batch:
+                created -= self._flush(Player, batch, errors, "player")
 
+        if on_progress:
+            on_progress(rows, created, errors)
         return created, errors
 
     # ─────────────────────────────────────────────
     # VALIDATE TEAMS CSV (no DB write) — item 14
     # ─────────────────────────────────────────────
 
-    def validate_teams_csv(self, filepath):
-        return self._process_teams_csv(filepath, dry_run=True)
+    def validate_teams_csv(self, source, on_progress=None):
+        return self._process_teams_csv(source, dry_run=True, on_progress=on_progress)
 
     # ─────────────────────────────────────────────
     # IMPORT TEAMS CSV — item 14
     # ─────────────────────────────────────────────
 
-    def import_teams(self, filepath):
-        return self._process_teams_csv(filepath, dry_run=False)
+    def import_teams(self, source, on_progress=None):
+        return self._process_teams_csv(source, dry_run=False, on_progress=on_progress)
 
-    def _process_teams_csv(self, filepath, dry_run=False):
+    def _process_teams_csv(self, source, dry_run=False, on_progress=None):
         created = 0
         errors  = []
+        batch   = []
+        names   = set() if dry_run else set(Team.objects.values_list("name", flat=True))
 
-        with open(filepath, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+        with transaction.atomic():
+            reader = csv.DictReader(self._lines(source))
 
             if not reader.fieldnames or "name" not in reader.fieldnames:
                 raise Exception("Invalid CSV header. Required column: name")
 
+            rows = 0
             for i, row in enumerate(reader, start=2):
+                if on_progress and rows and rows % self.BATCH_SIZE == 0:
+                    on_progress(rows, created, errors)
+                rows += 1
+
                 name       = row.get("name", "").strip()
                 short_name = row.get("short_name", "").strip()
                 owners     = row.get("owners", "").strip()
@@ -102,22 +191,28 @@ class CSVService:
                     errors.append(f"Row {i}: team name is empty")
                     continue
 
-                if not dry_run and Team.objects.filter(name=name).exists():
+                if not dry_run and name in names:
                     errors.append(f"Row {i} ({name}): duplicate team")
                     continue
 
-                if not dry_run:
-                    try:
-                        Team.objects.create(
-                            name=name,
-                            short_name=short_name,
-                            owners=owners,
-                            payment_info=int(payment) if payment.isdigit() else 0,
-                        )
-                        created += 1
-                    except Exception as e:
-                        errors.append(f"Row {i} ({name}): {e}")
-                else:
-                    created += 1
+                created += 1
+                if dry_run:
+                    continue
 
+                names.add(name)
+                batch.append((i, Team(
+                    name=name,
+                    short_name=short_name,
+                    owners=owners,
+                    payment_info=int(payment) if payment.isdigit() else 0,
+                )))
+                if len(batch) >= self.BATCH_SIZE:
+                    created -= self._flush(Team, batch, errors, "team")
+                    batch = []
+
+            if batch:
+                created -= self._flush(Team, batch, errors, "team")
+
+        if on_progress:
+            on_progress(rows, created, errors)
         return created, errors
@@ -0,0 +1,291 @@
+import json
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.template.loader import render_to_string
+
+from auction.models import Team, TournamentConfig, AuctionState, BoardEvent
+from auction.services.roster_service import RosterService
+from config.logging_config import error_logger
+
+# How many events each process keeps in memory for connected clients
+FEED_BUFFER     = 200
+# How often each process checks the DB for events published by other workers
+POLL_INTERVAL   = 1.0
+# Comment line sent to idle clients so proxies keep the connection open
+HEARTBEAT       = 15
+# Streams are closed after this long; EventSource reconnects with Last-Event-ID
+STREAM_LIFETIME = 300
+# Rows kept in the BoardEvent table
+KEEP_EVENTS     = 500
+# Rendered team cards; a stale version is never read again, so this only frees space
+CARD_TTL        = 6 * 3600
+
+MODE_PRE  = "pre"
+MODE_LIVE = "live"
+MODE_DONE = "done"
+
+
+def board_mode(state, config):
+    """Which layout the public board is showing: pre-auction, live or done."""
+    if config is None or not (state.is_active or state.phase == AuctionState.PHASE_DONE):
+        return MODE_PRE
+    if state.phase == AuctionState.PHASE_DONE:
+        return MODE_DONE
+    return MODE_LIVE
+
+
+class _EventFeed:
+    """
+    Per-process fan-out of BoardEvent rows to connected SSE clients.
+    A single poller thread reads new rows from the DB (the only source, so
+    events from every gunicorn worker arrive in id order) and wakes every
+    waiting client; idle clients issue no queries of their own.
+    """
+
+    def __init__(self):
+        self._cond        = threading.Condition()
+        self._events      = deque(maxlen=FEED_BUFFER)
+        self._last_id     = None
+        self._subscribers = 0
+        self._streams     = 0
+        self._thread      = None
+
+    @property
+    def last_id(self):
+        self._ensure_started()
+        return self._last_id
+
+    def push(self, event):
+        with self._cond:
+            if self._last_id is not None and event["id"] <= self._last_id:
+                return
+            self._events.append(event)
+            self._last_id = event["id"]
+            self._cond.notify_all()
+
+    def wait(self, after_id, timeout):
+        """Block until events newer than after_id exist; returns them (maybe [])."""
+        self._ensure_started()
+        with self._cond:
+            self._subscribers += 1
+            try:
+                self._cond.wait_for(lambda: self._last_id > after_id, timeout=timeout)
+                return [e for e in self._events if e["id"] > after_id]
+            finally:
+                self._subscribers -= 1
+
+    def open_stream(self):
+        """
+        Take one of this process's stream slots; False when they're all in use.
+        Each open stream holds a worker thread, so the cap keeps threads free
+        for the auctioneer's requests.
+        """
+        with self._cond:
+            if self._streams >= settings.BOARD_STREAM_LIMIT:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        with self._cond:
+            self._streams -= 1
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is not None:
+                return
+            latest = BoardEvent.objects.order_by("-pk").values_list("pk", flat=True).first()
+            self._last_id = latest or 0
+            self._thread  = threading.Thread(target=self._poll, name="board-event-feed", daemon=True)
+            self._thread.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(POLL_INTERVAL)
+            if not self._subscribers:
+                continue
+            try:
+                rows = BoardEvent.objects.filter(pk__gt=self._last_id).order_by("pk")[:FEED_BUFFER]
+                for row in rows:
+                    self.push(EventService.as_dict(row))
+            except Exception as e:
+                error_logger.error(f"board event feed poll failed: {e}")
+            finally:
+                close_old_connections()
+
+
+_feed = _EventFeed()
+
+
+class _BoardStream:
+    """
+    SSE generator plus the slot it holds. StreamingHttpResponse calls
+    close() when the client goes away, even if the body was never read.
+    """
+
+    def __init__(self, feed, events):
+        self.feed   = feed
+        self.events = events
+
+    def __iter__(self):
+        return self.events
+
+    def close(self):
+        self.events.close()
+        if self.feed is not None:
+            self.feed.close_stream()
+            self.feed = None
+
+
+class EventService:
+
+    def __init__(self, feed=None):
+        self.feed    = feed or _feed
+        self.rosters = RosterService()
+
+    # ─────────────────────────────────────────────
+    # PUBLISH
+    # Called by BiddingService / AuctionEngine after every change.
+    # Runs after commit so fragments reflect the saved rows.
+    # ─────────────────────────────────────────────
+
+    def publish(self, kind, team_ids=(), reload=False):
+        """
+        reload=True tells open boards to re-fetch the whole page
+        (settings, imports, admin edits — anything without a fragment).
+        """
+        team_ids = [t for t in team_ids if t]
+        transaction.on_commit(lambda: self._publish_now(kind, team_ids, reload))
+
+    def _publish_now(self, kind, team_ids, reload=False):
+        payload = self.build_payload(team_ids)
+        if reload:
+            payload["reload"] = True
+        event = BoardEvent.objects.create(kind=kind, payload=payload)
+        if event.pk % 100 == 0:
+            BoardEvent.objects.filter(pk__lte=event.pk - KEEP_EVENTS).delete()
+        return event
+
+    def build_payload(self, team_ids=()):
+        state  = AuctionState.get()
+        config = TournamentConfig.current()
+        mode   = board_mode(state, config)
+
+        fragments = {}
+        if mode == MODE_LIVE:
+            fragments["onblock"] = self.render_onblock(state)
+            if team_ids:
+                teams = Team.objects.filter(team_serial_number__in=team_ids)
+                for pk, card in self.team_cards(teams).items():
+                    fragments[f"team-{pk}"] = card
+
+        return {"mode": mode, "fragments": fragments}
+
+    # ─────────────────────────────────────────────
+    # VERSION
+    # Id of the newest BoardEvent. Every change to what the public pages
+    # show publishes an event, so this only moves when they need a refresh.
+    # ─────────────────────────────────────────────
+
+    def current_version(self):
+        return BoardEvent.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+    # ─────────────────────────────────────────────
+    # FRAGMENTS (shared with the public_board view)
+    # ─────────────────────────────────────────────
+
+    def onblock_context(self, state):
+        return {
+            "player":    state.current_player,
+            "state":     state,
+            "remaining": self.rosters.slot_remaining(state),
+        }
+
+    def render_onblock(self, state):
+        return render_to_string("partials/board_onblock.html", self.onblock_context(state))
+
+    def render_team(self, team):
+        """`team` must come from RosterService.load_rosters (needs .sold_players)."""
+        return render_to_string("partials/board_team.html", {"team": team})
+
+    # ─────────────────────────────────────────────
+    # TEAM CARD CACHE
+    # Cards are keyed on Team.version, which every sale, undo, wallet
+    # rebuild and jersey / team edit bumps. Only teams whose version moved
+    # are loaded and rendered; the rest come straight from the cache.
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def card_key(pk, version):
+        return f"board-team:{pk}:{version}"
+
+    def team_cards(self, teams):
+        """{team pk: rendered card} for `teams` (plain Team rows, no rosters needed)."""
+        keys   = {self.card_key(t.pk, t.version): t.pk for t in teams}
+        cached = cache.get_many(keys)
+        cards  = {keys[key]: html for key, html in cached.items()}
+
+        stale = [pk for pk in keys.values() if pk not in cards]
+        if stale:
+            fresh = {}
+            for team in self.rosters.load_rosters(Team.objects.filter(pk__in=stale)):
+                cards[team.pk] = self.render_team(team)
+                fresh[self.card_key(team.pk, team.version)] = cards[team.pk]
+            cache.set_many(fresh, CARD_TTL)
+        return cards
+
+    # ─────────────────────────────────────────────
+    # STREAM (server-sent events)
+    # ─────────────────────────────────────────────
+
+    def open_stream(self, last_event_id=None):
+        """The client's stream, or None when this process is at BOARD_STREAM_LIMIT."""
+        if not self.feed.open_stream():
+            return None
+        return _BoardStream(self.feed, self.stream(last_event_id))
+
+    def stream(self, last_event_id=None):
+        yield "retry: 3000\n\n"
+
+        if last_event_id is not None:
+            # Reconnect: replay what the client missed, straight from the table
+            missed = [self.as_dict(row) for row in
+                      BoardEvent.objects.filter(pk__gt=last_event_id).order_by("pk")[:FEED_BUFFER]]
+            cursor = missed[-1]["id"] if missed else last_event_id
+        else:
+            missed = []
+            cursor = self.feed.last_id
+
+        # The stream outlives its request by minutes and only reads the
+        # in-memory feed from here on: give the DB connection back now
+        # instead of holding it (conn_max_age) until the client hangs up.
+        if not connection.in_atomic_block:
+            connection.close()
+
+        for event in missed:
+            yield self.format_event(event)
+
+        started = time.monotonic()
+        while time.monotonic() - started < STREAM_LIFETIME:
+            events = self.feed.wait(cursor, HEARTBEAT)
+            if not events:
+                yield ": ping\n\n"
+                continue
+            for event in events:
+                cursor = event["id"]
+                yield self.format_event(event)
+
+    @staticmethod
+    def as_dict(event):
+        return {"id": event.pk, "kind": event.kind, **event.payload}
+
+    @staticmethod
+    def format_event(event):
+        return f"id: {event['id']}\nevent: board\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,183 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from auction.models import Match
+
+KNOCKOUT_SIZES = (2, 4, 8, 16)
+
+
+def round_name(matches):
+    """Label of a knockout round with this many matches."""
+    return {1: "Final", 2: "Semi-Final", 4: "Quarter-Final"}.get(matches, f"Round of {matches * 2}")
+
+
+class FixtureService:
+
+    """
+    League and knockout fixtures. Existing league pairs are read into a
+    set once, schedules are built in memory and written with one
+    bulk_create, so generating a full season is a handful of queries
+    however many teams there are.
+    """
+
+    # ─────────────────────────────────────────────
+    # HELPERS
+    # ─────────────────────────────────────────────
+
+    def league_pairs(self):
+        """Unordered team-id pairs that already have a league match."""
+        return {
+            frozenset(pair)
+            for pair in Match.objects.filter(stage=Match.STAGE_LEAGUE).order_by().values_list("team1_id", "team2_id")
+        }
+
+    def next_match_number(self):
+        return (Match.objects.aggregate(last=Max("match_number"))["last"] or 0) + 1
+
+    @staticmethod
+    def parse_start(value):
+        """Form datetime string → aware datetime, or None."""
+        start = parse_datetime(value) if isinstance(value, str) and value else value or None
+        if start is not None and timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        return start
+
+    @staticmethod
+    def shift_days(start, days):
+        """Same local wall-clock time `days` later (stays put across DST changes)."""
+        if start is None:
+            return None
+        return timezone.make_aware(timezone.make_naive(start) + timedelta(days=days))
+
+    @staticmethod
+    def parse_venues(value):
+        """'Ground A, Ground B' → ["Ground A", "Ground B"]."""
+        return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+    # ─────────────────────────────────────────────
+    # ROUND ROBIN (circle method)
+    # Team 0 stays put, the rest rotate one place per round. Every round
+    # has each team at most once, so a round is one match day. Team 0
+    # alternates home / away; the other pairs swap sides every round.
+    # ─────────────────────────────────────────────
+
+    def circle_rounds(self, teams):
+        """[[(home, away), ...] per round] for a single round robin; odd counts get a bye."""
+        slots = list(teams) + ([None] if len(teams) % 2 else [])
+        n     = len(slots)
+        rounds = []
+        for r in range(n - 1):
+            pairs = []
+            for i in range(n // 2):
+                a, b = slots[i], slots[n - 1 - i]
+                if a is None or b is None:
+                    continue   # bye
+                pairs.append((a, b) if (r + i) % 2 == 0 else (b, a))
+            rounds.append(pairs)
+            slots = [slots[0], slots[-1]] + slots[1:-1]
+        return rounds
+
+    def generate_league(self, teams, round_label="League", start=None, venues=(), days_between=1):
+        """
+        Create the missing league matches for `teams`. Returns (created, skipped).
+        Round r is played on start + r * days_between; venues rotate so a
+        team doesn't keep the same ground.
+        """
+        start  = self.parse_start(start)
+        venues = list(venues)
+
+        with transaction.atomic():
+            existing = self.league_pairs()
+            number   = self.next_match_number()
+            matches  = []
+            skipped  = 0
+
+            for r, pairs in enumerate(self.circle_rounds(teams)):
+                day = self.shift_days(start, r * days_between)
+                for i, (home, away) in enumerate(pairs):
+                    if frozenset((home.pk, away.pk)) in existing:
+                        skipped += 1
+                        continue
+                    matches.append(Match(
+                        match_number   = number,
+                        round_label    = round_label,
+                        stage          = Match.STAGE_LEAGUE,
+                        round_number   = r + 1,
+                        team1          = home,
+                        team2          = away,
+                        scheduled_date = day,
+                        venue          = venues[(r + i) % len(venues)] if venues else "",
+                    ))
+                    number += 1
+
+            Match.objects.bulk_create(matches, batch_size=500)
+
+        return len(matches), skipped
+
+    # ─────────────────────────────────────────────
+    # KNOCKOUT
+    # Seeds 1..N (N a power of two) meet in the usual bracket order
+    # (1 v N, then N/2 v N/2+1 ...), so the top two can only meet in the
+    # final. Later rounds are created from the winners by advance_knockout.
+    # ─────────────────────────────────────────────
+
+    @staticmethod
+    def bracket_order(size):
+        """Seed numbers (1-based) in bracket position order."""
+        order = [1]
+        while len(order) < size:
+            total = len(order) * 2 + 1
+            order = [s for seed in order for s in (seed, total - seed)]
+        return order
+
+    def generate_knockout(self, seeded_teams, start=None, venues=()):
+        """First knockout round for the seeded teams (best first). Returns matches created."""
+        size = len(seeded_teams)
+        if size not in KNOCKOUT_SIZES:
+            raise ValueError(f"A knockout needs {', '.join(map(str, KNOCKOUT_SIZES))} teams, not {size}.")
+        if Match.objects.filter(stage=Match.STAGE_KNOCKOUT).exists():
+            raise ValueError("Knockout fixtures already exist — clear them first.")
+
+        order = self.bracket_order(size)
+        pairs = [(seeded_teams[order[i] - 1], seeded_teams[order[i + 1] - 1]) for i in range(0, size, 2)]
+        return self._create_round(pairs, 1, self.parse_start(start), list(venues))
+
+    def advance_knockout(self, start=None, venues=()):
+        """Create the next knockout round from the latest one's winners. Returns matches created."""
+        latest = Match.objects.filter(stage=Match.STAGE_KNOCKOUT).aggregate(r=Max("round_number"))["r"]
+        if latest is None:
+            raise ValueError("No knockout round to advance from.")
+
+        current = list(Match.objects.filter(stage=Match.STAGE_KNOCKOUT, round_number=latest)
+                       .select_related("winner").order_by("bracket_slot"))
+        if len(current) == 1:
+            raise ValueError("The final is the last round.")
+        if any(m.winner_id is None for m in current):
+            raise ValueError("Record a winner for every match in this round first.")
+
+        pairs = [(current[i].winner, current[i + 1].winner) for i in range(0, len(current), 2)]
+        return self._create_round(pairs, latest + 1, self.parse_start(start), list(venues))
+
+    def _create_round(self, pairs, round_number, start, venues):
+        label  = round_name(len(pairs))
+        number = self.next_match_number()
+        matches = [
+            Match(
+                match_number   = number + slot,
+                round_label    = label,
+                stage          = Match.STAGE_KNOCKOUT,
+                round_number   = round_number,
+                bracket_slot   = slot,
+                team1          = home,
+                team2          = away,
+                scheduled_date = start,
+                venue          = venues[slot % len(venues)] if venues else "",
+            )
+            for slot, (home, away) in enumerate(pairs)
+        ]
+        Match.objects.bulk_create(matches)
+        return len(matches)
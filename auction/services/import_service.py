@@ -0,0 +1,157 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from auction.models import ImportJob
+from auction.services.csv_service import CSVService
+from auction.services.event_service import EventService
+from config.logging_config import error_logger
+
+STALE_AFTER = timedelta(minutes=5)   # RUNNING with no heartbeat this long → worker died
+RETRY_AFTER = timedelta(seconds=30)  # QUEUED this long → start callback was lost
+
+# One import at a time per process; the database is the only shared state,
+# so this works on a single box with no broker.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-import")
+# Jobs handed to _executor and not finished yet: a poll never queues one twice
+_submitted      = {}
+_submitted_lock = threading.Lock()
+
+# An import's rows commit in one transaction, so its progress can't be
+# written through that transaction. Progress of jobs running in this
+# process is kept here for polls served by this process and, where the
+# database takes a second writer, copied to the job row from another
+# thread (its own connection, autocommit). SQLite has one write lock,
+# held by the import, so there the row is only updated at the end.
+_progress        = {}
+_progress_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-import-progress")
+
+
+class ImportService:
+
+    """
+    Background CSV imports. enqueue() stores the upload as an ImportJob and,
+    once the request commits, hands it to a local worker thread. The worker
+    claims the job with a conditional UPDATE (so a job runs once even if two
+    processes try) and runs CSVService in one transaction: the rows and
+    the DONE status commit together, and a failed job imported nothing.
+    Progress is written outside that transaction for the upload page to poll.
+    """
+
+    def __init__(self):
+        self.csv    = CSVService()
+        self.events = EventService()
+
+    # ─────────────────────────────────────────────
+    # ENQUEUE (request thread)
+    # ─────────────────────────────────────────────
+
+    def enqueue(self, csv_type, uploaded):
+        job = ImportJob.objects.create(csv_type=csv_type, file=uploaded)
+        transaction.on_commit(lambda: self.start(job.pk))
+        return job
+
+    def start(self, job_id):
+        with _submitted_lock:
+            pending = _submitted.get(job_id)
+            if pending is not None and not pending.done():
+                return   # still waiting behind an earlier import
+            _submitted[job_id] = _executor.submit(self._run_in_thread, job_id)
+
+    # ─────────────────────────────────────────────
+    # POLL (request thread) — also recovers lost / dead jobs
+    # ─────────────────────────────────────────────
+
+    def status(self, job_id):
+        job = ImportJob.objects.get(pk=job_id)
+        now = timezone.now()
+
+        if job.status == ImportJob.STATUS_RUNNING and job.pk in _progress:
+            for field, value in _progress[job.pk].items():
+                setattr(job, field, value)
+
+        if job.status == ImportJob.STATUS_QUEUED and now - job.created_at > RETRY_AFTER:
+            self.start(job.pk)
+
+        elif (job.status == ImportJob.STATUS_RUNNING
+                and now - (job.heartbeat_at or job.created_at) > STALE_AFTER):
+            failed = ImportJob.objects.filter(pk=job.pk, status=ImportJob.STATUS_RUNNING).update(
+                status=ImportJob.STATUS_FAILED, finished_at=now,
+                message="Import worker stopped — nothing was imported; re-upload the file.",
+            )
+            if failed:
+                job.file.delete(save=False)
+            job.refresh_from_db()
+
+        return job
+
+    # ─────────────────────────────────────────────
+    # RUN (worker thread)
+    # ─────────────────────────────────────────────
+
+    def _run_in_thread(self, job_id):
+        try:
+            self.run(job_id)
+        finally:
+            connection.close()   # this thread's own DB connection
+            with _submitted_lock:
+                _submitted.pop(job_id, None)
+
+    @staticmethod
+    def _save_progress(job_id, fields):
+        try:
+            ImportJob.objects.filter(pk=job_id, status=ImportJob.STATUS_RUNNING).update(**fields)
+        except Exception as e:
+            error_logger.error(f"CSV import job {job_id}: progress not saved: {e}")
+        finally:
+            connection.close()
+
+    def run(self, job_id):
+        claimed = ImportJob.objects.filter(pk=job_id, status=ImportJob.STATUS_QUEUED).update(
+            status=ImportJob.STATUS_RUNNING, heartbeat_at=timezone.now()
+        )
+        if not claimed:
+            return  # already taken by another worker
+
+        job = ImportJob.objects.get(pk=job_id)
+
+        def progress(rows, created, errors):
+            fields = {
+                "rows_done": rows, "created": created, "error_count": len(errors),
+                "errors": errors[:ImportJob.MAX_ERRORS], "heartbeat_at": timezone.now(),
+            }
+            _progress[job_id] = fields
+            if connection.vendor != "sqlite":
+                _progress_writer.submit(self._save_progress, job_id, fields)
+
+        try:
+            with transaction.atomic():
+                with job.file.open("rb") as f:
+                    if job.csv_type == "teams":
+                        created, errors = self.csv.import_teams(f.chunks(), on_progress=progress)
+                    else:
+                        created, errors = self.csv.import_players(f.chunks(), on_progress=progress)
+
+                finished = ImportJob.objects.filter(pk=job_id, status=ImportJob.STATUS_RUNNING).update(
+                    status=ImportJob.STATUS_DONE, finished_at=timezone.now(), **_progress[job_id]
+                )
+                if not finished:
+                    # A poll gave up on this job (no heartbeat for STALE_AFTER)
+                    raise RuntimeError("job was marked failed while it ran")
+        except Exception as e:
+            error_logger.error(f"CSV import job {job_id} failed: {e}")
+            ImportJob.objects.filter(pk=job_id).update(
+                status=ImportJob.STATUS_FAILED, finished_at=timezone.now(),
+                message=f"{str(e)[:240]} — nothing was imported.",
+                **_progress.get(job_id, {}),
+            )
+            return
+        finally:
+            _progress.pop(job_id, None)
+            job.file.delete(save=False)   # done or failed, the upload isn't needed again
+
+        if created:
+            self.events.publish("IMPORT", reload=True)
@@ -1,12 +1,70 @@
-from io import BytesIO
+import csv
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
 
 from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.text import slugify
 
-from auction.models import Jersey
+from auction.models import Player, Team, TournamentConfig, Jersey, ExtraJerseyMember
+from auction.services.roster_service import RosterService
+from auction.utils.jersey_pdf import render_sheet, sheet_table
+from config.logging_config import error_logger
+
+# Bump when the PDF layout changes so cached files are rebuilt
+PDF_LAYOUT  = 2
+UNASSIGNED  = "Unassigned"
+PDF_HEADER  = ["Player", "Jersey Name", "Number", "Size", "Sponsor"]
+NO_SIZE     = "No size"
+
+SQUAD_HEADER = ["#", "Player", "Role", "Jersey Name", "Number", "Size"]
+EXTRA_HEADER = ["Name", "Role", "Jersey Name", "Number"]
+
+# One PDF build at a time per process; edits made during a build queue one more
+_executor      = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jersey-pdf")
+_build_lock    = threading.Lock()
+_pending       = threading.Event()
+
+# Vendor bundle sheets render in one shared process pool, started on first
+# use with forkserver (spawn where that's missing): forking a threaded
+# gunicorn worker can deadlock. Small bundles and 1-CPU hosts render in
+# the request thread, where the pool's overhead would cost more than it saves.
+PARALLEL_MIN_SHEETS = 6
+_render_pool      = None
+_render_pool_lock = threading.Lock()
+
+
+def render_pool():
+    """The shared vendor bundle pool, started on first use."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _render_pool = ProcessPoolExecutor(max_workers=max(2, os.cpu_count() or 1), mp_context=context)
+        return _render_pool
+
+
+def drop_render_pool(pool):
+    """Forget a broken pool so the next bundle starts a fresh one."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
 
 
 class JerseyService:
@@ -49,42 +107,529 @@ class JerseyService:
 
 
     # ----------------------------------------
-    # EXPORT JERSEY LIST PDF
+    # JERSEY LIST ROWS + DATA VERSION
+    # One query; the version is a hash of exactly what the PDF prints,
+    # so any edit (jersey, player name, team name) gives a new file.
     # ----------------------------------------
 
-    def export_pdf(self):
+    def export_rows(self):
+
+        return list(
+            Jersey.objects.order_by(
+                F("player__team__name").asc(nulls_last=True), "player__name", "pk"
+            ).values_list(
+                "player__team__name", "player__name", "jersey_name",
+                "jersey_number", "size_text", "sponsor",
+            )
+        )
 
-        jerseys = Jersey.objects.select_related("player").all()
+    def data_version(self, rows):
 
-        buffer = BytesIO()
+        blob = json.dumps([PDF_LAYOUT, rows], default=str).encode()
+        return hashlib.sha1(blob).hexdigest()[:16]
 
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
 
-        data = [
-            ["Player", "Jersey Name", "Number", "Size", "Sponsor"]
-        ]
+    # ----------------------------------------
+    # EXPORT JERSEY LIST PDF
+    # One section per team; long tables break across pages with the
+    # header row repeated, instead of one giant flowable.
+    # ----------------------------------------
 
-        for j in jerseys:
+    def export_pdf(self, out, rows=None):
 
-            data.append([
-                j.player.name,
-                j.jersey_name,
-                j.jersey_number,
-                j.size_text,
-                j.sponsor
-            ])
+        rows   = self.export_rows() if rows is None else rows
+        styles = getSampleStyleSheet()
+        doc    = SimpleDocTemplate(out, pagesize=A4, title="Jersey List")
 
-        table = Table(data)
+        teams = {}
+        for team, *row in rows:
+            teams.setdefault(team or UNASSIGNED, []).append(row)
 
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-            ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ]))
+        elements = []
+        for name, team_rows in teams.items():
+            if elements:
+                elements.append(PageBreak())
+            elements.append(Paragraph(f"{name} ({len(team_rows)})", styles["Heading2"]))
+            elements.append(Spacer(1, 6))
+            elements.append(self.jersey_table(team_rows))
 
-        elements = [table]
+        if not elements:
+            elements.append(Paragraph("No jerseys entered yet.", styles["Normal"]))
 
         doc.build(elements)
 
-        buffer.seek(0)
+        return out
+
+    def jersey_table(self, rows):
+
+        return sheet_table(PDF_HEADER, rows)
+
+
+    # ----------------------------------------
+    # CACHED PDF (media/exports/jerseys-<version>.pdf)
+    # ----------------------------------------
+
+    def export_dir(self):
+
+        return os.path.join(settings.MEDIA_ROOT, "exports")
+
+    def export_path(self, version):
+
+        return os.path.join(self.export_dir(), f"jerseys-{version}.pdf")
+
+    def cached_pdf(self):
+        """
+        (open file, version) of the PDF for the current data. Built here
+        only if the background build hasn't produced it yet.
+        """
+        rows    = self.export_rows()
+        version = self.data_version(rows)
+        path    = self.export_path(version)
+        try:
+            return open(path, "rb"), version
+        except FileNotFoundError:
+            return open(self.build_pdf(rows, version), "rb"), version
+
+    def build_pdf(self, rows, version):
+
+        path = self.export_path(version)
+        with _build_lock:
+            if os.path.exists(path):
+                return path   # another request / the worker got there first
+
+            os.makedirs(self.export_dir(), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as out:
+                self.export_pdf(out, rows)
+            os.replace(tmp, path)
+
+            for old in glob.glob(os.path.join(self.export_dir(), "jerseys-*.pdf")):
+                if old != path:
+                    try:
+                        os.remove(old)
+                    except FileNotFoundError:
+                        pass   # another worker cleaned it up
+        return path
+
+
+    # ----------------------------------------
+    # BACKGROUND REBUILD — called after jersey edits, runs once they commit
+    # ----------------------------------------
+
+    def schedule_pdf(self):
+
+        transaction.on_commit(self._submit)
+
+    def _submit(self):
+
+        if _pending.is_set():
+            return   # a queued build will read the newest rows anyway
+        _pending.set()
+        _executor.submit(self._rebuild_in_thread)
+
+    def _rebuild_in_thread(self):
+
+        _pending.clear()
+        try:
+            rows = self.export_rows()
+            self.build_pdf(rows, self.data_version(rows))
+        except Exception as e:
+            error_logger.error(f"jersey PDF rebuild failed: {e}")
+        finally:
+            connection.close()   # this thread's own DB connection
+
+
+    # ----------------------------------------
+    # VENDOR BUNDLE (ZIP)
+    # One PDF per team (squad + team extras), one for organisers and a
+    # size / quantity summary. Rows are read here; the PDFs are rendered
+    # in a process pool and each is written to the ZIP as it finishes.
+    # ----------------------------------------
+
+    def size_label(self, jersey, mapping):
+
+        if jersey is None:
+            return ""
+        return mapping.get(jersey.size_number) or jersey.size_text or ""
+
+    def bundle_sheets(self):
+        """[(filename, title, sections)] plus the summary (header, rows)."""
+        config  = TournamentConfig.current()
+        mapping = (config or TournamentConfig()).get_size_mapping()
+        teams   = RosterService().load_rosters(Team.objects.order_by("name"))
+
+        extras = {}
+        for em in ExtraJerseyMember.objects.filter(member_type=ExtraJerseyMember.TYPE_TEAM).order_by("name"):
+            extras.setdefault(em.team_id, []).append(em)
+
+        labels  = list(dict.fromkeys(mapping.values()))
+        sheets  = []
+        summary = []
+        for n, team in enumerate(teams, start=1):
+            squad = [
+                [p.serial_number, p.name, p.role,
+                 p.jersey.jersey_name if p.jersey else "",
+                 p.jersey.jersey_number if p.jersey else "",
+                 self.size_label(p.jersey, mapping)]
+                for p in team.sold_players
+            ]
+            team_extras = [[em.name, em.role_label, em.jersey_name, em.jersey_number or ""]
+                           for em in extras.get(team.pk, [])]
+            sheets.append((
+                f"teams/{n:02}-{slugify(team.name) or team.pk}.pdf",
+                team.name,
+                [("Squad", SQUAD_HEADER, squad), ("Team extras", EXTRA_HEADER, team_extras)],
+            ))
+
+            sizes = {}
+            for row in squad:
+                sizes[row[5] or NO_SIZE] = sizes.get(row[5] or NO_SIZE, 0) + 1
+            sizes[NO_SIZE] = sizes.get(NO_SIZE, 0) + len(team_extras)   # extras carry no size
+            labels += [l for l in sizes if l not in labels and l != NO_SIZE]
+            summary.append((team.name, sizes))
+
+        groups = {}
+        for em in ExtraJerseyMember.objects.filter(member_type=ExtraJerseyMember.TYPE_ORGANISER).order_by("group_name", "name"):
+            groups.setdefault(em.group_name, []).append(
+                [em.name, em.role_label, em.jersey_name, em.jersey_number or ""]
+            )
+        sheets.append(("organisers.pdf", "Organisers",
+                       [(name, EXTRA_HEADER, rows) for name, rows in groups.items()]))
+        if groups:
+            summary.append(("Organisers", {NO_SIZE: sum(len(rows) for rows in groups.values())}))
+
+        labels.append(NO_SIZE)
+        header = ["Team"] + labels + ["Total"]
+        rows   = [[name] + [sizes.get(l, 0) for l in labels] + [sum(sizes.values())]
+                  for name, sizes in summary]
+        rows.append(["Total"] + [sum(r[i] for r in rows) for i in range(1, len(header))])
+        sheets.append(("size_summary.pdf", "Jersey sizes", [("Quantity per size", header, rows)]))
+
+        return sheets, (header, rows)
+
+    def stream_bundle(self, sheets, summary, parallel=None):
+        """
+        Yields the ZIP in chunks. parallel=None renders in the shared pool
+        when there are several CPUs and enough sheets; sheets go in as
+        they finish, fastest first.
+        """
+        if parallel is None:
+            parallel = (os.cpu_count() or 1) > 1 and len(sheets) >= PARALLEL_MIN_SHEETS
+
+        out = _ZipOutput()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as bundle:
+            text = io.StringIO()
+            csv.writer(text).writerows([summary[0]] + summary[1])
+            bundle.writestr("size_summary.csv", text.getvalue())
+            yield out.take()
+
+            for name, pdf in (self.render_parallel(sheets) if parallel else self.render_inline(sheets)):
+                bundle.writestr(name, pdf)
+                yield out.take()
+        yield out.take()   # central directory
+
+    @staticmethod
+    def render_inline(sheets):
+        """Renders in the request thread, in sheet order."""
+        for name, title, sections in sheets:
+            yield name, render_sheet(title, sections)
+
+    @staticmethod
+    def render_parallel(sheets):
+        """Renders in the shared pool; yields (name, pdf) as each finishes."""
+        pool    = render_pool()
+        futures = {}
+        try:
+            futures = {pool.submit(render_sheet, title, sections): name for name, title, sections in sheets}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        except BrokenProcessPool:
+            drop_render_pool(pool)
+            raise
+        finally:
+            for future in futures:
+                future.cancel()   # client went away: don't render the rest
+
+
+    # ----------------------------------------
+    # BATCH EDIT (JSON API)
+    # rows: [{"player_id" | "extra_id", "jersey_name", "jersey_number",
+    # "size_number"}]. Missing keys leave the field as it is. Numbers
+    # must be unique within a team (squad + team extras); a clash fails
+    # that row only. Valid rows are written with bulk_update /
+    # bulk_create in one transaction.
+    # ----------------------------------------
+
+    def apply_batch(self, rows):
+
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of rows.")
+
+        config   = TournamentConfig.current()
+        mapping  = (config or TournamentConfig()).get_size_mapping()
+        results  = [None] * len(rows)
+
+        player_ids = {as_pk(r.get("player_id")) for r in rows if isinstance(r, dict)} - {None}
+        extra_ids  = {as_pk(r.get("extra_id"))  for r in rows if isinstance(r, dict)} - {None}
+
+        with transaction.atomic():
+            players = Player.objects.select_for_update().in_bulk(player_ids)
+            extras  = ExtraJerseyMember.objects.select_for_update().in_bulk(extra_ids)
+
+            jerseys = {j.player_id: j for j in Jersey.objects.filter(player__in=players)}
+            index   = JerseyNumberIndex({p.team_id for p in players.values()}
+                                        | {e.team_id for e in extras.values()})
+
+            changed_jerseys, new_jerseys, changed_extras, teams = {}, {}, {}, set()
+
+            for i, row in enumerate(rows):
+                try:
+                    owner, target, team_id = self.batch_target(row, players, extras, jerseys)
+                    number = self.batch_number(row, target)
+                    size   = self.batch_size(row) if owner[0] == "player" else None
+                    index.claim(team_id, owner, number)
+                except ValueError as e:
+                    results[i] = {"index": i, "status": "error", "message": str(e)}
+                    continue
+
+                if "jersey_name" in row:
+                    target.jersey_name = str(row["jersey_name"] or "").strip()[:100]
+                if "jersey_number" in row:
+                    target.jersey_number = number if owner[0] == "extra" else (number or 0)
+                if size is not None:
+                    target.size_number = size
+                    target.size_text   = mapping.get(size, "")
+
+                if owner[0] == "extra":
+                    changed_extras[target.pk] = target
+                elif target.pk:
+                    changed_jerseys[target.pk] = target
+                else:
+                    new_jerseys[target.player_id] = target
+                teams.add(team_id)
+                results[i] = {"index": i, "status": "ok"}
+
+            # Clear the numbers being rewritten first: a swap inside one
+            # bulk UPDATE would otherwise trip the per-team unique index
+            renumbered = [j.pk for j in changed_jerseys.values() if j.jersey_number != j.saved_number]
+            Jersey.objects.filter(pk__in=renumbered).update(jersey_number=0)
+            fields = ["team", "jersey_name", "jersey_number", "size_number", "size_text"]
+            Jersey.objects.bulk_update(changed_jerseys.values(), fields, batch_size=500)
+            Jersey.objects.bulk_create(new_jerseys.values(), batch_size=500)
+            ExtraJerseyMember.objects.bulk_update(changed_extras.values(),
+                                                  ["jersey_name", "jersey_number"], batch_size=500)
+            # Bulk writes skip the Jersey signals, so cards are bumped here
+            Team.touch(*teams)
+
+        return results
+
+    def batch_target(self, row, players, extras, jerseys):
+        """(owner, object to edit, team pk or None) for one row."""
+        if not isinstance(row, dict):
+            raise ValueError("Row must be an object.")
+        if ("player_id" in row) == ("extra_id" in row):
+            raise ValueError("Give exactly one of player_id or extra_id.")
+
+        if "player_id" in row:
+            player = players.get(as_pk(row["player_id"]))
+            if player is None:
+                raise ValueError(f"Unknown player {row['player_id']}.")
+            team_id = player.team_id if player.status == Player.STATUS_SOLD else None
+            jersey  = jerseys.get(player.pk)
+            if jersey is None:
+                # bulk_create skips Jersey.save(), so the team is set here
+                jersey = Jersey(player=player, team_id=team_id, jersey_name="",
+                                jersey_number=0, size_number=0, size_text="")
+                jerseys[player.pk] = jersey   # a second row for this player edits the same one
+            jersey.team_id      = team_id
+            jersey.saved_number = getattr(jersey, "saved_number", jersey.jersey_number)
+            return ("player", player.pk), jersey, team_id
+
+        extra = extras.get(as_pk(row["extra_id"]))
+        if extra is None:
+            raise ValueError(f"Unknown extra member {row['extra_id']}.")
+        team_id = extra.team_id if extra.member_type == ExtraJerseyMember.TYPE_TEAM else None
+        return ("extra", extra.pk), extra, team_id
+
+    def batch_number(self, row, target):
+        """The row's jersey number (None = not set), or the current one if the row leaves it alone."""
+        if "jersey_number" not in row:
+            return target.jersey_number or None
+        value = row["jersey_number"]
+        if value in (None, ""):
+            return None
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Jersey number must be a whole number, got {value!r}.")
+        if number < 0:
+            raise ValueError("Jersey number cannot be negative.")
+        return number or None
+
+    def batch_size(self, row):
+
+        if "size_number" not in row:
+            return None
+        try:
+            return int(row["size_number"] or 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"Size must be a whole number, got {row['size_number']!r}.")
+
+
+    # ----------------------------------------
+    # AUTO-ASSIGN MISSING NUMBERS
+    # Sold players without a number get their preferred number when it is
+    # free in the team, otherwise the lowest free one; team extras follow.
+    # One pass over the loaded squads, then a single bulk write.
+    # ----------------------------------------
+
+    def auto_assign(self, team_ids=None):
+        """Returns {team pk: numbers assigned}."""
+        teams = Team.objects.order_by("name")
+        if team_ids is not None:
+            teams = teams.filter(pk__in=team_ids)
+
+        with transaction.atomic():
+            index  = JerseyNumberIndex(teams.values("pk"))   # locks the teams
+            teams  = RosterService().load_rosters(teams)
+            extras = {}
+            for em in ExtraJerseyMember.objects.filter(team__in=teams, member_type=ExtraJerseyMember.TYPE_TEAM,
+                                                       jersey_number__isnull=True).order_by("name"):
+                extras.setdefault(em.team_id, []).append(em)
+
+            changed, created, changed_extras, assigned = [], [], [], {}
+            for team in teams:
+                missing = [p for p in team.sold_players if not (p.jersey and p.jersey.jersey_number)]
+                # Free preferences are handed out first so nobody takes one by chance
+                wanted  = {}
+                for p in missing:
+                    number = p.preferred_jersey_number
+                    if number and not index.owner(team.pk, number):
+                        index.claim(team.pk, ("player", p.pk), number)
+                        wanted[p.pk] = number
+
+                for p in sorted(missing, key=lambda p: p.pk not in wanted):
+                    number = wanted.get(p.pk) or index.next_free(team.pk)
+                    if number is None:
+                        break
+                    index.claim(team.pk, ("player", p.pk), number)
+                    if p.jersey:
+                        p.jersey.team          = team
+                        p.jersey.jersey_number = number
+                        changed.append(p.jersey)
+                    else:
+                        created.append(Jersey(player=p, team=team, jersey_name=p.name, jersey_number=number,
+                                              size_number=0, size_text=""))
+                    assigned[team.pk] = assigned.get(team.pk, 0) + 1
+
+                for em in extras.get(team.pk, []):
+                    number = index.next_free(team.pk)
+                    if number is None:
+                        break
+                    index.claim(team.pk, ("extra", em.pk), number)
+                    em.jersey_number = number
+                    changed_extras.append(em)
+                    assigned[team.pk] = assigned.get(team.pk, 0) + 1
+
+            # Only free numbers are handed out, so no row clashes mid-write
+            Jersey.objects.bulk_update(changed, ["team", "jersey_number"], batch_size=500)
+            Jersey.objects.bulk_create(created, batch_size=500)
+            ExtraJerseyMember.objects.bulk_update(changed_extras, ["jersey_number"], batch_size=500)
+            Team.touch(*assigned)
+
+        return assigned
+
+
+class JerseyNumberIndex:
+    """
+    Jersey numbers in use per team — squad jerseys and team extras —
+    read in two queries and then checked / claimed in memory.
+    Owners are ("player", pk) or ("extra", pk). Team None is never checked.
+
+    Build it inside a transaction: the team rows are locked first, so no
+    other request (or a sale, see Jersey.follow_players) can hand out a
+    number in these teams before this one commits. Squad jerseys also
+    have a DB constraint; team extras rely on the lock alone.
+    """
+
+    MAX_NUMBER = 99
+
+    def __init__(self, team_ids):
+        team_ids     = Team.lock(team_ids)
+        self.numbers = {pk: {} for pk in team_ids}   # team → {number: owner}
+        self.held    = {}                            # (team, owner) → number
+        self.cursor  = {}                            # team → no free number below this
+
+        for player_id, team_id, number in Jersey.objects.filter(
+            team__in=team_ids, jersey_number__gt=0
+        ).values_list("player_id", "team_id", "jersey_number"):
+            self.numbers[team_id][number] = ("player", player_id)
+            self.held[team_id, ("player", player_id)] = number
+
+        for pk, team_id, number in ExtraJerseyMember.objects.filter(
+            team__in=team_ids, member_type=ExtraJerseyMember.TYPE_TEAM, jersey_number__gt=0
+        ).values_list("pk", "team_id", "jersey_number"):
+            if number not in self.numbers[team_id]:
+                self.numbers[team_id][number] = ("extra", pk)
+                self.held[team_id, ("extra", pk)] = number
+
+    def owner(self, team_id, number):
+
+        return self.numbers.get(team_id, {}).get(number)
+
+    def claim(self, team_id, owner, number):
+        """Give `number` (None = none) to `owner`, freeing what they held. ValueError on a clash."""
+        if team_id is None:
+            return
+        numbers = self.numbers.setdefault(team_id, {})
+        if number is not None and numbers.get(number, owner) != owner:
+            kind, pk = numbers[number]
+            raise ValueError(f"Number {number} is already taken in this team ({kind} {pk}).")
+
+        held = self.held.pop((team_id, owner), None)
+        if held is not None and held != number:
+            del numbers[held]
+            self.cursor[team_id] = min(held, self.cursor.get(team_id, 1))
+        if number is not None:
+            numbers[number] = owner
+            self.held[team_id, owner] = number
+
+    def next_free(self, team_id):
+        """Lowest free number in the team, or None once 1..MAX_NUMBER are all taken."""
+        numbers = self.numbers.setdefault(team_id, {})
+        number  = self.cursor.get(team_id, 1)
+        while number in numbers:
+            number += 1
+        self.cursor[team_id] = number
+        return number if number <= self.MAX_NUMBER else None
+
+
+def as_pk(value):
+    """Row ids may arrive as numbers or numeric strings; anything else is None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _ZipOutput:
+    """Write-only sink for ZipFile; take() hands over what was written so far."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size   = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+    def flush(self):
+        pass
 
-        return buffer
\ No newline at end of file
+    def take(self):
+        data, self.chunks = b"".join(self.chunks), []
+        return data
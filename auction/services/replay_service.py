@@ -0,0 +1,230 @@
+from django.db import transaction
+from django.db.models import F, Max
+
+from auction.models import Player, Team, TournamentConfig, AuctionAction, AuctionState, AuctionSnapshot, Jersey
+from config.logging_config import error_logger
+
+SNAPSHOT_EVERY = 100   # periodic snapshot every N log rows
+KEEP_SNAPSHOTS = 50
+
+# Changed only by transitions / start / reset / complete, which all snapshot
+SLOT_FIELDS = ["phase", "current_category", "category_pass", "auction_round",
+               "is_active", "awaiting_transition", "transition_message"]
+
+# Player columns folded by the log, in snapshot order
+PLAYER_FIELDS = ["status", "team_id", "sold_price", "rebid_count"]
+
+
+class ReplayService:
+
+    """
+    Rebuilds Player status, Team wallets / squad counters and AuctionState
+    from the AuctionAction log, using the same rules as BiddingService's
+    commands and undo. Folding starts at the newest AuctionSnapshot, so a
+    recovery reads one snapshot plus the tail of the log.
+
+    Drawing a player onto the block is not logged, so current_player is
+    kept as it is unless the rebuilt log says that player is gone
+    (sold or not playing).
+    """
+
+    # ─────────────────────────────────────────────
+    # SNAPSHOTS
+    # Callers hold the AuctionState lock, so no action lands in between
+    # reading the log head and reading the rows.
+    #
+    # A snapshot is the log folded up to its head, not a copy of the live
+    # tables, so a bad manual edit never becomes the baseline and
+    # verify() keeps reporting it. Only start, reset and an explicit
+    # `replay_auction --snapshot` (from_tables=True) take the live
+    # tables as the new baseline: they rewrite players and wallets
+    # outside the log.
+    # ─────────────────────────────────────────────
+
+    def snapshot(self, reason=AuctionSnapshot.REASON_MANUAL, from_tables=False):
+        state = AuctionState.get()
+        last  = AuctionAction.objects.aggregate(last=Max("pk"))["last"] or 0
+
+        # Slot fields and a cleared redo stack change outside the log
+        cursors = {
+            **{f: getattr(state, f) for f in SLOT_FIELDS},
+            "head_action_id": state.head_action_id,
+            "redo_action_id": state.redo_action_id,
+        }
+
+        if from_tables:
+            players = {
+                pk: list(row)
+                for pk, *row in Player.objects.values_list("pk", *PLAYER_FIELDS)
+            }
+            teams   = dict(Team.objects.values_list("pk", "remaining_points"))
+        else:
+            rebuilt = self.rebuild()
+            rebuilt["state"].update({f: v for f, v in cursors.items() if f != "head_action_id"})
+            diffs = self.verify(rebuilt)
+            if diffs:
+                error_logger.error(
+                    f"{reason} snapshot: live tables differ from the action log in {len(diffs)} place(s), "
+                    f"e.g. {diffs[0]}; the snapshot keeps the log's values — run manage.py replay_auction"
+                )
+            players = rebuilt["players"]
+            teams   = rebuilt["teams"]
+            cursors["head_action_id"] = rebuilt["state"]["head_action_id"]
+
+        snap = AuctionSnapshot.objects.create(
+            last_action_id = last,
+            reason         = reason,
+            data           = {"players": players, "teams": teams, "state": cursors},
+        )
+        if snap.pk % 10 == 0:
+            keep = AuctionSnapshot.objects.values_list("pk", flat=True)[:KEEP_SNAPSHOTS]
+            AuctionSnapshot.objects.exclude(pk__in=list(keep)).delete()
+        return snap
+
+    def maybe_snapshot(self, action):
+        if action.pk % SNAPSHOT_EVERY == 0:
+            self.snapshot(AuctionSnapshot.REASON_PERIODIC)
+
+    # ─────────────────────────────────────────────
+    # REBUILD (read only)
+    # ─────────────────────────────────────────────
+
+    def rebuild(self):
+        """
+        Returns {"players": {pk: [status, team_id, sold_price, rebid_count]},
+                 "teams": {pk: remaining_points}, "state": {field: value}}.
+        """
+        snap   = AuctionSnapshot.objects.first()
+        config = TournamentConfig.current()
+        start  = snap.last_action_id if snap else 0
+        data   = snap.data if snap else {"players": {}, "teams": {}, "state": {}}
+
+        initial = [Player.STATUS_AVAILABLE, None, None, 0]
+        stored  = {int(pk): row for pk, row in data["players"].items()}
+        players = {pk: list(stored.get(pk, initial))
+                   for pk in Player.objects.values_list("pk", flat=True)}
+
+        stored = {int(pk): points for pk, points in data["teams"].items()}
+        full   = config.total_points if config else 0
+        teams  = {pk: stored.get(pk, full) for pk in Team.objects.values_list("pk", flat=True)}
+
+        live  = AuctionState.get()
+        state = {f: data["state"].get(f, getattr(live, f)) for f in SLOT_FIELDS}
+        state["head_action_id"] = data["state"].get("head_action_id")
+        state["redo_action_id"] = data["state"].get("redo_action_id")
+
+        tail = list(AuctionAction.objects.filter(pk__gt=start).order_by("pk"))
+        undo_ids = [a.pk for a in tail if a.action == "UNDO"]
+        fwd_ids  = [a.pk for a in tail if a.action != "UNDO"]
+
+        # UNDO row → the action it reverted (may predate the snapshot)
+        targets = {a.reverted_by_id: a for a in AuctionAction.objects.filter(reverted_by_id__in=undo_ids)}
+        # forward row → the UNDO row it redid
+        redone  = dict(AuctionAction.objects.filter(action="UNDO", reverted_by_id__in=fwd_ids)
+                       .values_list("reverted_by_id", "parent_id"))
+
+        for action in tail:
+            row = players.get(action.player_id)
+
+            if action.action == "UNDO":
+                target = targets.get(action.pk)
+                if target is None:
+                    continue   # pre-log undo whose target was deleted
+                if row is not None:
+                    self._revert(row, target, teams)
+                state["head_action_id"] = target.parent_id
+                state["redo_action_id"] = action.pk
+                state["is_active"]      = True
+            else:
+                if row is not None:
+                    self._apply(row, action, teams)
+                state["head_action_id"] = action.pk
+                state["redo_action_id"] = redone.get(action.pk)
+
+        current = live.current_player_id
+        if current in players and players[current][0] in (Player.STATUS_SOLD, Player.STATUS_NOT_PLAYING):
+            current = None
+        state["current_player_id"] = current
+
+        return {"players": players, "teams": teams, "state": state}
+
+    @staticmethod
+    def _apply(row, action, teams):
+        if action.action == "SELL":
+            row[0], row[1], row[2] = Player.STATUS_SOLD, action.team_id, action.amount
+            if action.team_id in teams:
+                teams[action.team_id] -= action.amount or 0
+        elif action.action == "UNSOLD":
+            row[0] = Player.STATUS_UNSOLD
+        elif action.action == "NOT_PLAYING":
+            row[0] = Player.STATUS_NOT_PLAYING
+        row[3] += int(action.rebid)
+
+    @staticmethod
+    def _revert(row, action, teams):
+        if action.action == "SELL":
+            if row[1] in teams:
+                teams[row[1]] += row[2] or 0
+            row[1], row[2] = None, None
+        if action.rebid and row[3] > 0:
+            row[3] -= 1
+        row[0] = action.prev_status or Player.STATUS_AVAILABLE
+
+    # ─────────────────────────────────────────────
+    # VERIFY / APPLY
+    # ─────────────────────────────────────────────
+
+    def verify(self, rebuilt=None):
+        """List of human-readable differences between the live tables and the log."""
+        rebuilt = rebuilt or self.rebuild()
+        diffs   = []
+
+        names = dict(Player.objects.values_list("pk", "name"))
+        for pk, *row in Player.objects.values_list("pk", *PLAYER_FIELDS):
+            expected = rebuilt["players"][pk]
+            for field, have, want in zip(PLAYER_FIELDS, row, expected):
+                if have != want:
+                    diffs.append(f"{names[pk]}: {field} {have} → {want}")
+
+        for pk, name, points in Team.objects.values_list("pk", "name", "remaining_points"):
+            if points != rebuilt["teams"][pk]:
+                diffs.append(f"{name}: remaining_points {points} → {rebuilt['teams'][pk]}")
+
+        state = AuctionState.get()
+        for field, want in rebuilt["state"].items():
+            if getattr(state, field) != want:
+                diffs.append(f"AuctionState: {field} {getattr(state, field)} → {want}")
+
+        return diffs
+
+    def apply(self):
+        """Rewrite players, wallets, squad counters and state from the log. Returns the diffs fixed."""
+        with transaction.atomic():
+            state   = AuctionState.lock()
+            rebuilt = self.rebuild()
+            diffs   = self.verify(rebuilt)
+            if not diffs:
+                return diffs
+
+            changed = []
+            for player in Player.objects.all():
+                row = rebuilt["players"][player.pk]
+                if [getattr(player, f) for f in PLAYER_FIELDS] != row:
+                    for field, value in zip(PLAYER_FIELDS, row):
+                        setattr(player, field, value)
+                    changed.append(player)
+            # bulk_update skips Player.save(), so wallets and jersey teams are written here instead
+            Player.objects.bulk_update(changed, PLAYER_FIELDS, batch_size=500)
+            Jersey.follow_players([p.pk for p in changed])
+
+            teams = list(Team.objects.all())
+            for team in teams:
+                team.remaining_points = rebuilt["teams"][team.pk]
+            Team.objects.bulk_update(teams, ["remaining_points"], batch_size=500)
+            Team.objects.update(version=F("version") + 1, **Team.squad_counts())
+
+            for field, value in rebuilt["state"].items():
+                setattr(state, field, value)
+            state.save()
+
+        return diffs
@@ -0,0 +1,79 @@
+from django.db.models import Count, Prefetch, Q
+
+from auction.models import Player, Team, AuctionState, DrawDeck
+
+
+class RosterService:
+
+    """
+    Shared loader for team squads (public board, summary, jersey portal).
+    Query count is constant: teams + sold players + their jerseys,
+    however many teams there are.
+    """
+
+    # ─────────────────────────────────────────────
+    # SOLD SQUADS FOR EVERY TEAM
+    # ─────────────────────────────────────────────
+
+    def sold_players_prefetch(self):
+        return Prefetch(
+            "player_set",
+            queryset=Player.objects.filter(status=Player.STATUS_SOLD)
+                                   .order_by("role", "name")
+                                   .prefetch_related("jersey_set"),
+            to_attr="sold_players",
+        )
+
+    def load_rosters(self, teams=None):
+        """
+        Returns a list of teams, each with:
+          sold_players  — list ordered by role, name; every player has .jersey (or None)
+          total_spent   — sum of sold prices
+          player_count  — len(sold_players)
+        `teams` is an optional Team queryset (filter / ordering); defaults to all.
+        """
+        if teams is None:
+            teams = Team.objects.all()
+
+        teams = list(teams.prefetch_related(self.sold_players_prefetch()))
+        for team in teams:
+            for p in team.sold_players:
+                jerseys  = p.jersey_set.all()
+                p.jersey = jerseys[len(jerseys) - 1] if jerseys else None
+            team.total_spent  = sum(p.sold_price or 0 for p in team.sold_players)
+            team.player_count = len(team.sold_players)
+        return teams
+
+    # ─────────────────────────────────────────────
+    # PRE-AUCTION PLAYER LIST (one query, grouped by role)
+    # ─────────────────────────────────────────────
+
+    def players_by_role(self):
+        grouped = {"AR": [], "BAT": [], "BOWL": [], "PLY": []}
+        for p in Player.objects.order_by("name"):
+            if p.role in grouped:
+                grouped[p.role].append(p)
+        return grouped
+
+    # ─────────────────────────────────────────────
+    # POOL COUNTS FOR A CATEGORY (one query)
+    # ─────────────────────────────────────────────
+
+    def pool_counts(self, role):
+        counts = Player.objects.filter(role=role).aggregate(
+            available=Count("pk", filter=Q(status=Player.STATUS_AVAILABLE)),
+            unsold=Count("pk",    filter=Q(status=Player.STATUS_UNSOLD)),
+        )
+        return counts["available"], counts["unsold"]
+
+    # ─────────────────────────────────────────────
+    # PLAYERS STILL TO BE DRAWN IN THE OPEN SLOT
+    # Read off the draw deck; pool count only before the first draw
+    # ─────────────────────────────────────────────
+
+    def slot_remaining(self, state):
+        deck = DrawDeck.for_slot(state)
+        if deck is not None:
+            return deck.remaining
+        available, unsold = self.pool_counts(state.current_category)
+        return unsold if state.phase == AuctionState.PHASE_REBID else available
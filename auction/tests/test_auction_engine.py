@@ -1,6 +1,12 @@
+import random
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
-from auction.models import Player, Team, TournamentConfig, AuctionState
+from django.test.utils import CaptureQueriesContext
+from auction.models import Player, Team, TournamentConfig, AuctionState, AuctionAction, AuctionSnapshot, DrawDeck, IdempotencyKey
 from auction.services.auction_engine import AuctionEngine, round_label
+from auction.utils import state_cache
 
 
 class RoundLabelTest(TestCase):
@@ -66,6 +72,16 @@ class BlockedTeamsTest(TestCase):
         blocked = engine.get_blocked_team_ids(state)
         self.assertIn(self.team_a.team_serial_number, blocked)
 
+    def test_loaded_teams_checked_in_memory(self):
+        state = AuctionState.get()
+        state.current_category = "AR"
+        state.save()
+        engine = AuctionEngine()
+        teams  = list(Team.objects.all())
+        with self.assertNumQueries(0):
+            blocked = engine.get_blocked_team_ids(state, teams)
+        self.assertEqual(blocked, {self.team_a.team_serial_number})
+
     def test_ply_never_blocked(self):
         state = AuctionState.get()
         state.phase = AuctionState.PHASE_MAIN
@@ -92,3 +108,126 @@ class RecalcPointsTest(TestCase):
         AuctionEngine().recalculate_points()
         self.team.refresh_from_db()
         self.assertEqual(self.team.remaining_points, 8500)
+
+    def test_recalculate_is_single_update(self):
+        for i in range(5):
+            Team.objects.create(name=f"Extra {i}", remaining_points=0)
+        engine = AuctionEngine()
+        with CaptureQueriesContext(connection) as ctx:
+            engine.recalculate_points()
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Team.objects.exclude(remaining_points=10000).exists())
+
+
+class DrawDeckTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11)
+        for i in range(60):
+            Player.objects.create(name=f"AR {i}", role="AR", base_price=100)
+        Player.objects.create(name="Sold AR", role="AR", status=Player.STATUS_SOLD)
+        Player.objects.create(name="Unsold AR", role="AR", status=Player.STATUS_UNSOLD)
+
+    def _state(self, phase=AuctionState.PHASE_MAIN, pass_num=1):
+        state = AuctionState.get()
+        state.phase            = phase
+        state.current_category = "AR"
+        state.category_pass    = pass_num
+        return state
+
+    def test_deck_built_once_then_pointer_steps(self):
+        engine = AuctionEngine()
+        state  = self._state()
+        first  = engine._pick_from_current_slot(state)
+        with self.assertNumQueries(3):   # deck, player by pk, pointer update
+            second = engine._pick_from_current_slot(state)
+        self.assertNotEqual(first.pk, second.pk)
+        deck = DrawDeck.for_slot(state)
+        self.assertEqual((deck.pointer, deck.remaining), (2, 58))
+
+    def test_deck_covers_pool_without_repeats(self):
+        engine = AuctionEngine()
+        state  = self._state()
+        drawn  = [engine._pick_from_current_slot(state).pk for _ in range(60)]
+        self.assertEqual(len(set(drawn)), 60)
+
+    def test_seed_reproduces_order(self):
+        state = self._state()
+        first = AuctionEngine(rng=random.Random(7))._pick_from_current_slot(state)
+        order = DrawDeck.for_slot(state).order
+        DrawDeck.objects.all().delete()
+        AuctionEngine(rng=random.Random(7))._pick_from_current_slot(state)
+        self.assertEqual(DrawDeck.for_slot(state).order, order)
+        self.assertEqual(first.pk, order[0])
+
+    def test_players_leaving_pool_are_skipped(self):
+        engine = AuctionEngine()
+        state  = self._state()
+        engine._pick_from_current_slot(state)
+        deck = DrawDeck.for_slot(state)
+        Player.objects.filter(pk=deck.order[1]).update(status=Player.STATUS_NOT_PLAYING)
+        self.assertEqual(engine._pick_from_current_slot(state).pk, deck.order[2])
+
+    def test_rebid_laps_until_pool_empty(self):
+        engine = AuctionEngine()
+        state  = self._state(AuctionState.PHASE_REBID)
+        self.assertEqual(engine._pick_from_current_slot(state).name, "Unsold AR")
+        # Still unsold after its turn: a new lap draws it again
+        self.assertEqual(engine._pick_from_current_slot(state).name, "Unsold AR")
+        self.assertEqual(DrawDeck.for_slot(state).lap, 2)
+        Player.objects.filter(name="Unsold AR").update(status=Player.STATUS_SOLD)
+        self.assertIsNone(engine._pick_from_current_slot(state))
+
+    def test_transition_opens_the_next_slots_deck(self):
+        Team.objects.create(name="Team A", remaining_points=10000)   # no AR yet → rebid
+        engine = AuctionEngine()
+        state  = self._state()
+        Player.objects.filter(status=Player.STATUS_AVAILABLE).update(status=Player.STATUS_SOLD)
+        self.assertIsNone(engine._pick_from_current_slot(state))
+
+        engine._set_next_transition(state)
+        self.assertEqual((state.phase, state.awaiting_transition), (AuctionState.PHASE_REBID, True))
+        deck = DrawDeck.for_slot(state)
+        self.assertEqual(deck.order, [Player.objects.get(name="Unsold AR").pk])
+        self.assertEqual(engine._pick_from_current_slot(state).name, "Unsold AR")
+
+    def test_empty_follow_on_slot_moves_to_next_category(self):
+        Player.objects.create(name="Bat", role="BAT", base_price=100)
+        engine = AuctionEngine()
+        state  = self._state()
+        Player.objects.filter(role="AR").exclude(status=Player.STATUS_SOLD).update(status=Player.STATUS_NOT_PLAYING)
+        engine._set_next_transition(state)
+        self.assertEqual((state.current_category, state.category_pass), ("BAT", 1))
+
+    def test_reset_drops_decks(self):
+        engine = AuctionEngine()
+        engine._pick_from_current_slot(self._state())
+        engine.reset_auction()
+        self.assertFalse(DrawDeck.objects.exists())
+
+
+class CompleteAuctionTest(TestCase):
+
+    def test_keeps_cursors_moved_since_the_state_was_read(self):
+        TournamentConfig.objects.create()
+        team   = Team.objects.create(name="Team A", remaining_points=10000)
+        player = Player.objects.create(name="Ravi", role="AR", status=Player.STATUS_SOLD,
+                                       team=team, sold_price=100)
+        with state_cache.request_scope():
+            AuctionState.get()   # cached at the start of the request
+            action = AuctionAction.objects.create(player=player, team=team, action="SELL", amount=100)
+            AuctionState.objects.update(head_action=action)   # another worker's sale lands
+            AuctionEngine().complete_auction()
+
+        state = AuctionState.objects.get()
+        self.assertEqual((state.phase, state.is_active), (AuctionState.PHASE_DONE, False))
+        self.assertEqual(state.head_action_id, action.pk)
+
+    def test_complete_view_is_idempotent(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        for _ in range(2):
+            response = self.client.get("/auction/complete/?idempotency_key=k1-complete")
+            self.assertEqual((response.status_code, response["Location"]), (302, "/auction/summary/"))
+        self.assertTrue(IdempotencyKey.objects.filter(key="k1-complete").exists())
+        self.assertEqual(AuctionSnapshot.objects.count(), 1)
@@ -0,0 +1,65 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from auction.models import Player, Team, AuctionAction
+from auction.services.audit_service import AuditService
+
+
+class AuditPageTest(TestCase):
+
+    def setUp(self):
+        self.team = Team.objects.create(name="Team A")
+        now = timezone.now()
+        for i in range(120):
+            p = Player.objects.create(name=f"P{i}", role="AR" if i % 2 else "BAT")
+            AuctionAction.objects.create(player=p, team=self.team if i % 3 == 0 else None,
+                                         action="SELL" if i % 3 == 0 else "UNSOLD",
+                                         round=1 + i // 60, category=p.role)
+        # Shared timestamps: the id tie-breaker must keep pages disjoint
+        AuctionAction.objects.update(timestamp=now)
+
+    def test_keyset_pages_cover_everything_once(self):
+        svc, seen, cursor = AuditService(), [], None
+        while True:
+            rows, cursor = svc.page({}, cursor, size=50)
+            seen += [a.pk for a in rows]
+            if not cursor:
+                break
+        self.assertEqual(seen, list(AuctionAction.objects.order_by("-id").values_list("pk", flat=True)))
+
+    def test_filters(self):
+        svc  = AuditService()
+        rows = svc.filtered_actions(svc.parse_filters(
+            {"category": "ar", "round": "2", "team": str(self.team.pk), "action": "sell"}
+        ))
+        self.assertTrue(rows)
+        for a in rows:
+            self.assertEqual((a.category, a.round, a.team_id, a.action), ("AR", 2, self.team.pk, "SELL"))
+
+    def test_bad_filters_ignored(self):
+        self.assertEqual(AuditService().parse_filters({"category": "X", "round": "abc", "action": "DROP"}), {})
+        self.assertIsNone(AuditService().decode_cursor("garbage"))
+
+    def test_page_view_query_count_is_flat(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        self.client.get("/auction/audit-log/")
+        # session, user, settings (context processor), teams, one page of actions + joins
+        with self.assertNumQueries(5):
+            response = self.client.get("/auction/audit-log/")
+        self.assertEqual(len(response.context["actions"]), 50)
+        self.assertIsNotNone(response.context["next_cursor"])
+
+    def test_exports_stream(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        response = self.client.get("/auction/audit-log/export/?action=SELL")
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], ",".join(AuditService.EXPORT_COLUMNS))
+        self.assertEqual(len(lines), 1 + 40)
+
+        response = self.client.get("/auction/audit-log/export/?format=jsonl&category=BAT")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 60)
+        self.assertEqual({r["category"] for r in rows}, {"BAT"})
@@ -1,5 +1,8 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
-from auction.models import Player, Team, TournamentConfig, AuctionState
+from django.test.utils import CaptureQueriesContext
+from auction.models import Player, Team, TournamentConfig, AuctionState, AuctionAction, IdempotencyKey
 from auction.services.bidding_service import BiddingService
 
 
@@ -84,3 +87,154 @@ class UnsoldRebidTest(TestCase):
             svc.mark_unsold(p.serial_number)
         p.refresh_from_db()
         self.assertEqual(p.status, Player.STATUS_NOT_PLAYING)
+
+
+class CommandGuardTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11, base_price_AR=100)
+        self.team   = Team.objects.create(name="Team X", remaining_points=10000)
+        self.player = Player.objects.create(name="AR Player", role="AR", base_price=100)
+        state = AuctionState.get()
+        state.current_player = self.player
+        state.save()
+
+    def test_second_sell_rejected(self):
+        svc = BiddingService()
+        self.assertTrue(svc.sell_player(self.player.serial_number, self.team.team_serial_number, 500)[0])
+        success, err, allow_force = svc.sell_player(
+            self.player.serial_number, self.team.team_serial_number, 500, force=True
+        )
+        self.assertFalse(success)
+        self.assertIn("already sold", err)
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.remaining_points, 9500)
+        self.assertEqual(AuctionAction.objects.filter(action="SELL").count(), 1)
+
+    def test_unsold_ignored_once_player_left_the_block(self):
+        svc = BiddingService()
+        svc.mark_unsold(self.player.serial_number)
+        svc.mark_unsold(self.player.serial_number)
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.rebid_count, 1)
+        self.assertEqual(AuctionAction.objects.filter(action="UNSOLD").count(), 1)
+
+
+class UndoRedoTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11,
+                                        base_price_AR=100, base_price_PLY=100, max_rebid_attempts=1)
+        self.team = Team.objects.create(name="Team X", remaining_points=10000)
+        self.svc  = BiddingService()
+
+    def _on_block(self, name, role="AR"):
+        player = Player.objects.create(name=name, role=role, base_price=100)
+        state  = AuctionState.get()
+        state.current_player = player
+        state.save()
+        return player
+
+    def test_undo_keeps_history(self):
+        p = self._on_block("A")
+        self.svc.sell_player(p.serial_number, self.team.team_serial_number, 500)
+        self.svc.undo_last_action()
+        sell = AuctionAction.objects.get(action="SELL")
+        self.assertEqual(sell.reverted_by.action, "UNDO")
+        p.refresh_from_db()
+        self.team.refresh_from_db()
+        self.assertEqual(p.status, Player.STATUS_AVAILABLE)
+        self.assertEqual(self.team.remaining_points, 10000)
+        self.assertIsNone(AuctionState.get().head_action)
+
+    def test_multi_level_undo_then_redo(self):
+        a = self._on_block("A")
+        self.svc.sell_player(a.serial_number, self.team.team_serial_number, 500)
+        b = self._on_block("B")
+        self.svc.sell_player(b.serial_number, self.team.team_serial_number, 700)
+
+        self.svc.undo_last_action()
+        self.svc.undo_last_action()
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.remaining_points, 10000)
+        self.assertEqual(AuctionState.get().current_player_id, a.pk)
+
+        self.assertTrue(self.svc.redo_last_undo())
+        self.assertTrue(self.svc.redo_last_undo())
+        self.assertFalse(self.svc.redo_last_undo())
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.remaining_points, 8800)
+        self.assertEqual(AuctionAction.objects.filter(action="SELL", reverted_by=None).count(), 2)
+
+    def test_undo_uses_head_cursor(self):
+        p = self._on_block("A")
+        self.svc.sell_player(p.serial_number, self.team.team_serial_number, 500)
+        self.svc.undo_last_action()
+        self.svc.redo_last_undo()
+        with CaptureQueriesContext(connection) as ctx:
+            self.svc.undo_last_action()
+        scans = [q["sql"] for q in ctx.captured_queries
+                 if 'FROM "auction_auctionaction"' in q["sql"] and "ORDER BY" in q["sql"]]
+        self.assertEqual(scans, [])
+        p.refresh_from_db()
+        self.assertEqual(p.status, Player.STATUS_AVAILABLE)
+
+    def test_new_action_clears_redo(self):
+        p = self._on_block("A")
+        self.svc.sell_player(p.serial_number, self.team.team_serial_number, 500)
+        self.svc.undo_last_action()
+        self.svc.mark_not_playing(p.serial_number)
+        self.assertIsNone(AuctionState.get().redo_action)
+        self.assertFalse(self.svc.redo_last_undo())
+
+    def test_undo_auto_drop_restores_rebid_count(self):
+        p = self._on_block("P", role="PLY")
+        self.svc.mark_unsold(p.serial_number)
+        p.refresh_from_db()
+        self.assertEqual((p.status, p.rebid_count), (Player.STATUS_NOT_PLAYING, 1))
+        self.svc.undo_last_action()
+        p.refresh_from_db()
+        self.assertEqual((p.status, p.rebid_count), (Player.STATUS_AVAILABLE, 0))
+
+
+class IdempotencyKeyTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11, base_price_AR=100)
+        self.team   = Team.objects.create(name="Team X", remaining_points=10000)
+        self.player = Player.objects.create(name="AR Player", role="AR", base_price=100)
+        state = AuctionState.get()
+        state.current_player = self.player
+        state.save()
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+
+    def _sell(self, key):
+        return self.client.post("/auction/sell/", {
+            "player_id": self.player.serial_number,
+            "team_id":   self.team.team_serial_number,
+            "amount":    500,
+        }, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        first = self._sell("click-1")
+        retry = self._sell("click-1")
+        self.assertEqual(first.json(), {"status": "ok"})
+        self.assertEqual(retry.json(), {"status": "ok"})
+        self.assertEqual(retry["Idempotent-Replay"], "true")
+        self.assertEqual(AuctionAction.objects.filter(action="SELL").count(), 1)
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.remaining_points, 9500)
+
+    def test_new_key_runs_command(self):
+        self._sell("click-1")
+        second = self._sell("click-2").json()
+        self.assertEqual(second["status"], "error")
+        self.assertIn("already sold", second["message"])
+        self.assertEqual(IdempotencyKey.objects.count(), 2)
+
+    def test_undo_link_key(self):
+        self._sell("click-1")
+        url = "/auction/undo/?idempotency_key=page-1-undo"
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(AuctionAction.objects.filter(action="UNDO").count(), 1)
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import LiveServerTestCase, TestCase, override_settings
+
+from auction.models import Player
+from auction.services.auction_engine import AuctionEngine
+from benchmarks.board_load import BoardLoadTest, QueryCounter, MODE_POLL
+from benchmarks.simulation import AuctionSimulator
+
+
+class BoardLoadTestTest(LiveServerTestCase):
+
+    def setUp(self):
+        AuctionSimulator(teams=2, players=8).seed_data()
+        AuctionEngine().activate_auction()
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        # Server threads notice a closed stream on the next heartbeat
+        heartbeat = mock.patch("auction.services.event_service.HEARTBEAT", 0.2)
+        heartbeat.start()
+        self.addCleanup(heartbeat.stop)
+
+    def load(self, **kwargs):
+        return BoardLoadTest(
+            self.live_server_url, spectators=3, duration=2, interval=0.2, sell_interval=0.05,
+            baseline=0.5, sessionid=self.client.cookies["sessionid"].value, **kwargs,
+        ).run()
+
+    def test_polling_spectators_and_auctioneer(self):
+        results = self.load(mode=MODE_POLL)
+
+        self.assertEqual(results["errors"], {})
+        self.assertGreater(results["ops"]["board"]["count"], 3)
+        self.assertGreater(results["ops"]["control"]["count"], 0)
+        self.assertLessEqual(results["ops"]["board"]["p50_ms"], results["ops"]["board"]["p99_ms"])
+        self.assertTrue(Player.objects.exclude(status=Player.STATUS_AVAILABLE).exists())
+
+    def test_streaming_spectators(self):
+        results = self.load()
+
+        self.assertEqual(results["errors"], {})
+        self.assertEqual(results["ops"]["board"]["count"], 3)           # one page load each
+        self.assertEqual(results["streams"]["max_open"], 3)
+        self.assertGreater(results["streams"]["events"], 0)             # the auctioneer's sales arrive
+        self.assertIn("control", results["slowdown"])
+
+    def test_stream_limit_falls_back_to_polling(self):
+        with override_settings(BOARD_STREAM_LIMIT=1):
+            results = self.load()
+
+        self.assertEqual(results["ops"]["stream"]["statuses"].get("204"), 2)
+        self.assertEqual(results["streams"]["fallbacks"], 2)
+        self.assertGreater(results["ops"]["board"]["count"], 3)
+
+
+class QueryCounterTest(TestCase):
+
+    def test_counts_by_request_kind(self):
+        counter = QueryCounter()
+        app     = counter.wsgi(lambda environ, start_response: Player.objects.count(),
+                               lambda path: "board" if path == "/" else "auctioneer")
+        counter.install(None, connection)
+        try:
+            app({"PATH_INFO": "/"}, None)
+            app({"PATH_INFO": "/auction/"}, None)
+            app({"PATH_INFO": "/auction/"}, None)
+        finally:
+            connection.execute_wrappers.remove(counter._count)
+        self.assertEqual(counter.counts, {"board": 1, "auctioneer": 2})
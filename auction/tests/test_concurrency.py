@@ -0,0 +1,71 @@
+import threading
+
+from django.db import connection, OperationalError
+from django.test import TransactionTestCase
+from auction.models import Player, Team, TournamentConfig, AuctionState, AuctionAction
+from auction.services.bidding_service import BiddingService
+
+WORKERS = 8
+
+
+class ParallelSellTest(TransactionTestCase):
+    """
+    Fires the same sell from several threads at once (one DB connection
+    each, like separate gunicorn workers). Whatever order they land in,
+    the player is sold once and exactly one wallet is debited once.
+    Needs a database the threads can share: Postgres (DATABASE_URL) or
+    the file-backed SQLite test DB that settings set up (WAL + IMMEDIATE).
+    """
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("in-memory SQLite test DB is per-connection")
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11, base_price_AR=100)
+        self.teams  = [Team.objects.create(name=f"Team {i}", remaining_points=10000) for i in range(WORKERS)]
+        self.player = Player.objects.create(name="Star", role="AR", base_price=100)
+        state = AuctionState.get()
+        state.current_player = self.player
+        state.is_active      = True
+        state.save()
+
+    def _fire(self, command):
+        barrier = threading.Barrier(WORKERS)
+        results = []
+
+        def run(i):
+            try:
+                barrier.wait()
+                results.append(command(i))
+            except OperationalError as e:   # lock timeout: the command did not run
+                results.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(WORKERS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_parallel_sells_sell_once(self):
+        results = self._fire(lambda i: BiddingService().sell_player(
+            self.player.serial_number, self.teams[i].team_serial_number, 700
+        ))
+        sold = [r for r in results if isinstance(r, tuple) and r[0]]
+        self.assertEqual(len(sold), 1)
+
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.status, Player.STATUS_SOLD)
+        self.assertEqual(AuctionAction.objects.filter(action="SELL").count(), 1)
+
+        wallets = sorted(Team.objects.values_list("remaining_points", flat=True))
+        self.assertEqual(wallets, [9300] + [10000] * (WORKERS - 1))
+        self.assertEqual(Team.objects.get(pk=self.player.team_id).remaining_points, 9300)
+
+    def test_parallel_unsold_recorded_once(self):
+        self._fire(lambda i: BiddingService().mark_unsold(self.player.serial_number))
+
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.rebid_count, 1)
+        self.assertEqual(AuctionAction.objects.filter(action="UNSOLD").count(), 1)
@@ -1,5 +1,9 @@
 import os, tempfile, csv
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from auction.models import Player, Team
 from auction.services.csv_service import CSVService
 
@@ -74,3 +78,90 @@ class TeamCSVTest(TestCase):
             valid, errors = svc.validate_teams_csv(path)
         self.assertEqual(valid, 1)
         self.assertEqual(Team.objects.count(), 0)
+
+
+class BulkImportTest(TestCase):
+
+    FIELDS = ["name", "role", "phone", "place"]
+
+    def test_duplicates_reported_per_row(self):
+        Player.objects.create(name="Existing", role="AR")
+        rows = [
+            {"name": "Existing", "role": "AR",  "phone": "9876543210", "place": "A"},
+            {"name": "New",      "role": "BAT", "phone": "9876543211", "place": "B"},
+            {"name": "New",      "role": "BAT", "phone": "9876543212", "place": "C"},
+        ]
+        with tempfile.TemporaryDirectory() as d:
+            created, errors = CSVService().import_players(make_csv(rows, self.FIELDS, d))
+        self.assertEqual(created, 1)
+        self.assertEqual(errors, ["Row 2 (Existing): duplicate player", "Row 4 (New): duplicate player"])
+        self.assertEqual(Player.objects.count(), 2)
+
+    def test_writes_in_batches(self):
+        rows = [{"name": f"P{i}", "role": "PLY", "phone": "9876543210", "place": "X"} for i in range(1200)]
+        with tempfile.TemporaryDirectory() as d:
+            path = make_csv(rows, self.FIELDS, d)
+            with CaptureQueriesContext(connection) as ctx:
+                created, errors = CSVService().import_players(path)
+        self.assertEqual(created, 1200)
+        # Multi-row INSERTs (SQLite splits them further by its parameter limit)
+        self.assertLess(len(ctx.captured_queries), 30)
+        self.assertEqual(Player.objects.count(), 1200)
+
+    def test_duplicate_team_in_file(self):
+        rows = [{"name": "Lions"}, {"name": "Lions"}]
+        with tempfile.TemporaryDirectory() as d:
+            created, errors = CSVService().import_teams(make_csv(rows, ["name"], d))
+        self.assertEqual(created, 1)
+        self.assertEqual(errors, ["Row 3 (Lions): duplicate team"])
+
+
+class ChunkedSourceTest(TestCase):
+
+    def _chunks(self, text, size):
+        data = text.encode("utf-8")
+        return (data[i:i + size] for i in range(0, len(data), size))
+
+    def test_chunks_split_mid_character_and_crlf(self):
+        text = "name,role,phone,place\r\nRamé,AR,9876543210,Udupi\r\n\"Kō, Jr\",BAT,9876543211,\"Ma\r\nngalore\"\r\n"
+        for size in (1, 2, 3, 7, 64):
+            Player.objects.all().delete()
+            created, errors = CSVService().import_players(self._chunks(text, size))
+            self.assertEqual((created, errors), (2, []), size)
+            self.assertEqual(
+                list(Player.objects.order_by("name").values_list("name", "place")),
+                [("Kō, Jr", "Ma\r\nngalore"), ("Ramé", "Udupi")],
+            )
+
+    def test_last_line_without_newline(self):
+        text = "name\nLions\nTigers"
+        created, errors = CSVService().import_teams(self._chunks(text, 4))
+        self.assertEqual(created, 2)
+
+    def test_progress_reported(self):
+        rows = "".join(f"P{i},PLY,9876543210,X\n" for i in range(1100))
+        seen = []
+        CSVService().validate_players_csv(
+            self._chunks("name,role,phone,place\n" + rows, 1000),
+            on_progress=lambda done, created, errors: seen.append(done),
+        )
+        self.assertEqual(seen, [500, 1000, 1100])
+
+    def test_upload_view_validates_file_in_place(self):
+        User.objects.create_superuser("sk", "sk@example.com", "sk")
+        self.client.login(username="sk", password="sk")
+        upload = SimpleUploadedFile("teams.csv", b"name\nLions\n", content_type="text/csv")
+        response = self.client.post("/auction/upload-csv/",
+                                    {"csv_type": "teams", "action": "validate", "file": upload})
+        self.assertEqual(response.context["result"]["created"], 1)
+        self.assertFalse(Team.objects.exists())
+
+    def test_unique_constraint_backs_up_batch(self):
+        # A name that slipped past the preloaded set (added concurrently)
+        Player.objects.create(name="Taken", role="AR")
+        batch = [(2, Player(name="Fresh", role="AR")), (3, Player(name="Taken", role="AR"))]
+        errors = []
+        rejected = CSVService()._flush(Player, batch, errors, "player")
+        self.assertEqual(rejected, 1)
+        self.assertEqual(errors, ["Row 3 (Taken): duplicate player"])
+        self.assertTrue(Player.objects.filter(name="Fresh").exists())
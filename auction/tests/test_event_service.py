@@ -0,0 +1,174 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from auction.models import Player, Team, TournamentConfig, AuctionState, BoardEvent, Jersey
+from auction.services.bidding_service import BiddingService
+from auction.services.event_service import EventService, board_mode, MODE_PRE, MODE_LIVE, MODE_DONE
+
+
+def close_stream(response):
+    """Hang up a stream the way the test client does: without closing the test DB connection."""
+    request_finished.disconnect(close_old_connections)
+    try:
+        response.close()
+    finally:
+        request_finished.connect(close_old_connections)
+
+
+class BoardModeTest(TestCase):
+
+    def test_no_config_is_pre(self):
+        self.assertEqual(board_mode(AuctionState.get(), None), MODE_PRE)
+
+    def test_active_is_live(self):
+        config = TournamentConfig.objects.create()
+        state  = AuctionState.get()
+        state.is_active = True
+        self.assertEqual(board_mode(state, config), MODE_LIVE)
+
+    def test_done(self):
+        config = TournamentConfig.objects.create()
+        state  = AuctionState.get()
+        state.phase = AuctionState.PHASE_DONE
+        self.assertEqual(board_mode(state, config), MODE_DONE)
+
+
+class PublishTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11)
+        self.team   = Team.objects.create(name="Team A", remaining_points=10000)
+        self.player = Player.objects.create(name="Ravi", role="AR", base_price=1000)
+        state = AuctionState.get()
+        state.is_active      = True
+        state.current_player = self.player
+        state.save()
+
+    def test_sell_publishes_team_fragment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            BiddingService().sell_player(self.player.serial_number, self.team.team_serial_number, 1000)
+        event = BoardEvent.objects.last()
+        self.assertEqual(event.kind, "SELL")
+        self.assertEqual(event.payload["mode"], MODE_LIVE)
+        fragments = event.payload["fragments"]
+        self.assertIn("onblock", fragments)
+        self.assertIn("Ravi", fragments[f"team-{self.team.team_serial_number}"])
+
+    def test_nothing_published_before_commit(self):
+        BiddingService().mark_unsold(self.player.serial_number)
+        self.assertEqual(BoardEvent.objects.count(), 0)
+
+    def test_stream_replays_missed_events(self):
+        first  = BoardEvent.objects.create(kind="PLAYER", payload={"mode": MODE_LIVE, "fragments": {}})
+        second = BoardEvent.objects.create(kind="SELL",   payload={"mode": MODE_LIVE, "fragments": {}})
+        stream = EventService().stream(last_event_id=first.pk)
+        self.assertTrue(next(stream).startswith("retry:"))
+        chunk = next(stream)
+        stream.close()
+        self.assertIn(f"id: {second.pk}\n", chunk)
+        self.assertIn('"kind": "SELL"', chunk)
+
+    def test_stream_view_content_type(self):
+        response = self.client.get("/board/stream/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        close_stream(response)
+
+    def test_streams_capped_per_process(self):
+        with override_settings(BOARD_STREAM_LIMIT=1):
+            first = self.client.get("/board/stream/")
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(self.client.get("/board/stream/").status_code, 204)   # board polls instead
+            close_stream(first)                                                     # slot freed on disconnect
+            again = self.client.get("/board/stream/")
+            self.assertEqual(again.status_code, 200)
+            close_stream(again)
+
+
+class StreamConnectionTest(TransactionTestCase):
+
+    def test_reconnect_releases_db_connection(self):
+        first  = BoardEvent.objects.create(kind="PLAYER", payload={"mode": MODE_LIVE, "fragments": {}})
+        second = BoardEvent.objects.create(kind="SELL",   payload={"mode": MODE_LIVE, "fragments": {}})
+        stream = EventService().stream(last_event_id=first.pk)
+        next(stream)
+        self.assertIn(f"id: {second.pk}\n", next(stream))
+        self.assertIsNone(connection.connection)   # not held for the rest of the stream
+        stream.close()
+
+
+class BoardVersionTest(TestCase):
+
+    def setUp(self):
+        Team.objects.create(name="Team A", remaining_points=10000)
+
+    def test_unchanged_board_returns_304_without_rendering(self):
+        etag = self.client.get("/")["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_publish_changes_version(self):
+        etag = self.client.get("/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            EventService().publish("SETTINGS", reload=True)
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_fixtures_public_304(self):
+        etag = self.client.get("/fixtures/public/")["ETag"]
+        response = self.client.get("/fixtures/public/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class TeamCardCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11)
+        self.teams  = [Team.objects.create(name=f"Team {i}", remaining_points=10000) for i in range(3)]
+        self.player = Player.objects.create(name="Ravi", role="AR", base_price=1000)
+        state = AuctionState.get()
+        state.is_active      = True
+        state.current_player = self.player
+        state.save()
+
+    def renders(self):
+        return mock.patch.object(EventService, "render_team", autospec=True,
+                                 side_effect=EventService.render_team)
+
+    def test_sale_rerenders_only_the_buying_team(self):
+        self.client.get("/")   # warm every card
+        BiddingService().sell_player(self.player.serial_number, self.teams[0].pk, 1000)
+
+        with self.renders() as render:
+            response = self.client.get("/")
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(render.call_args.args[1].pk, self.teams[0].pk)
+        self.assertContains(response, "Ravi")
+        self.assertContains(response, 'id="frag-team-', count=3)
+
+    def test_unchanged_teams_served_from_cache(self):
+        service = EventService()
+        service.team_cards(Team.objects.all())
+        with self.renders() as render:
+            cards = service.team_cards(Team.objects.all())
+        render.assert_not_called()
+        self.assertEqual(set(cards), {t.pk for t in self.teams})
+
+    def test_jersey_and_team_edits_bump_version(self):
+        BiddingService().sell_player(self.player.serial_number, self.teams[0].pk, 1000)
+        team    = Team.objects.get(pk=self.teams[0].pk)
+        version = team.version
+
+        Jersey.objects.create(player=self.player, jersey_name="RAVI", jersey_number=7,
+                              size_number=40, size_text="M")
+        self.assertGreater(Team.objects.get(pk=team.pk).version, version)
+
+        version = Team.objects.get(pk=team.pk).version
+        team.name = "Renamed"
+        team.save(update_fields=["name"])
+        self.assertNotEqual(Team.objects.get(pk=team.pk).version, version)
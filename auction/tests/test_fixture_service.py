@@ -0,0 +1,126 @@
+from importlib import import_module
+from itertools import combinations
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils.timezone import localtime
+from auction.models import Team, Match
+from auction.services.fixture_service import FixtureService
+
+
+class LeagueFixtureTest(TestCase):
+
+    def make_teams(self, n):
+        return [Team.objects.create(name=f"Team {i:02}", remaining_points=10000) for i in range(n)]
+
+    def test_circle_schedule(self):
+        for n in (4, 7):
+            teams  = list(range(n))
+            rounds = FixtureService().circle_rounds(teams)
+            self.assertEqual(len(rounds), n if n % 2 else n - 1)
+            for pairs in rounds:
+                playing = [t for pair in pairs for t in pair]
+                self.assertEqual(len(playing), len(set(playing)))   # nobody twice a day
+            played = sorted(tuple(sorted(p)) for pairs in rounds for p in pairs)
+            self.assertEqual(played, list(combinations(teams, 2)))
+
+    def test_generate_in_constant_queries(self):
+        teams = self.make_teams(12)
+        with self.assertNumQueries(5):   # savepoint, pairs, max number, one insert, release
+            created, skipped = FixtureService().generate_league(
+                teams, start="2026-03-01T10:00", venues=["North", "South"])
+        self.assertEqual((created, skipped), (66, 0))
+
+        day1 = Match.objects.filter(round_number=1)
+        self.assertEqual(day1.count(), 6)
+        self.assertEqual({localtime(m.scheduled_date).day for m in day1}, {1})
+        last = localtime(Match.objects.filter(round_number=11).first().scheduled_date)
+        self.assertEqual((last.day, last.hour), (11, 10))
+        self.assertEqual(set(day1.values_list("venue", flat=True)), {"North", "South"})
+        self.assertEqual(list(Match.objects.values_list("match_number", flat=True)), list(range(1, 67)))
+
+    def test_existing_pairs_skipped(self):
+        a, b, c = self.make_teams(3)
+        Match.objects.create(match_number=1, team1=b, team2=a)
+        created, skipped = FixtureService().generate_league([a, b, c])
+        self.assertEqual((created, skipped), (2, 1))
+        self.assertEqual(sorted(Match.objects.values_list("match_number", flat=True)), [1, 2, 3])
+
+    def test_league_pair_unique_either_way(self):
+        a, b = self.make_teams(2)
+        Match.objects.create(match_number=1, team1=a, team2=b)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Match.objects.create(match_number=2, team1=b, team2=a)
+        # A knockout rematch is allowed
+        Match.objects.create(match_number=2, team1=b, team2=a, stage=Match.STAGE_KNOCKOUT)
+
+    def test_stage_migration_stops_on_duplicate_league_pairs(self):
+        classify_stages = import_module("auction.migrations.0012_match_stage").classify_stages
+        a, b, c = self.make_teams(3)
+        Match.objects.create(match_number=1, team1=a, team2=b, round_label="League", winner=a)
+        # Entered again before the stage existed; labelled league, so a clash
+        Match.objects.create(match_number=2, team1=b, team2=a, round_label="League", winner=b,
+                             stage=Match.STAGE_KNOCKOUT)
+        semi = Match.objects.create(match_number=3, team1=a, team2=c, round_label="Semi-Final")
+
+        with self.assertRaisesRegex(RuntimeError, r"Team 00 v Team 01: matches #1 \(id \d+\), #2"):
+            classify_stages(apps, None)
+        semi.refresh_from_db()
+        self.assertEqual(semi.stage, Match.STAGE_LEAGUE)   # nothing rewritten
+
+        Match.objects.filter(match_number=2).update(round_label="Final")
+        classify_stages(apps, None)
+        self.assertEqual(dict(Match.objects.values_list("match_number", "stage")),
+                         {1: "LEAGUE", 2: "KNOCKOUT", 3: "KNOCKOUT"})
+
+
+class KnockoutFixtureTest(TestCase):
+
+    def setUp(self):
+        self.teams = [Team.objects.create(name=f"Team {i}", remaining_points=10000) for i in range(1, 9)]
+
+    def test_seeding_and_advance(self):
+        service = FixtureService()
+        self.assertEqual(service.bracket_order(8), [1, 8, 4, 5, 2, 7, 3, 6])
+        self.assertEqual(service.generate_knockout(self.teams), 4)
+
+        quarters = list(Match.objects.filter(stage=Match.STAGE_KNOCKOUT).order_by("bracket_slot"))
+        self.assertEqual([(m.team1.name, m.team2.name) for m in quarters[:2]],
+                         [("Team 1", "Team 8"), ("Team 4", "Team 5")])
+        self.assertEqual({m.round_label for m in quarters}, {"Quarter-Final"})
+
+        with self.assertRaises(ValueError):
+            service.advance_knockout()   # no winners yet
+
+        for m in quarters:
+            Match.objects.filter(pk=m.pk).update(winner=m.team1, status=Match.STATUS_COMPLETED)
+        self.assertEqual(service.advance_knockout(), 2)
+        semis = Match.objects.filter(round_number=2).order_by("bracket_slot")
+        self.assertEqual([(m.team1.name, m.team2.name) for m in semis],
+                         [("Team 1", "Team 4"), ("Team 2", "Team 3")])
+        self.assertEqual(semis[0].round_label, "Semi-Final")
+
+    def test_rejects_odd_bracket(self):
+        with self.assertRaises(ValueError):
+            FixtureService().generate_knockout(self.teams[:6])
+
+    def test_admin_seeds_from_table(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        a, b, c, d = self.teams[:4]
+        Match.objects.create(match_number=1, team1=a, team2=d, winner=d, status=Match.STATUS_COMPLETED)
+        self.client.post("/fixtures/", {"action": "generate_knockout", "qualifiers": "2"})
+        final = Match.objects.get(stage=Match.STAGE_KNOCKOUT)
+        self.assertEqual((final.team1, final.round_label), (d, "Final"))
+
+    def test_knockout_wins_do_not_score(self):
+        a, b = self.teams[:2]
+        Match.objects.create(match_number=1, team1=a, team2=b, winner=a, status=Match.STATUS_COMPLETED)
+        Match.objects.create(match_number=2, team1=a, team2=b, winner=b, status=Match.STATUS_COMPLETED,
+                             stage=Match.STAGE_KNOCKOUT)
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        for url in ("/fixtures/", "/fixtures/public/"):
+            points = {row["team"]: row for row in self.client.get(url).context["points"]}
+            self.assertEqual((points[a]["won"], points[a]["points"]), (1, 2), url)
+            self.assertEqual((points[b]["won"], points[b]["points"]), (0, 0), url)
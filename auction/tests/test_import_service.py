@@ -0,0 +1,114 @@
+import os, shutil, tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from auction.models import Player, ImportJob
+from auction.services import import_service
+from auction.services.csv_service import CSVService
+from auction.services.import_service import ImportService
+
+MEDIA = tempfile.mkdtemp()
+
+PLAYERS = (
+    "name,role,phone,place\n"
+    + "".join(f"P{i},PLY,9876543210,X\n" for i in range(1200))
+    + "P5,PLY,9876543210,X\n"          # duplicate
+    + "Bad,XX,9876543210,X\n"          # invalid role
+).encode()
+
+
+def upload(data=PLAYERS, name="players.csv"):
+    return SimpleUploadedFile(name, data, content_type="text/csv")
+
+
+@override_settings(MEDIA_ROOT=MEDIA)
+class ImportJobTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def test_enqueue_starts_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = ImportService().enqueue("players", upload())
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(job.status, ImportJob.STATUS_QUEUED)
+        self.assertTrue(job.file.name.startswith("imports/"))
+
+    def test_run_imports_and_records_progress(self):
+        job = ImportService().enqueue("players", upload())
+        ImportService().run(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_DONE)
+        self.assertEqual((job.rows_done, job.created, job.error_count), (1202, 1200, 2))
+        self.assertEqual(job.errors[0], "Row 1202 (P5): duplicate player")
+        self.assertEqual(Player.objects.count(), 1200)
+
+    def test_failed_import_commits_nothing(self):
+        job   = ImportService().enqueue("players", upload())
+        flush = CSVService._flush
+
+        def fail_second_batch(service, *args):
+            if service._flushed:
+                raise OSError("disk full")
+            service._flushed = True
+            return flush(service, *args)
+
+        with mock.patch.object(CSVService, "_flushed", False, create=True), \
+             mock.patch.object(CSVService, "_flush", autospec=True, side_effect=fail_second_batch):
+            ImportService().run(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+        self.assertIn("nothing was imported", job.message)
+        self.assertEqual(job.rows_done, 500)                # progress up to the failure is kept
+        self.assertEqual(Player.objects.count(), 0)         # the first batch rolled back too
+
+    def test_job_runs_once(self):
+        job = ImportService().enqueue("teams", upload(b"name\nLions\n", "teams.csv"))
+        ImportService().run(job.pk)
+        ImportService().run(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.created, 1)
+
+    def test_bad_header_fails_job(self):
+        job = ImportService().enqueue("players", upload(b"nope\nx\n"))
+        path = job.file.path
+        ImportService().run(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+        self.assertIn("Invalid CSV header", job.message)
+        self.assertFalse(os.path.exists(path))   # failed uploads don't pile up in media/
+
+    def test_poll_does_not_requeue_a_waiting_job(self):
+        job = ImportService().enqueue("players", upload())
+        ImportJob.objects.filter(pk=job.pk).update(created_at=timezone.now() - timedelta(minutes=1))
+        pending = mock.Mock(done=mock.Mock(return_value=False))
+        with mock.patch.object(import_service._executor, "submit", return_value=pending) as submit:
+            for _ in range(3):
+                ImportService().status(job.pk)
+        self.assertEqual(submit.call_count, 1)
+        import_service._submitted.pop(job.pk, None)
+
+    def test_dead_worker_marked_failed_on_poll(self):
+        job = ImportService().enqueue("players", upload())
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=ImportJob.STATUS_RUNNING, heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(ImportService().status(job.pk).status, ImportJob.STATUS_FAILED)
+        self.assertFalse(os.path.exists(job.file.path))
+
+    def test_upload_view_redirects_to_job(self):
+        User.objects.create_superuser("sk", "sk@example.com", "sk")
+        self.client.login(username="sk", password="sk")
+        response = self.client.post("/auction/upload-csv/", {"csv_type": "players", "file": upload()})
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, f"/auction/upload-csv/?job={job.pk}")
+        data = self.client.get(f"/auction/import-jobs/{job.pk}/").json()
+        self.assertEqual(data["status"], ImportJob.STATUS_QUEUED)
+        self.assertFalse(data["finished"])
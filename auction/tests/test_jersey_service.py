@@ -0,0 +1,264 @@
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from auction.models import Player, Team, TournamentConfig, Jersey, ExtraJerseyMember
+from auction.services.bidding_service import BiddingService
+from auction.services import jersey_service
+from auction.services.jersey_service import JerseyService, JerseyNumberIndex
+
+PAGE = re.compile(rb"/Type /Page\b(?!s)")
+
+
+class JerseyPdfTest(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.teams = [Team.objects.create(name=f"Team {i}", remaining_points=10000) for i in range(2)]
+        for i in range(60):
+            p = Player.objects.create(name=f"P{i:02}", role="BAT", status=Player.STATUS_SOLD,
+                                      team=self.teams[i % 2], sold_price=100)
+            Jersey.objects.create(player=p, jersey_name=p.name, jersey_number=i,
+                                  size_number=40, size_text="L")
+
+    def test_split_per_team_across_pages(self):
+        pdf = JerseyService().export_pdf(BytesIO()).getvalue()
+        self.assertEqual(len(PAGE.findall(pdf)), 2)   # one page per team of 30
+
+        rows = JerseyService().export_rows() * 3       # 90 rows each — overflows a page
+        pdf  = JerseyService().export_pdf(BytesIO(), rows).getvalue()
+        self.assertGreater(len(PAGE.findall(pdf)), 2)
+
+    def test_cached_until_data_changes(self):
+        service = JerseyService()
+        with mock.patch.object(JerseyService, "export_pdf", autospec=True,
+                               side_effect=JerseyService.export_pdf) as build:
+            pdf, first = service.cached_pdf()
+            pdf.close()
+            pdf, again = service.cached_pdf()
+            pdf.close()
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(first, again)
+
+            Jersey.objects.filter(jersey_number=0).update(jersey_name="CAPTAIN")
+            pdf, changed = service.cached_pdf()
+            pdf.close()
+            self.assertEqual(build.call_count, 2)
+            self.assertNotEqual(changed, first)
+
+        # Only the current version is kept
+        self.assertEqual(os.listdir(os.path.join(self.media, "exports")), [f"jerseys-{changed}.pdf"])
+
+    def test_view_etag(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        response = self.client.get("/jersey/pdf/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+
+        etag = response["ETag"]
+        self.assertEqual(self.client.get("/jersey/pdf/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        for header in (f"W/{etag}", f'"other", {etag}', "*"):
+            self.assertEqual(self.client.get("/jersey/pdf/", HTTP_IF_NONE_MATCH=header).status_code, 304, header)
+        partial = self.client.get("/jersey/pdf/", HTTP_IF_NONE_MATCH=f'"x{etag[1:-1]}x"')   # contains the tag
+        self.assertEqual(partial.status_code, 200)
+        b"".join(partial.streaming_content)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.post("/jersey/save/", {"player_id": Player.objects.first().pk,
+                                               "jersey_name": "NEW", "jersey_number": "99"})
+        response = self.client.get("/jersey/pdf/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        response.close()
+
+
+class JerseyBundleTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(size_mapping='{"38":"S","40":"M"}')
+        a = Team.objects.create(name="Alpha XI", remaining_points=10000)
+        b = Team.objects.create(name="Beta XI", remaining_points=10000)
+        for i, (team, size) in enumerate([(a, 38), (a, 40), (b, 40), (b, 0)]):
+            p = Player.objects.create(name=f"P{i}", role="BAT", status=Player.STATUS_SOLD,
+                                      team=team, sold_price=100)
+            Jersey.objects.create(player=p, jersey_name=p.name, jersey_number=i,
+                                  size_number=size, size_text="")
+        ExtraJerseyMember.objects.create(name="Coach", role_label="Coach", team=a)
+        ExtraJerseyMember.objects.create(name="Umpire", member_type=ExtraJerseyMember.TYPE_ORGANISER,
+                                         group_name="Officials")
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+
+    def test_zip_contents(self):
+        response = self.client.get("/jersey/bundle/")
+        self.assertEqual(response["Content-Type"], "application/zip")
+        bundle = zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+
+        self.assertEqual(sorted(bundle.namelist()), [
+            "organisers.pdf", "size_summary.csv", "size_summary.pdf",
+            "teams/01-alpha-xi.pdf", "teams/02-beta-xi.pdf",
+        ])
+        for name in bundle.namelist():
+            if name.endswith(".pdf"):
+                self.assertTrue(bundle.read(name).startswith(b"%PDF"), name)
+
+        summary = bundle.read("size_summary.csv").decode().splitlines()
+        self.assertEqual(summary, [
+            "Team,S,M,No size,Total",
+            "Alpha XI,1,1,1,3",
+            "Beta XI,0,1,1,2",
+            "Organisers,0,0,1,1",
+            "Total,1,2,3,6",
+        ])
+
+    def test_shared_pool_matches_inline(self):
+        service = JerseyService()
+        sheets, summary = service.bundle_sheets()
+
+        def contents(parallel):
+            bundle = zipfile.ZipFile(BytesIO(b"".join(service.stream_bundle(sheets, summary, parallel))))
+            return sorted(bundle.namelist())
+
+        self.assertEqual(contents(True), contents(False))
+        pool = jersey_service.render_pool()
+        contents(True)
+        self.assertIs(jersey_service.render_pool(), pool)   # reused, not one per request
+
+
+class JerseyBatchTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(size_mapping='{"40":"M"}')
+        self.team = Team.objects.create(name="Alpha XI", remaining_points=10000)
+        self.a = Player.objects.create(name="A", role="BAT", status=Player.STATUS_SOLD, team=self.team, sold_price=100)
+        self.b = Player.objects.create(name="B", role="BAT", status=Player.STATUS_SOLD, team=self.team, sold_price=100)
+        Jersey.objects.create(player=self.a, jersey_name="A", jersey_number=7, size_number=0, size_text="")
+        self.coach = ExtraJerseyMember.objects.create(name="Coach", team=self.team, jersey_number=1)
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+
+    def post(self, rows):
+        with self.captureOnCommitCallbacks(execute=False):
+            return self.client.post("/jersey/batch/", rows, content_type="application/json").json()
+
+    def test_bulk_writes_with_per_row_results(self):
+        version = Team.objects.get(pk=self.team.pk).version
+        with self.assertNumQueries(15):   # constant, however many rows
+            body = self.post([
+                {"player_id": self.a.pk, "jersey_name": "ACE", "size_number": 40},
+                {"player_id": self.b.pk, "jersey_name": "BEE", "jersey_number": 9},
+                {"extra_id": self.coach.pk, "jersey_number": 2},
+            ])
+        self.assertEqual((body["saved"], body["failed"]), (3, 0))
+
+        a = Jersey.objects.get(player=self.a)
+        self.assertEqual((a.jersey_name, a.jersey_number, a.size_text), ("ACE", 7, "M"))
+        self.assertEqual(Jersey.objects.get(player=self.b).jersey_number, 9)
+        self.assertEqual(ExtraJerseyMember.objects.get(pk=self.coach.pk).jersey_number, 2)
+        self.assertGreater(Team.objects.get(pk=self.team.pk).version, version)
+
+    def test_duplicate_numbers_fail_their_row_only(self):
+        body = self.post([
+            {"player_id": self.b.pk, "jersey_number": 7},         # A already wears 7
+            {"player_id": self.a.pk, "jersey_number": 8},         # A moves to 8 ...
+            {"player_id": self.b.pk, "jersey_number": 7},         # ... so 7 is free now
+            {"extra_id": self.coach.pk, "jersey_number": 8},      # taken by A in this batch
+            {"player_id": 9999, "jersey_number": 3},
+            {"player_id": self.b.pk, "jersey_number": "x"},
+        ])
+        self.assertEqual([r["status"] for r in body["results"]],
+                         ["error", "ok", "ok", "error", "error", "error"])
+        self.assertEqual(Jersey.objects.get(player=self.a).jersey_number, 8)
+        self.assertEqual(Jersey.objects.get(player=self.b).jersey_number, 7)
+        self.assertEqual(ExtraJerseyMember.objects.get(pk=self.coach.pk).jersey_number, 1)
+
+    def test_rejects_non_array(self):
+        response = self.client.post("/jersey/batch/", {"rows": 1}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+
+class JerseyNumberTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11)
+        self.team = Team.objects.create(name="Alpha XI", remaining_points=10000)
+        self.a = Player.objects.create(name="A", role="BAT", status=Player.STATUS_SOLD, team=self.team, sold_price=100)
+        self.b = Player.objects.create(name="B", role="BAT", status=Player.STATUS_SOLD, team=self.team, sold_price=100)
+        Jersey.objects.create(player=self.a, jersey_name="A", jersey_number=1, size_number=0, size_text="")
+
+    def test_unique_per_team_in_db(self):
+        self.assertEqual(Jersey.objects.get(player=self.a).team, self.team)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Jersey.objects.create(player=self.b, jersey_name="B", jersey_number=1, size_number=0, size_text="")
+        # Unsold players carry no team, so their numbers never clash
+        free = Player.objects.create(name="C", role="BAT")
+        Jersey.objects.create(player=free, jersey_name="C", jersey_number=1, size_number=0, size_text="")
+
+    def test_sale_into_a_clash_clears_the_number(self):
+        c = Player.objects.create(name="C", role="BAT", base_price=100)
+        Jersey.objects.create(player=c, jersey_name="C", jersey_number=1, size_number=0, size_text="")
+        with self.assertLogs("auction", level="WARNING") as logs:
+            BiddingService().sell_player(c.pk, self.team.pk, 100, force=True)
+        jersey = Jersey.objects.get(player=c)
+        self.assertEqual((jersey.team, jersey.jersey_number), (self.team, 0))
+        self.assertIn("Jersey #1 of C cleared", logs.output[0])
+
+        BiddingService().undo_last_action()
+        self.assertIsNone(Jersey.objects.get(player=c).team)
+
+    def test_sale_clashing_with_a_team_extra_clears_the_number(self):
+        ExtraJerseyMember.objects.create(name="Coach", team=self.team, jersey_number=9)
+        c = Player.objects.create(name="C", role="BAT", base_price=100)
+        Jersey.objects.create(player=c, jersey_name="C", jersey_number=9, size_number=0, size_text="")
+        with self.assertLogs("auction", level="WARNING"):
+            BiddingService().sell_player(c.pk, self.team.pk, 100, force=True)
+        self.assertEqual(Jersey.objects.get(player=c).jersey_number, 0)
+
+    def test_index_locks_the_teams(self):
+        with mock.patch.object(Team, "lock", wraps=Team.lock) as lock:
+            index = JerseyNumberIndex([self.team.pk, None])
+        lock.assert_called_once_with([self.team.pk, None])
+        self.assertEqual(set(index.numbers), {self.team.pk})
+
+    def test_auto_assign_respects_preferences(self):
+        c = Player.objects.create(name="C", role="BAT", status=Player.STATUS_SOLD, team=self.team,
+                                  sold_price=100, preferred_jersey_number=2)
+        d = Player.objects.create(name="D", role="BAT", status=Player.STATUS_SOLD, team=self.team,
+                                  sold_price=100, preferred_jersey_number=1)   # taken by A
+        coach = ExtraJerseyMember.objects.create(name="Coach", team=self.team)
+
+        with self.assertNumQueries(12):   # constant, however many teams
+            assigned = JerseyService().auto_assign()
+        self.assertEqual(assigned, {self.team.pk: 4})
+
+        numbers = dict(Jersey.objects.values_list("player__name", "jersey_number"))
+        self.assertEqual(numbers, {"A": 1, "B": 3, "C": 2, "D": 4})
+        self.assertEqual(ExtraJerseyMember.objects.get(pk=coach.pk).jersey_number, 5)
+        self.assertEqual(JerseyService().auto_assign(), {})
+
+    def test_index_claims_in_memory(self):
+        index = JerseyNumberIndex([self.team.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(index.owner(self.team.pk, 1), ("player", self.a.pk))
+            self.assertEqual(index.next_free(self.team.pk), 2)
+            with self.assertRaises(ValueError):
+                index.claim(self.team.pk, ("player", self.b.pk), 1)
+            index.claim(self.team.pk, ("player", self.a.pk), 7)   # A moves: 1 is free again
+            self.assertEqual(index.next_free(self.team.pk), 1)
+
+    def test_portal_auto_assign_redirects(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self.client.post("/jersey/", {"action": "auto_assign", "team_id": self.team.pk})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Jersey.objects.get(player=self.b).jersey_number, 2)
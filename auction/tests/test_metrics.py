@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from auction.models import Team, TournamentConfig
+from auction.utils import metrics
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+
+    def setUp(self):
+        metrics.clear()
+        TournamentConfig.objects.create(total_points=10000)
+        Team.objects.create(name="Team A", remaining_points=10000)
+
+    def test_records_queries_and_template_time(self):
+        with self.assertNoLogs("system", level="INFO"):   # fast requests only go to the window
+            self.client.get("/")
+        row = next(r for r in metrics.summary() if r["view"] == "public_board")
+        self.assertEqual(row["count"], 1)
+        self.assertGreater(row["queries"], 0)
+        self.assertGreater(row["template_ms"], 0)
+
+    @override_settings(SLOW_REQUEST_QUERIES=1)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs("system", level="INFO") as logs:
+            self.client.get("/")
+        self.assertIn("slow request view=public_board method=GET status=200", logs.output[-1])
+
+    def test_not_modified_is_recorded(self):
+        etag = self.client.get("/")["ETag"]
+        self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        row = next(r for r in metrics.summary() if r["view"] == "public_board")
+        self.assertEqual(row["count"], 2)
+
+    @override_settings(REQUEST_METRICS=False)
+    def test_switch_off(self):
+        self.client.get("/")
+        self.assertEqual(metrics.summary(), [])
+
+
+class RequestMetricsPageTest(TestCase):
+
+    def setUp(self):
+        metrics.clear()
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user("viewer", password="x"))
+        self.assertEqual(self.client.get("/auction/metrics/").status_code, 302)
+
+    def test_lists_views(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        self.client.get("/")
+        response = self.client.get("/auction/metrics/")
+        self.assertContains(response, "public_board")
+        self.client.post("/auction/metrics/")
+        self.assertEqual([r["view"] for r in metrics.summary()], ["request_metrics"])
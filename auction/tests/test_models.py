@@ -1,3 +1,8 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 from auction.models import Player, Team, TournamentConfig
 
@@ -68,3 +73,127 @@ class PlayerSaveTest(TestCase):
         self.team_b.refresh_from_db()
         self.assertEqual(self.team_a.remaining_points, 10000)  # refunded
         self.assertEqual(self.team_b.remaining_points, 9500)   # deducted
+
+
+class PlayerLedgerTest(TestCase):
+
+    def setUp(self):
+        self.team_a = Team.objects.create(name="Team A", remaining_points=10000)
+        self.team_b = Team.objects.create(name="Team B", remaining_points=10000)
+
+    def test_price_edit_does_not_reread_player(self):
+        p = Player.objects.create(name="Dinesh", role="AR", base_price=1000,
+                                   status=Player.STATUS_SOLD, team=self.team_a, sold_price=1000)
+        p = Player.objects.get(pk=p.pk)
+        p.sold_price = 1200
+        with self.assertNumQueries(2):   # UPDATE player, UPDATE team wallet
+            p.save()
+        self.team_a.refresh_from_db()
+        self.assertEqual(self.team_a.remaining_points, 8800)
+
+    def test_stale_team_instances_do_not_lose_debits(self):
+        stale = Team.objects.get(pk=self.team_a.pk)
+        Player.objects.create(name="P1", role="BAT", status=Player.STATUS_SOLD,
+                              team=stale, sold_price=500)
+        Player.objects.create(name="P2", role="BAT", status=Player.STATUS_SOLD,
+                              team=Team.objects.get(pk=self.team_a.pk), sold_price=700)
+        self.team_a.refresh_from_db()
+        self.assertEqual(self.team_a.remaining_points, 8800)
+
+    def test_non_financial_save_skips_wallet(self):
+        p = Player.objects.create(name="Kiran", role="PLY", base_price=100)
+        p.notes = "left-handed"
+        with self.assertNumQueries(1):
+            p.save()
+
+    def test_deferred_load_still_refunds(self):
+        p = Player.objects.create(name="Arun", role="BAT", status=Player.STATUS_SOLD,
+                                  team=self.team_b, sold_price=400)
+        p = Player.objects.only("name").get(pk=p.pk)
+        p.status = Player.STATUS_AVAILABLE
+        p.save()
+        self.team_b.refresh_from_db()
+        self.assertEqual(self.team_b.remaining_points, 10000)
+
+
+class SquadCounterTest(TestCase):
+
+    def setUp(self):
+        self.team_a = Team.objects.create(name="Team A", remaining_points=10000)
+        self.team_b = Team.objects.create(name="Team B", remaining_points=10000)
+
+    def _counts(self, team):
+        team.refresh_from_db()
+        return team.squad_size, team.sold_ar, team.sold_bat, team.sold_bowl, team.sold_ply
+
+    def test_sell_and_unsell_move_counters(self):
+        p = Player.objects.create(name="Ravi", role="AR", status=Player.STATUS_SOLD,
+                                  team=self.team_a, sold_price=0)
+        self.assertEqual(self._counts(self.team_a), (1, 1, 0, 0, 0))
+        p.status = Player.STATUS_AVAILABLE
+        p.team   = None
+        p.save()
+        self.assertEqual(self._counts(self.team_a), (0, 0, 0, 0, 0))
+
+    def test_switch_team_and_role(self):
+        p = Player.objects.create(name="Vijay", role="BAT", status=Player.STATUS_SOLD,
+                                  team=self.team_a, sold_price=300)
+        p.role = "BOWL"
+        p.save()
+        self.assertEqual(self._counts(self.team_a), (1, 0, 0, 1, 0))
+        self.assertEqual(self.team_a.remaining_points, 9700)
+        p.team = self.team_b
+        p.save()
+        self.assertEqual(self._counts(self.team_a), (0, 0, 0, 0, 0))
+        self.assertEqual(self._counts(self.team_b), (1, 0, 0, 1, 0))
+
+    def test_loaded_team_instance_kept_in_step(self):
+        Player.objects.create(name="Ajay", role="PLY", status=Player.STATUS_SOLD,
+                              team=self.team_a, sold_price=100)
+        self.assertEqual(self.team_a.squad_size, 1)
+        self.assertEqual(self.team_a.sold_in_role("PLY"), 1)
+
+    def test_delete_sold_player_leaves_squad(self):
+        p = Player.objects.create(name="Anil", role="AR", status=Player.STATUS_SOLD,
+                                  team=self.team_a, sold_price=100)
+        p.delete()
+        self.assertEqual(self._counts(self.team_a), (0, 0, 0, 0, 0))
+        self.assertEqual(self.team_a.remaining_points, 10000)   # price refunded with the squad slot
+
+    def test_queryset_delete_refunds_sold_players(self):
+        for name in ("Anil", "Sunil"):
+            Player.objects.create(name=name, role="BAT", status=Player.STATUS_SOLD,
+                                  team=self.team_a, sold_price=250)
+        Player.objects.filter(team=self.team_a).delete()
+        self.assertEqual(self._counts(self.team_a), (0, 0, 0, 0, 0))
+        self.assertEqual(self.team_a.remaining_points, 10000)
+
+    def test_admin_rename_keeps_counters(self):
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+        Player.objects.create(name="Anil", role="AR", status=Player.STATUS_SOLD,
+                              team=self.team_a, sold_price=100)
+        response = self.client.post(f"/admin/auction/team/{self.team_a.pk}/change/", {
+            "name": "Team Alpha", "short_name": "", "owners": "", "payment_info": 0, "notes": "",
+            "remaining_points": 9900, "squad_size": 0, "sold_ar": 0,   # stale form values are ignored
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._counts(self.team_a), (1, 1, 0, 0, 0))
+        self.assertEqual(self.team_a.name, "Team Alpha")
+
+
+class ReconcileTeamsCommandTest(TestCase):
+
+    def test_detects_and_fixes_drift(self):
+        team = Team.objects.create(name="Team A", remaining_points=10000)
+        Player.objects.create(name="Ravi", role="AR", status=Player.STATUS_SOLD, team=team, sold_price=100)
+        Team.objects.update(squad_size=5, sold_ar=0)
+
+        with self.assertRaises(CommandError):
+            call_command("reconcile_teams", stdout=StringIO())
+        call_command("reconcile_teams", "--fix", stdout=StringIO())
+
+        team.refresh_from_db()
+        self.assertEqual((team.squad_size, team.sold_ar), (1, 1))
+        out = StringIO()
+        call_command("reconcile_teams", stdout=out)
+        self.assertIn("match", out.getvalue())
@@ -0,0 +1,142 @@
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from auction.models import Player, Team, TournamentConfig, AuctionState, AuctionSnapshot, AuctionAction
+from auction.services.auction_engine import AuctionEngine
+from auction.services.bidding_service import BiddingService
+from auction.services.replay_service import ReplayService
+
+
+class ReplayTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11,
+                                        base_price_AR=100, base_price_PLY=100, max_rebid_attempts=2)
+        self.team   = Team.objects.create(name="Team X", remaining_points=10000)
+        self.svc    = BiddingService()
+        self.replay = ReplayService()
+
+    def _on_block(self, name, role="AR"):
+        player = Player.objects.create(name=name, role=role, base_price=100)
+        state  = AuctionState.get()
+        state.current_player = player
+        state.save()
+        return player
+
+    def _play(self):
+        a = self._on_block("A")
+        self.svc.sell_player(a.serial_number, self.team.team_serial_number, 500)
+        b = self._on_block("B", role="PLY")
+        self.svc.mark_unsold(b.serial_number)
+        c = self._on_block("C")
+        self.svc.sell_player(c.serial_number, self.team.team_serial_number, 900)
+        self.svc.undo_last_action()
+        self.svc.undo_last_action()
+        self.svc.redo_last_undo()
+        return a, b, c
+
+    def test_live_tables_match_log(self):
+        self._play()
+        self.assertEqual(self.replay.verify(), [])
+
+    def test_apply_repairs_manual_edits(self):
+        a, b, c = self._play()
+        Player.objects.filter(pk=a.pk).update(status=Player.STATUS_AVAILABLE, team=None, sold_price=None)
+        Team.objects.update(remaining_points=1, squad_size=7)
+        AuctionState.objects.update(head_action=None)
+
+        self.assertTrue(self.replay.verify())
+        self.replay.apply()
+        self.assertEqual(self.replay.verify(), [])
+
+        a.refresh_from_db()
+        self.team.refresh_from_db()
+        self.assertEqual((a.status, a.team_id, a.sold_price), (Player.STATUS_SOLD, self.team.pk, 500))
+        self.assertEqual((self.team.remaining_points, self.team.squad_size), (9500, 1))
+
+    def test_snapshot_folds_only_the_tail(self):
+        self._play()
+        full = self.replay.rebuild()
+        with mock.patch("auction.services.replay_service.SNAPSHOT_EVERY", 1):
+            d = self._on_block("D")
+            self.svc.mark_not_playing(d.serial_number)
+        snap = AuctionSnapshot.objects.first()
+        self.assertEqual(snap.reason, AuctionSnapshot.REASON_PERIODIC)
+
+        rebuilt = self.replay.rebuild()
+        full["players"][d.pk] = [Player.STATUS_NOT_PLAYING, None, None, 0]
+        full["state"]["head_action_id"] = snap.last_action_id
+        full["state"]["redo_action_id"] = None
+        self.assertEqual(rebuilt, full)
+        self.assertEqual(self.replay.verify(rebuilt), [])
+
+    def test_snapshot_does_not_absorb_manual_edits(self):
+        a, b, c = self._play()
+        Player.objects.filter(pk=b.pk).update(status=Player.STATUS_SOLD, team=self.team, sold_price=300)
+        drift = self.replay.verify()
+        self.assertTrue(drift)
+
+        with self.assertLogs("error", level="ERROR"):
+            snap = self.replay.snapshot()
+        snap.refresh_from_db()
+        self.assertEqual(snap.data["players"][str(b.pk)][0], Player.STATUS_UNSOLD)
+        self.assertEqual(self.replay.verify(), drift)   # still detectable ...
+        self.replay.apply()                              # ... and recoverable
+        b.refresh_from_db()
+        self.assertEqual((b.status, b.team_id), (Player.STATUS_UNSOLD, None))
+
+    def test_reset_snapshot_is_the_new_baseline(self):
+        self._play()
+        AuctionEngine().reset_auction()
+        self.assertEqual(AuctionSnapshot.objects.first().reason, AuctionSnapshot.REASON_RESET)
+        self.assertEqual(self.replay.verify(), [])
+
+
+class ReplayAuctionCommandTest(TestCase):
+
+    def test_detects_and_fixes_drift(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11, base_price_AR=100)
+        team   = Team.objects.create(name="Team A", remaining_points=10000)
+        player = Player.objects.create(name="Ravi", role="AR", base_price=100)
+        BiddingService().sell_player(player.serial_number, team.team_serial_number, 300)
+        Team.objects.update(remaining_points=10000)
+
+        with self.assertRaises(CommandError):
+            call_command("replay_auction", stdout=StringIO())
+        call_command("replay_auction", "--fix", stdout=StringIO())
+
+        team.refresh_from_db()
+        self.assertEqual(team.remaining_points, 9700)
+        out = StringIO()
+        call_command("replay_auction", stdout=out)
+        self.assertIn("match", out.getvalue())
+
+
+class LegacyLogMigrationTest(TestCase):
+
+    def test_auto_dropped_players_keep_their_rebid_count(self):
+        TournamentConfig.objects.create(total_points=10000, max_rebid_attempts=2)
+        AuctionState.get()
+        auto   = Player.objects.create(name="Auto", role="PLY", base_price=100,
+                                       status=Player.STATUS_NOT_PLAYING, rebid_count=2)
+        manual = Player.objects.create(name="Manual", role="PLY", base_price=100,
+                                       status=Player.STATUS_NOT_PLAYING, rebid_count=1)
+        # Rows as the old code logged them: no rebid flag, no chain
+        AuctionAction.objects.create(player=auto,   action="UNSOLD")
+        AuctionAction.objects.create(player=manual, action="UNSOLD")
+        drop = AuctionAction.objects.create(player=auto,   action="NOT_PLAYING")   # out of rebids
+        gone = AuctionAction.objects.create(player=manual, action="NOT_PLAYING")   # marked by hand
+        AuctionAction.objects.update(rebid=False)
+
+        import_module("auction.migrations.0008_action_event_log").chain_existing_actions(apps, None)
+
+        drop.refresh_from_db()
+        gone.refresh_from_db()
+        self.assertEqual((drop.rebid, gone.rebid), (True, False))
+        self.assertEqual(ReplayService().verify(), [])
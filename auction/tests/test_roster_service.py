@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from auction.models import Player, Team, TournamentConfig, AuctionState, Jersey
+from auction.services.roster_service import RosterService
+
+
+def seed(teams, players_per_team):
+    roles = ["AR", "BAT", "BOWL", "PLY"]
+    start = Team.objects.count()   # names are unique; seed() can be called twice
+    for t in range(start, start + teams):
+        team = Team.objects.create(name=f"Team {t}", remaining_points=10000)
+        for i in range(players_per_team):
+            p = Player.objects.create(name=f"T{t} P{i}", role=roles[i % 4], base_price=100,
+                                      status=Player.STATUS_SOLD, team=team, sold_price=100)
+            Jersey.objects.create(player=p, jersey_name=p.name, jersey_number=i + 1,
+                                  size_number=0, size_text="")
+
+
+class LoadRostersTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000)
+        seed(16, 20)
+
+    def test_constant_queries_for_16_teams(self):
+        with self.assertNumQueries(3):
+            teams = RosterService().load_rosters()
+            for team in teams:
+                for p in team.sold_players:
+                    p.jersey.jersey_number
+        self.assertEqual(len(teams), 16)
+        self.assertEqual(teams[0].player_count, 20)
+        self.assertEqual(teams[0].total_spent, 2000)
+
+    def test_unsold_players_excluded(self):
+        team = Team.objects.first()
+        Player.objects.create(name="Spare", role="AR", team=team, status=Player.STATUS_UNSOLD)
+        teams = RosterService().load_rosters(Team.objects.filter(pk=team.pk))
+        self.assertNotIn("Spare", [p.name for p in teams[0].sold_players])
+
+    def test_pool_counts(self):
+        Player.objects.create(name="A1", role="AR", status=Player.STATUS_AVAILABLE)
+        Player.objects.create(name="A2", role="AR", status=Player.STATUS_UNSOLD)
+        with self.assertNumQueries(1):
+            self.assertEqual(RosterService().pool_counts("AR"), (1, 1))
+
+
+class ViewQueryBoundTest(TestCase):
+    """Page query counts must not grow with the number of teams."""
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000)
+        state = AuctionState.get()
+        state.is_active = True
+        state.save()
+        user = User.objects.create_superuser("sk", "sk@example.com", "sk")
+        self.client.force_login(user)
+
+    def _count(self, url):
+        cache.clear()   # cold team cards: the board's worst case
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_pages_bounded(self):
+        seed(2, 2)
+        urls = ("/", "/auction/summary/", "/jersey/")
+        for url in urls:
+            self._count(url)   # warm up: singletons get created on first hit
+        small = {url: self._count(url) for url in urls}
+        seed(14, 20)   # 16 teams in total
+        for url, expected in small.items():
+            self.assertEqual(self._count(url), expected, url)
@@ -0,0 +1,27 @@
+from django.test import TestCase
+
+from auction.models import Player
+from auction.services.replay_service import ReplayService
+from benchmarks.simulation import AuctionSimulator, percentile
+
+
+class AuctionSimulatorTest(TestCase):
+
+    def test_full_auction_day(self):
+        results = AuctionSimulator(teams=4, players=60, seed=3).run()
+
+        self.assertFalse(Player.objects.filter(status=Player.STATUS_AVAILABLE).exists())
+        self.assertEqual(sum(results["outcome"].values()), 60)
+        for op in ("start", "next", "sell", "unsold", "transition"):
+            self.assertGreater(results["ops"][op]["count"], 0, op)
+        self.assertGreater(results["ops"]["sell"]["queries_mean"], 0)
+        # The log the simulation wrote replays to the same tables
+        self.assertEqual(ReplayService().verify(), [])
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([4.0], 95), 4.0)
+        self.assertEqual(percentile([], 95), 0.0)
+
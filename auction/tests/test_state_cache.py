@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from auction.models import Team, TournamentConfig, TournamentSettings, AuctionState
+from auction.utils import state_cache
+
+
+class RequestScopeTest(TestCase):
+
+    def test_state_loaded_once_per_scope(self):
+        AuctionState.get()
+        with state_cache.request_scope():
+            with self.assertNumQueries(1):
+                first  = AuctionState.get()
+                second = AuctionState.get()
+        self.assertIs(first, second)
+
+    def test_no_caching_outside_scope(self):
+        AuctionState.get()
+        self.assertIsNot(AuctionState.get(), AuctionState.get())
+
+    def test_save_refreshes_cached_state(self):
+        with state_cache.request_scope():
+            AuctionState.get()
+            fresh = AuctionState.objects.get(pk=1)
+            fresh.current_category = "BAT"
+            fresh.save()
+            with self.assertNumQueries(0):
+                self.assertEqual(AuctionState.get().current_category, "BAT")
+
+    def test_config_invalidated_on_create_and_delete(self):
+        with state_cache.request_scope():
+            self.assertIsNone(TournamentConfig.current())
+            config = TournamentConfig.objects.create(total_points=5000)
+            self.assertEqual(TournamentConfig.current().pk, config.pk)
+            TournamentConfig.objects.all().delete()
+            self.assertIsNone(TournamentConfig.current())
+
+    def test_settings_cached(self):
+        TournamentSettings.get()
+        with state_cache.request_scope():
+            with self.assertNumQueries(1):
+                TournamentSettings.get()
+                TournamentSettings.get()
+
+
+class ControlPageSingletonQueriesTest(TestCase):
+
+    def setUp(self):
+        TournamentConfig.objects.create(total_points=10000, bidding_slots=11)
+        TournamentSettings.get()
+        Team.objects.create(name="Team A", remaining_points=10000)
+        state = AuctionState.get()
+        state.is_active           = True
+        state.awaiting_transition = True
+        state.save()
+        self.client.force_login(User.objects.create_superuser("sk", "sk@example.com", "sk"))
+
+    def test_each_singleton_read_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/auction/")
+        for table in ("auction_auctionstate", "auction_tournamentconfig", "auction_tournamentsettings"):
+            reads = [q for q in ctx.captured_queries
+                     if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"]]
+            self.assertEqual(len(reads), 1, table)
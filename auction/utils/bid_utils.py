@@ -7,7 +7,7 @@ from auction.models import TournamentConfig
 
 def bid_increment():
 
-    config = TournamentConfig.objects.first()
+    config = TournamentConfig.current()
 
     if not config:
         return 100
@@ -21,7 +21,7 @@ def bid_increment():
 
 def wallet_color(team):
 
-    config = TournamentConfig.objects.first()
+    config = TournamentConfig.current()
 
     if not config:
         return "green"
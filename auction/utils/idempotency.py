@@ -0,0 +1,84 @@
+from datetime import timedelta
+from functools import wraps
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from auction.models import IdempotencyKey
+
+KEY_HEADER = "Idempotency-Key"
+KEY_FIELD  = "idempotency_key"
+KEEP_FOR   = timedelta(days=1)
+
+
+# -------------------------------------------------
+# IDEMPOTENT AUCTION COMMANDS
+# The client sends a key (header, POST field or query string) per
+# command. The first request inserts the key and runs the view in the
+# same transaction; a retry with that key blocks on the unique index
+# until the first commits, then replays the stored response.
+# A view that raises rolls the key back, so the retry runs for real.
+# Requests without a key behave exactly as before.
+# -------------------------------------------------
+
+def request_key(request):
+
+    key = (request.headers.get(KEY_HEADER)
+           or request.POST.get(KEY_FIELD)
+           or request.GET.get(KEY_FIELD))
+
+    return key[:64] if key else None
+
+
+def idempotent(view):
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+
+        key = request_key(request)
+        if not key:
+            return view(request, *args, **kwargs)
+
+        with transaction.atomic():
+            record, created = IdempotencyKey.objects.get_or_create(
+                key=key, defaults={"endpoint": request.path[:100]}
+            )
+            if not created:
+                return replay(record)
+
+            response        = view(request, *args, **kwargs)
+            record.response = snapshot(response)
+            record.save(update_fields=["response"])
+
+            if record.pk % 100 == 0:
+                IdempotencyKey.objects.filter(created_at__lt=timezone.now() - KEEP_FOR).delete()
+
+        return response
+
+    return wrapper
+
+
+def snapshot(response):
+
+    return {
+        "status":       response.status_code,
+        "content_type": response.get("Content-Type", ""),
+        "location":     response.get("Location", ""),
+        "body":         response.content.decode("utf-8", "replace"),
+    }
+
+
+def replay(record):
+
+    stored = record.response
+    if stored is None:
+        # First request is still running in another transaction
+        return HttpResponse(status=409)
+
+    response = HttpResponse(stored["body"], status=stored["status"],
+                            content_type=stored["content_type"] or None)
+    if stored["location"]:
+        response["Location"] = stored["location"]
+    response["Idempotent-Replay"] = "true"
+    return response
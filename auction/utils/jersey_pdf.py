@@ -0,0 +1,47 @@
+# -------------------------------------------------
+# JERSEY SHEET RENDERING
+# Plain ReportLab, no Django imports: sheets are rendered in worker
+# processes from rows the parent has already read from the DB.
+# -------------------------------------------------
+
+from io import BytesIO
+
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+
+
+def sheet_table(header, rows):
+
+    table = Table([header] + [list(r) for r in rows], repeatRows=1)
+
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ]))
+
+    return table
+
+
+def render_sheet(title, sections):
+    """
+    PDF bytes for one sheet. sections: [(heading, header, rows)];
+    sections without rows are left out.
+    """
+    styles   = getSampleStyleSheet()
+    buffer   = BytesIO()
+    doc      = SimpleDocTemplate(buffer, pagesize=A4, title=title)
+    elements = [Paragraph(title, styles["Heading1"])]
+
+    for heading, header, rows in sections:
+        if not rows:
+            continue
+        elements.append(Paragraph(f"{heading} ({len(rows)})", styles["Heading2"]))
+        elements.append(Spacer(1, 6))
+        elements.append(sheet_table(header, rows))
+        elements.append(Spacer(1, 12))
+
+    doc.build(elements)
+
+    return buffer.getvalue()
@@ -0,0 +1,151 @@
+# -------------------------------------------------
+# PER-REQUEST METRICS
+# RequestMetricsMiddleware opens a sample per request; the DB execute
+# wrapper and TimedDjangoTemplates add query / template time to it.
+# Every finished request goes into a rolling window per view for the
+# metrics page. Only slow ones (SLOW_REQUEST_MS / SLOW_REQUEST_QUERIES)
+# are also logged to system_logger as one key=value line: a busy board
+# would otherwise rotate system.log away within minutes.
+#
+# Windows live in process memory: with several gunicorn workers the
+# page shows the worker that served it.
+# -------------------------------------------------
+
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+from config.logging_config import system_logger
+
+WINDOW = 500   # requests kept per view
+
+_local   = threading.local()
+_lock    = threading.Lock()
+_windows = defaultdict(lambda: deque(maxlen=WINDOW))
+
+
+def start():
+
+    _local.sample = {"queries": 0, "db": 0.0, "template": 0.0, "start": time.perf_counter()}
+    return _local.sample
+
+
+def finish(view, method, status):
+
+    sample = getattr(_local, "sample", None)
+    _local.sample = None
+    if sample is None:
+        return None
+
+    row = {
+        "view":        view,
+        "method":      method,
+        "status":      status,
+        "total_ms":    round((time.perf_counter() - sample["start"]) * 1000, 2),
+        "db_ms":       round(sample["db"] * 1000, 2),
+        "queries":     sample["queries"],
+        "template_ms": round(sample["template"] * 1000, 2),
+    }
+    with _lock:
+        _windows[view].append(row)
+
+    if is_slow(row):
+        system_logger.info("slow request " + " ".join(f"{k}={v}" for k, v in row.items()))
+    return row
+
+
+def is_slow(row):
+
+    return (row["total_ms"] >= settings.SLOW_REQUEST_MS
+            or row["queries"] >= settings.SLOW_REQUEST_QUERIES)
+
+
+def timed_query(execute, sql, params, many, context):
+
+    sample = getattr(_local, "sample", None)
+    if sample is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample["db"]      += time.perf_counter() - start
+        sample["queries"] += 1
+
+
+# -------------------------------------------------
+# ROLLING PERCENTILES (metrics page)
+# -------------------------------------------------
+
+def _percentile(values, q):
+
+    rank = max(1, round(q / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def summary():
+
+    with _lock:
+        windows = {view: list(rows) for view, rows in _windows.items()}
+
+    out = []
+    for view, rows in windows.items():
+        total = sorted(r["total_ms"] for r in rows)
+        out.append({
+            "view":        view,
+            "count":       len(rows),
+            "p50_ms":      _percentile(total, 50),
+            "p95_ms":      _percentile(total, 95),
+            "p99_ms":      _percentile(total, 99),
+            "queries":     round(sum(r["queries"] for r in rows) / len(rows), 1),
+            "db_ms":       round(sum(r["db_ms"] for r in rows) / len(rows), 2),
+            "template_ms": round(sum(r["template_ms"] for r in rows) / len(rows), 2),
+        })
+    return sorted(out, key=lambda r: r["p95_ms"], reverse=True)
+
+
+def clear():
+
+    with _lock:
+        _windows.clear()
+
+
+# -------------------------------------------------
+# TEMPLATE TIMING
+# Template backend that times top-level renders (includes are part of
+# their parent's render). Set as TEMPLATES[0]["BACKEND"].
+# -------------------------------------------------
+
+class TimedTemplate:
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        sample = getattr(_local, "sample", None)
+        if sample is None or sample.get("rendering"):
+            return self.template.render(context, request)   # nested render: counted by the outer one
+
+        sample["rendering"] = True
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            sample["template"] += time.perf_counter() - start
+            sample["rendering"] = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
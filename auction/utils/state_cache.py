@@ -0,0 +1,57 @@
+# -------------------------------------------------
+# SINGLETON READ CACHE
+# AuctionState / TournamentConfig / TournamentSettings are read many
+# times per request. Inside a request scope (StateCacheMiddleware) each
+# is loaded once; post_save / post_delete receivers in models.py keep
+# the cached copy current.
+#
+# The scope is per request on purpose: with several gunicorn workers a
+# process-wide copy could go stale after another worker writes.
+# Outside a scope (shell, management commands, tests) every call hits the DB.
+# -------------------------------------------------
+
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+@contextmanager
+def request_scope():
+
+    previous     = getattr(_local, "store", None)
+    _local.store = {}
+
+    try:
+        yield
+    finally:
+        _local.store = previous
+
+
+def get(key, loader):
+
+    store = getattr(_local, "store", None)
+
+    if store is None:
+        return loader()
+
+    if key not in store:
+        store[key] = loader()
+
+    return store[key]
+
+
+def put(key, value):
+
+    store = getattr(_local, "store", None)
+
+    if store is not None:
+        store[key] = value
+
+
+def invalidate(key):
+
+    store = getattr(_local, "store", None)
+
+    if store is not None:
+        store.pop(key, None)
@@ -1,42 +1,72 @@
+import csv
+import itertools
+import json
 import os
+import uuid
+from urllib.parse import urlencode
 
 from django.shortcuts import render, redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.safestring import mark_safe
+from django.db import transaction
+from django.db.models import F, Q
 
-from .models import Player, Team, TournamentConfig, TournamentSettings, Jersey, ExtraJerseyMember, AuctionState, Match
+from .models import Player, Team, TournamentConfig, TournamentSettings, Jersey, ExtraJerseyMember, AuctionState, Match, ImportJob, AuctionAction
 from .services.auction_engine import AuctionEngine, round_label
 from .services.bidding_service import BiddingService
 from .services.csv_service import CSVService
 from .services.audit_service import AuditService
-from .services.jersey_service import JerseyService
+from .services.jersey_service import JerseyService, JerseyNumberIndex
+from .services.event_service import EventService, board_mode, MODE_LIVE
+from .services.roster_service import RosterService
+from .services.import_service import ImportService
+from .services.fixture_service import FixtureService
 from .utils.bid_utils import bid_increment
+from .utils.idempotency import idempotent
+from .utils import metrics
+
+
+# ────────────────────────────────────────────────
+# PUBLIC PAGES — ETag on the board version
+# A poll that finds nothing new costs one indexed query and a 304;
+# the view itself (teams, players, jerseys) never runs.
+# ────────────────────────────────────────────────
+
+def _public_etag(request, *args, **kwargs):
+    return f"board-{EventService().current_version()}"
+
+
+def _revalidate(response):
+    """Make browsers send If-None-Match on every reload instead of caching blindly."""
+    response["Cache-Control"] = "no-cache"
+    return response
 
 
 # ────────────────────────────────────────────────
 # PUBLIC BOARD
 # ────────────────────────────────────────────────
 
+@condition(etag_func=_public_etag)
 def public_board(request):
     state    = AuctionState.get()
-    config   = TournamentConfig.objects.first()
+    config   = TournamentConfig.current()
     ts       = TournamentSettings.get()   # always exists
-    teams    = Team.objects.all()
-
-    # Build jersey lookup: player_id → jersey object
-    jersey_map = {}
-    for j in Jersey.objects.select_related("player").all():
-        jersey_map[j.player_id] = j
-
-    for team in teams:
-        players = Player.objects.filter(
-            team=team, status=Player.STATUS_SOLD
-        ).order_by("role", "name")
-        for p in players:
-            p.jersey = jersey_map.get(p.serial_number)
-        team.sold_players = players
+    rosters  = RosterService()
+    mode     = board_mode(state, config)
+    if mode == MODE_LIVE:
+        # Team cards come from the cache; only teams whose version moved are re-rendered
+        teams = list(Team.objects.all())
+        cards = EventService().team_cards(teams)
+        for team in teams:
+            team.card = mark_safe(cards[team.pk])
+    else:
+        teams = rosters.load_rosters()    # sold squads + jerseys, constant query count
 
     # Pre-auction player list: shown whenever auction has not started
     # (config doesn't exist yet OR auction state is not active)
@@ -44,25 +74,17 @@ def public_board(request):
     show_player_list = (not config) or (not state.is_active and state.phase != AuctionState.PHASE_DONE)
     pre_auction_players = None
     if show_player_list:
-        pre_auction_players = {
-            "AR":   list(Player.objects.filter(role="AR").order_by("name")),
-            "BAT":  list(Player.objects.filter(role="BAT").order_by("name")),
-            "BOWL": list(Player.objects.filter(role="BOWL").order_by("name")),
-            "PLY":  list(Player.objects.filter(role="PLY").order_by("name")),
-        }
-
-    available_count = 0
-    unsold_count    = 0
+        pre_auction_players = rosters.players_by_role()
+
+    remaining = 0
     if config and state.phase != AuctionState.PHASE_DONE:
-        cat             = state.current_category
-        available_count = Player.objects.filter(status=Player.STATUS_AVAILABLE, role=cat).count()
-        unsold_count    = Player.objects.filter(status=Player.STATUS_UNSOLD,    role=cat).count()
+        remaining = rosters.slot_remaining(state)
 
     banner_url = None
     if ts.banner_path:
         banner_url = settings.MEDIA_URL + "banners/" + ts.banner_path
 
-    return render(request, "public_board.html", {
+    return _revalidate(render(request, "public_board.html", {
         "player":               state.current_player,
         "teams":                teams,
         "auction_started":      config is not None and (state.is_active or state.phase == AuctionState.PHASE_DONE),
@@ -70,11 +92,35 @@ def public_board(request):
         "config":               config,
         "ts":                   ts,
         "pre_auction_players":  pre_auction_players,
-        "available_count":      available_count,
-        "unsold_count":         unsold_count,
+        "remaining":            remaining,
         "banner_url":           banner_url,
         "round_label":          round_label(state.current_category, state.phase, state.category_pass),
-    })
+        "board_mode":           mode,
+        "board_etag":           _public_etag(request),
+    }))
+
+
+# ────────────────────────────────────────────────
+# PUBLIC BOARD — live event stream (server-sent events)
+# ────────────────────────────────────────────────
+
+def board_stream(request):
+    last_event_id = request.headers.get("Last-Event-ID")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    stream = EventService().open_stream(last_event_id)
+    if stream is None:
+        # Every stream slot in this worker is taken: 204 tells EventSource
+        # not to reconnect, and the board falls back to ETag polling.
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"]     = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 # ────────────────────────────────────────────────
@@ -83,7 +129,7 @@ def public_board(request):
 
 @login_required
 def auction_control(request):
-    config = TournamentConfig.objects.first()
+    config = TournamentConfig.current()
     ts     = TournamentSettings.get()
     if not config:
         return render(request, "auction_setup.html", {"ts": ts})
@@ -97,18 +143,18 @@ def auction_control(request):
             and not state.awaiting_transition
             and state.phase != AuctionState.PHASE_DONE
             and state.is_active):
-        engine.advance_to_next_player()
+        engine.ensure_current_player()
         state = AuctionState.get()  # re-fetch after possible state change
 
     player      = state.current_player
-    teams       = Team.objects.all()
+    teams       = list(Team.objects.all())
     increment   = bid_increment()
-    blocked_ids = engine.get_blocked_team_ids(state)
+    blocked_ids = engine.get_blocked_team_ids(state, teams)
 
     for t in teams:
         t.display_short = t.get_short()
         t.is_blocked    = t.team_serial_number in blocked_ids
-        t.squad_count   = t.player_set.filter(status=Player.STATUS_SOLD).count()
+        t.squad_count   = t.squad_size
         t.slots_left    = max(0, config.bidding_slots - t.squad_count)
 
     pool_exhausted = (
@@ -125,10 +171,8 @@ def auction_control(request):
     # Round label (item 3)
     current_round_label = round_label(state.current_category, state.phase, state.category_pass)
 
-    # Player count for current round (item 21)
-    cat             = state.current_category
-    available_count = Player.objects.filter(status=Player.STATUS_AVAILABLE, role=cat).count()
-    unsold_count    = Player.objects.filter(status=Player.STATUS_UNSOLD,    role=cat).count()
+    # Players still to draw in the current round (item 21), off the draw deck
+    remaining = RosterService().slot_remaining(state)
 
     return render(request, "auction_control.html", {
         "player":               player,
@@ -139,9 +183,9 @@ def auction_control(request):
         "config":               config,
         "category_base_price":  category_base_price,
         "current_round_label":  current_round_label,
-        "available_count":      available_count,
-        "unsold_count":         unsold_count,
+        "remaining":            remaining,
         "ts":                   ts,
+        "action_key":           uuid.uuid4().hex,
     })
 
 
@@ -166,9 +210,7 @@ def start_auction(request):
             max_rebid_attempts = request.POST.get("max_rebid_attempts", 3),
         )
 
-        for team in Team.objects.all():
-            team.remaining_points = total_points
-            team.save()
+        Team.objects.update(remaining_points=total_points, version=F("version") + 1)
 
         # Base prices applied to all players
         Player.objects.filter(role="AR").update(base_price=config.base_price_AR)
@@ -187,6 +229,7 @@ def start_auction(request):
 # ────────────────────────────────────────────────
 
 @login_required
+@idempotent
 def confirm_transition(request):
     engine = AuctionEngine()
     engine.confirm_transition()
@@ -198,6 +241,7 @@ def confirm_transition(request):
 # ────────────────────────────────────────────────
 
 @login_required
+@idempotent
 def next_player(request):
     engine = AuctionEngine()
     engine.advance_to_next_player()
@@ -210,6 +254,7 @@ def next_player(request):
 
 @csrf_exempt
 @login_required
+@idempotent
 def sell_player(request):
     if request.method != "POST":
         return JsonResponse({"status": "invalid"})
@@ -224,10 +269,10 @@ def sell_player(request):
     try:
         player = Player.objects.get(serial_number=player_id)
         team   = Team.objects.get(team_serial_number=team_id)
-        config = TournamentConfig.objects.first()
+        config = TournamentConfig.current()
 
         # Extra player check (item 20)
-        squad_count = team.player_set.filter(status=Player.STATUS_SOLD).count()
+        squad_count = team.squad_size
         over_slots  = config and squad_count >= config.bidding_slots
         if over_slots and not extra and not force:
             return JsonResponse({
@@ -256,6 +301,7 @@ def sell_player(request):
 
 @csrf_exempt
 @login_required
+@idempotent
 def unsold_player(request):
     if request.method == "POST":
         BiddingService().mark_unsold(request.POST.get("player_id"))
@@ -269,6 +315,7 @@ def unsold_player(request):
 
 @csrf_exempt
 @login_required
+@idempotent
 def not_playing_player(request):
     if request.method == "POST":
         BiddingService().mark_not_playing(request.POST.get("player_id"))
@@ -277,15 +324,23 @@ def not_playing_player(request):
 
 
 # ────────────────────────────────────────────────
-# UNDO
+# UNDO / REDO
 # ────────────────────────────────────────────────
 
 @login_required
+@idempotent
 def undo_action(request):
     BiddingService().undo_last_action()
     return redirect("/auction/")
 
 
+@login_required
+@idempotent
+def redo_action(request):
+    BiddingService().redo_last_undo()
+    return redirect("/auction/")
+
+
 # ────────────────────────────────────────────────
 # REFRESH — recalculate all team points (item 9)
 # ────────────────────────────────────────────────
@@ -302,12 +357,9 @@ def refresh_points(request):
 # ────────────────────────────────────────────────
 
 @login_required
+@idempotent
 def complete_auction(request):
-    state                = AuctionState.get()
-    state.phase          = AuctionState.PHASE_DONE
-    state.is_active      = False
-    state.current_player = None
-    state.save()
+    AuctionEngine().complete_auction()
     return redirect("/auction/summary/")
 
 
@@ -317,19 +369,11 @@ def complete_auction(request):
 
 @login_required
 def auction_summary(request):
-    teams  = Team.objects.all()
-    config = TournamentConfig.objects.first()
+    teams  = RosterService().load_rosters()
+    config = TournamentConfig.current()
     state  = AuctionState.get()
     ts     = TournamentSettings.get()
 
-    for team in teams:
-        sold = Player.objects.filter(
-            team=team, status=Player.STATUS_SOLD
-        ).order_by("role", "name")
-        team.sold_players = sold
-        team.total_spent  = sum(p.sold_price or 0 for p in sold)
-        team.player_count = sold.count()
-
     return render(request, "auction_summary.html", {
         "teams":  teams,
         "config": config,
@@ -374,6 +418,7 @@ def banner_upload(request):
             msg = "Settings saved."
 
         ts.save()
+        EventService().publish("SETTINGS", reload=True)
 
     current_banner = None
     if ts.banner_path:
@@ -394,6 +439,7 @@ def banner_upload(request):
 def upload_csv(request):
     csv_service = CSVService()
     result      = None
+    job         = None
 
     if request.method == "POST":
         action   = request.POST.get("action", "upload")
@@ -402,23 +448,18 @@ def upload_csv(request):
 
         if not uploaded:
             result = {"error": "No file selected."}
+        elif action != "validate":
+            # Imports run in the background; the page polls the job
+            job = ImportService().enqueue(csv_type, uploaded)
+            return redirect(f"/auction/upload-csv/?job={job.pk}")
         else:
-            path = f"/tmp/kpl_upload_{csv_type}.csv"
-            with open(path, "wb+") as f:
-                for chunk in uploaded.chunks():
-                    f.write(chunk)
-
+            # Parsed straight from the upload's chunks — no shared temp file
+            source = uploaded.chunks()
             try:
                 if csv_type == "teams":
-                    if action == "validate":
-                        created, errors = csv_service.validate_teams_csv(path)
-                    else:
-                        created, errors = csv_service.import_teams(path)
+                    created, errors = csv_service.validate_teams_csv(source)
                 else:
-                    if action == "validate":
-                        created, errors = csv_service.validate_players_csv(path)
-                    else:
-                        created, errors = csv_service.import_players(path)
+                    created, errors = csv_service.validate_players_csv(source)
 
                 result = {
                     "action":   action,
@@ -429,7 +470,19 @@ def upload_csv(request):
             except Exception as e:
                 result = {"error": str(e)}
 
-    return render(request, "upload_csv.html", {"result": result})
+    elif request.GET.get("job", "").isdigit():
+        job = ImportJob.objects.filter(pk=request.GET["job"]).first()
+
+    return render(request, "upload_csv.html", {"result": result, "job": job})
+
+
+@login_required
+def import_job_status(request, job_id):
+    try:
+        job = ImportService().status(job_id)
+    except ImportJob.DoesNotExist:
+        return JsonResponse({"status": "missing"}, status=404)
+    return JsonResponse(job.as_dict())
 
 
 # ────────────────────────────────────────────────
@@ -438,8 +491,63 @@ def upload_csv(request):
 
 @login_required
 def audit_log(request):
+    service = AuditService()
+    filters = service.parse_filters(request.GET)
+    actions, next_cursor = service.page(filters, request.GET.get("cursor"))
     return render(request, "audit_log.html", {
-        "actions": AuditService().get_all_actions()
+        "actions":       actions,
+        "next_cursor":   next_cursor,
+        "filters":       filters,
+        "filter_query":  urlencode(filters),
+        "teams":         Team.objects.order_by("name").only("team_serial_number", "name"),
+        "categories":    [code for code, _ in Player.ROLE_CHOICES],
+        "action_types":  [code for code, _ in AuctionAction.ACTION_CHOICES],
+    })
+
+
+class _Echo:
+    """csv.writer target that hands each line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+@login_required
+def audit_log_export(request):
+    service = AuditService()
+    filters = service.parse_filters(request.GET)
+    rows    = service.export_rows(filters)
+
+    if request.GET.get("format") == "jsonl":
+        response = StreamingHttpResponse(
+            (json.dumps(row) + "\n" for row in rows), content_type="application/x-ndjson"
+        )
+        response["Content-Disposition"] = 'attachment; filename="audit_log.jsonl"'
+        return response
+
+    writer = csv.writer(_Echo())
+    lines  = itertools.chain(
+        [writer.writerow(service.EXPORT_COLUMNS)],
+        (writer.writerow([row[c] for c in service.EXPORT_COLUMNS]) for row in rows),
+    )
+    response = StreamingHttpResponse(lines, content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="audit_log.csv"'
+    return response
+
+
+# ────────────────────────────────────────────────
+# REQUEST METRICS — rolling per-view percentiles (this worker)
+# ────────────────────────────────────────────────
+
+@staff_member_required
+def request_metrics(request):
+    if request.method == "POST":
+        metrics.clear()
+        return redirect("request_metrics")
+    return render(request, "request_metrics.html", {
+        "rows":    metrics.summary(),
+        "window":  metrics.WINDOW,
+        "enabled": settings.REQUEST_METRICS,
     })
 
 
@@ -460,35 +568,41 @@ def reset_auction(request):
 
 @login_required
 def jersey_portal(request):
-    import json
-    config = TournamentConfig.objects.first()
-    msg    = None
+    config = TournamentConfig.current()
+    msg    = request.GET.get("msg")
 
+    # POST handlers touch only their own rows and redirect; the page is
+    # loaded once, by the GET that follows
     if request.method == "POST":
         action = request.POST.get("action")
+        jersey = JerseyService()
 
         # ── Save jersey name/number for a sold player ──
         if action == "save_player_jersey":
             try:
                 player_id     = int(request.POST.get("player_id"))
                 jersey_name   = request.POST.get("jersey_name", "").strip()
-                jersey_number_raw = request.POST.get("jersey_number", "").strip()
-                jersey_number = int(jersey_number_raw) if jersey_number_raw else None
+                jersey_number = request.POST.get("jersey_number", "").strip()
                 player = Player.objects.get(serial_number=player_id)
-                if jersey_name or jersey_number is not None:
-                    Jersey.objects.update_or_create(
-                        player=player,
-                        defaults={"jersey_name": jersey_name,
-                                  "jersey_number": jersey_number or 0,
-                                  "size_number": 0, "size_text": ""}
-                    )
-                    msg = f"Saved jersey for {player.name}."
+                if jersey_name or jersey_number:
+                    result = jersey.apply_batch([{"player_id": player_id, "jersey_name": jersey_name,
+                                                  "jersey_number": jersey_number}])[0]
+                    msg = result.get("message") or f"Saved jersey for {player.name}."
                 else:
                     Jersey.objects.filter(player=player).delete()
                     msg = f"Cleared jersey for {player.name}."
             except Exception as e:
                 msg = f"Error: {e}"
 
+        # ── Fill missing numbers (one team, or every team) ──
+        elif action == "auto_assign":
+            try:
+                team_id  = request.POST.get("team_id")
+                assigned = jersey.auto_assign([int(team_id)] if team_id else None)
+                msg = f"Assigned {sum(assigned.values())} jersey number(s)."
+            except Exception as e:
+                msg = f"Error: {e}"
+
         # ── Add extra team member (manager/supporter etc.) ──
         elif action == "add_team_extra":
             try:
@@ -499,13 +613,17 @@ def jersey_portal(request):
                 jnum_raw   = request.POST.get("extra_jersey_number", "").strip()
                 jnum       = int(jnum_raw) if jnum_raw else None
                 team       = Team.objects.get(team_serial_number=team_id)
-                if name:
-                    ExtraJerseyMember.objects.create(
-                        name=name, role_label=role_label,
-                        jersey_name=jname, jersey_number=jnum,
-                        member_type=ExtraJerseyMember.TYPE_TEAM, team=team
-                    )
-                    msg = f"Added {name} to {team.name}."
+                with transaction.atomic():
+                    taken = JerseyNumberIndex([team.pk]).owner(team.pk, jnum) if jnum else None
+                    if taken:
+                        msg = f"Error: number {jnum} is already taken in {team.name}."
+                    elif name:
+                        ExtraJerseyMember.objects.create(
+                            name=name, role_label=role_label,
+                            jersey_name=jname, jersey_number=jnum,
+                            member_type=ExtraJerseyMember.TYPE_TEAM, team=team
+                        )
+                        msg = f"Added {name} to {team.name}."
             except Exception as e:
                 msg = f"Error: {e}"
 
@@ -532,15 +650,12 @@ def jersey_portal(request):
         # ── Update extra member jersey inline ──
         elif action == "update_extra":
             try:
-                eid   = int(request.POST.get("extra_id"))
-                jname = request.POST.get("jersey_name", "").strip()
-                jnum_raw = request.POST.get("jersey_number", "").strip()
-                jnum  = int(jnum_raw) if jnum_raw else None
-                em    = ExtraJerseyMember.objects.get(pk=eid)
-                em.jersey_name   = jname
-                em.jersey_number = jnum
-                em.save()
-                msg = f"Updated {em.name}."
+                eid    = int(request.POST.get("extra_id"))
+                em     = ExtraJerseyMember.objects.get(pk=eid)
+                result = jersey.apply_batch([{"extra_id": eid,
+                                              "jersey_name": request.POST.get("jersey_name", "").strip(),
+                                              "jersey_number": request.POST.get("jersey_number", "").strip()}])[0]
+                msg = result.get("message") or f"Updated {em.name}."
             except Exception as e:
                 msg = f"Error: {e}"
 
@@ -554,25 +669,22 @@ def jersey_portal(request):
             except Exception as e:
                 msg = f"Error: {e}"
 
+        EventService().publish("JERSEY")
+        jersey.schedule_pdf()
+        return redirect(f"/jersey/?{urlencode({'msg': msg})}" if msg else "/jersey/")
+
     # ── Build page data ──
     # All teams with their sold players and extras
-    teams = Team.objects.all().order_by("name")
-    jersey_map = {j.player_id: j for j in Jersey.objects.select_related("player").all()}
+    teams = RosterService().load_rosters(Team.objects.order_by("name"))
     extras_by_team = {}
-    for em in ExtraJerseyMember.objects.filter(
-            member_type=ExtraJerseyMember.TYPE_TEAM).select_related("team"):
+    for em in ExtraJerseyMember.objects.filter(member_type=ExtraJerseyMember.TYPE_TEAM):
         extras_by_team.setdefault(em.team_id, []).append(em)
 
     team_sections = []
     for team in teams:
-        players = list(Player.objects.filter(
-            team=team, status=Player.STATUS_SOLD
-        ).order_by("role", "name"))
-        for p in players:
-            p.jersey = jersey_map.get(p.serial_number)
         team_sections.append({
             "team":    team,
-            "players": players,
+            "players": team.sold_players,
             "extras":  extras_by_team.get(team.team_serial_number, []),
         })
 
@@ -606,30 +718,73 @@ def jersey_save_ajax(request):
     if request.method != "POST":
         return JsonResponse({"status": "invalid"})
     try:
-        player_id     = int(request.POST.get("player_id"))
-        jersey_name   = request.POST.get("jersey_name", "").strip()
-        jersey_number_raw = request.POST.get("jersey_number", "").strip()
-        jersey_number = int(jersey_number_raw) if jersey_number_raw else 0
-        player = Player.objects.get(serial_number=player_id)
-        Jersey.objects.update_or_create(
-            player=player,
-            defaults={"jersey_name": jersey_name, "jersey_number": jersey_number,
-                      "size_number": 0, "size_text": ""}
-        )
+        result = JerseyService().apply_batch([{
+            "player_id":     int(request.POST.get("player_id")),
+            "jersey_name":   request.POST.get("jersey_name", "").strip(),
+            "jersey_number": request.POST.get("jersey_number", "").strip(),
+        }])[0]
+        if result["status"] != "ok":
+            return JsonResponse({"status": "error", "message": result["message"]})
+        EventService().publish("JERSEY")
+        JerseyService().schedule_pdf()
         return JsonResponse({"status": "ok"})
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)})
 
 
+# ────────────────────────────────────────────────
+# JERSEY BATCH SAVE (JSON array of player / extra-member edits)
+# ────────────────────────────────────────────────
+
+@login_required
+@csrf_exempt
+def jersey_batch_save(request):
+    if request.method != "POST":
+        return JsonResponse({"status": "invalid"})
+    try:
+        results = JerseyService().apply_batch(json.loads(request.body or b"null"))
+    except ValueError as e:   # includes malformed JSON
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+    saved = sum(1 for r in results if r["status"] == "ok")
+    if saved:
+        EventService().publish("JERSEY")
+        JerseyService().schedule_pdf()
+    return JsonResponse({"status": "ok", "saved": saved, "failed": len(results) - saved, "results": results})
+
+
 # ────────────────────────────────────────────────
 # EXPORT JERSEY PDF
+# Served from media/exports, keyed on a hash of the jersey data; edits
+# rebuild it in the background, so a download is normally a file read.
 # ────────────────────────────────────────────────
 
 @login_required
 def export_jersey_pdf(request):
-    pdf_buffer = JerseyService().export_pdf()
-    response   = HttpResponse(pdf_buffer, content_type="application/pdf")
-    response["Content-Disposition"] = "attachment; filename=jersey_list.pdf"
+    pdf, version = JerseyService().cached_pdf()
+    etag         = f'"{version}"'
+    # Same If-None-Match rules as @condition ("*", weak tags, lists); the
+    # version is only known once cached_pdf() has read the rows
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        pdf.close()
+    else:
+        response = FileResponse(pdf, as_attachment=True,
+                                filename="jersey_list.pdf", content_type="application/pdf")
+    response["ETag"] = etag
+    return _revalidate(response)
+
+
+# ────────────────────────────────────────────────
+# EXPORT JERSEY BUNDLE (ZIP for the kit vendor)
+# ────────────────────────────────────────────────
+
+@login_required
+def export_jersey_bundle(request):
+    service          = JerseyService()
+    sheets, summary  = service.bundle_sheets()
+    response = StreamingHttpResponse(service.stream_bundle(sheets, summary), content_type="application/zip")
+    response["Content-Disposition"] = "attachment; filename=jersey_bundle.zip"
     return response
 
 
@@ -641,7 +796,8 @@ def export_jersey_pdf(request):
 def fixtures_admin(request):
     """
     Admin page: spin wheel to generate matches one by one,
-    or auto-generate full round-robin. Also record results.
+    auto-generate the round-robin, or seed a knockout from the table.
+    Also record results.
     """
     teams   = list(Team.objects.all().order_by("name"))
     matches = Match.objects.select_related("team1", "team2", "winner").all()
@@ -649,7 +805,8 @@ def fixtures_admin(request):
     msg     = None
 
     if request.method == "POST":
-        action = request.POST.get("action")
+        action   = request.POST.get("action")
+        fixtures = FixtureService()
 
         # ── Create a single match from spin result ──
         if action == "create_match":
@@ -661,15 +818,16 @@ def fixtures_admin(request):
             try:
                 t1 = Team.objects.get(team_serial_number=t1_id)
                 t2 = Team.objects.get(team_serial_number=t2_id)
+                stage = Match.stage_for(round_label)
                 if t1 == t2:
                     msg = "Cannot create a match between the same team."
-                elif Match.objects.filter(team1=t1, team2=t2).exists() or \
-                     Match.objects.filter(team1=t2, team2=t1).exists():
+                elif stage == Match.STAGE_LEAGUE and Match.objects.filter(
+                        Q(team1=t1, team2=t2) | Q(team1=t2, team2=t1), stage=Match.STAGE_LEAGUE).exists():
                     msg = f"{t1.name} vs {t2.name} already exists."
                 else:
-                    next_num = (Match.objects.count() or 0) + 1
+                    next_num = fixtures.next_match_number()
                     Match.objects.create(
-                        match_number=next_num, round_label=round_label,
+                        match_number=next_num, round_label=round_label, stage=stage,
                         team1=t1, team2=t2,
                         scheduled_date=sched, venue=venue
                     )
@@ -680,27 +838,41 @@ def fixtures_admin(request):
         # ── Generate full round-robin ──
         elif action == "generate_all":
             round_label = request.POST.get("round_label", "League").strip() or "League"
-            sched       = request.POST.get("scheduled_date") or None
-            venue       = request.POST.get("venue", "").strip()
-            created = 0
-            skipped = 0
-            num = (Match.objects.count() or 0) + 1
-            for i, t1 in enumerate(teams):
-                for t2 in teams[i+1:]:
-                    exists = (Match.objects.filter(team1=t1, team2=t2).exists() or
-                              Match.objects.filter(team1=t2, team2=t1).exists())
-                    if exists:
-                        skipped += 1
-                        continue
-                    Match.objects.create(
-                        match_number=num, round_label=round_label,
-                        team1=t1, team2=t2,
-                        scheduled_date=sched, venue=venue
-                    )
-                    num  += 1
-                    created += 1
+            created, skipped = fixtures.generate_league(
+                teams, round_label,
+                start  = request.POST.get("scheduled_date"),
+                venues = fixtures.parse_venues(request.POST.get("venue")),
+            )
             msg = f"Generated {created} matches." + (f" Skipped {skipped} existing." if skipped else "")
 
+        # ── Knockout bracket seeded from the league table ──
+        elif action == "generate_knockout":
+            try:
+                size   = int(request.POST.get("qualifiers", 4))
+                league = [m for m in matches if m.stage == Match.STAGE_LEAGUE]
+                seeded = [row["team"] for row in _build_points_table(teams, league)][:size]
+                if len(seeded) < size:
+                    raise ValueError(f"Only {len(seeded)} teams — cannot seed {size}.")
+                created = fixtures.generate_knockout(
+                    seeded,
+                    start  = request.POST.get("scheduled_date"),
+                    venues = fixtures.parse_venues(request.POST.get("venue")),
+                )
+                msg = f"Knockout created: {created} matches."
+            except ValueError as e:
+                msg = f"Error: {e}"
+
+        # ── Next knockout round from winners ──
+        elif action == "advance_knockout":
+            try:
+                created = fixtures.advance_knockout(
+                    start  = request.POST.get("scheduled_date"),
+                    venues = fixtures.parse_venues(request.POST.get("venue")),
+                )
+                msg = f"Next round created: {created} matches."
+            except ValueError as e:
+                msg = f"Error: {e}"
+
         # ── Record result ──
         elif action == "record_result":
             match_id  = request.POST.get("match_id")
@@ -725,10 +897,12 @@ def fixtures_admin(request):
                 label = str(m)
                 m.delete()
                 # Renumber remaining
-                for i, m2 in enumerate(Match.objects.all(), start=1):
+                moved = []
+                for i, m2 in enumerate(Match.objects.only("pk", "match_number"), start=1):
                     if m2.match_number != i:
                         m2.match_number = i
-                        m2.save()
+                        moved.append(m2)
+                Match.objects.bulk_update(moved, ["match_number"], batch_size=500)
                 msg = f"Deleted {label}."
             except Exception as e:
                 msg = f"Error: {e}"
@@ -739,9 +913,10 @@ def fixtures_admin(request):
             msg = "All matches cleared."
 
         matches = Match.objects.select_related("team1", "team2", "winner").all()
+        EventService().publish("FIXTURES")
 
-    # Points table
-    points = _build_points_table(teams, matches)
+    # Points table — league games only; knockout wins don't score
+    points = _build_points_table(teams, [m for m in matches if m.stage == Match.STAGE_LEAGUE])
 
     # Team colours for spin wheel (cycle through a palette)
     palette = ["#e74c3c","#3498db","#2ecc71","#f39c12","#9b59b6",
@@ -763,22 +938,23 @@ def fixtures_admin(request):
 # FIXTURES — PUBLIC
 # ────────────────────────────────────────────────
 
+@condition(etag_func=_public_etag)
 def fixtures_public(request):
     teams   = list(Team.objects.all().order_by("name"))
     matches = Match.objects.select_related("team1", "team2", "winner").all()
     ts      = TournamentSettings.get()
-    points  = _build_points_table(teams, matches)
+    points  = _build_points_table(teams, [m for m in matches if m.stage == Match.STAGE_LEAGUE])
 
     # Group matches by round_label
     rounds = {}
     for m in matches:
         rounds.setdefault(m.round_label, []).append(m)
 
-    return render(request, "fixtures_public.html", {
+    return _revalidate(render(request, "fixtures_public.html", {
         "rounds":  rounds,
         "points":  points,
         "ts":      ts,
-    })
+    }))
 
 
 # ────────────────────────────────────────────────
@@ -0,0 +1,74 @@
+"""
+Player CSV import: row-by-row (exists() + create() per row, the old
+CSVService path) against the current bulk path.
+
+    python benchmarks/bench_csv_import.py [rows]      # default 10000
+
+Runs against a throwaway in-memory SQLite DB; DATABASE_URL is ignored.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite://:memory:"
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from auction.models import Player  # noqa: E402
+from auction.services.csv_service import CSVService  # noqa: E402
+
+ROLES = ["AR", "BAT", "BOWL", "PLY"]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "role", "phone", "place"])
+        for i in range(rows):
+            w.writerow([f"Player {i}", ROLES[i % 4], f"98{i:08d}", "Town"])
+
+
+def row_by_row(path):
+    """The pre-bulk import loop, kept here as the baseline."""
+    created = 0
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if Player.objects.filter(name=row["name"]).exists():
+                continue
+            Player.objects.create(name=row["name"], role=row["role"], phone=row["phone"],
+                                  place=row["place"], base_price=0, status="AVAILABLE")
+            created += 1
+    return created
+
+
+def timed(label, fn, path):
+    Player.objects.all().delete()
+    start   = time.perf_counter()
+    created = fn(path)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {created:>6} rows  {elapsed:8.2f}s")
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    call_command("migrate", verbosity=0)
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "players.csv")
+        write_csv(path, rows)
+        slow = timed("row-by-row", row_by_row, path)
+        fast = timed("bulk", lambda p: CSVService().import_players(p)[0], path)
+
+    print(f"speedup      {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Hot auction queries as Player / AuctionAction grow to 100k rows.
+
+    python benchmarks/bench_indexes.py [--no-indexes]
+
+The live pool stays at 200 players while history (sold / dropped players,
+logged actions) grows; with the indexes from 0007 the per-query time
+should stay flat. --no-indexes drops them first for comparison.
+Runs against a throwaway in-memory SQLite DB; DATABASE_URL is ignored.
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite://:memory:"
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from auction.models import Player, Team, AuctionAction  # noqa: E402
+
+SIZES   = [1_000, 10_000, 100_000]
+ROLES   = ["AR", "BAT", "BOWL", "PLY"]
+INDEXES = ["player_role_status", "player_team_status", "action_timestamp_id"]
+
+QUERIES = {
+    "pick (pool pk)":  lambda team: Player.objects.filter(role="AR", status=Player.STATUS_AVAILABLE)
+                                                  .order_by("pk").values_list("pk", flat=True)[:1].get(),
+    "pool count":      lambda team: Player.objects.filter(role="AR", status=Player.STATUS_AVAILABLE).count(),
+    "squad count":     lambda team: Player.objects.filter(team=team, status=Player.STATUS_SOLD).count(),
+    "audit page":      lambda team: list(AuctionAction.objects.order_by("-timestamp", "-id")[:50]),
+}
+
+
+def grow(to, teams):
+    have  = Player.objects.count()
+    batch = []
+    for i in range(have, to):
+        sold = i % 3 != 0
+        batch.append(Player(
+            name=f"History {i}", role=ROLES[i % 4],
+            status=Player.STATUS_SOLD if sold else Player.STATUS_NOT_PLAYING,
+            team=teams[i % len(teams)] if sold else None, sold_price=100 if sold else None,
+        ))
+    Player.objects.bulk_create(batch, batch_size=2000)
+
+    players = list(Player.objects.filter(name__startswith="History").values_list("pk", flat=True)[:500])
+    actions = [
+        AuctionAction(player_id=players[i % len(players)], action="UNDO" if i % 10 == 0 else "SELL", amount=100)
+        for i in range(AuctionAction.objects.count(), to)
+    ]
+    AuctionAction.objects.bulk_create(actions, batch_size=2000)
+
+
+def timed(fn, team, runs=50):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(team)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    call_command("migrate", verbosity=0)
+    if "--no-indexes" in sys.argv:
+        with connection.cursor() as c:
+            for name in INDEXES:
+                c.execute(f'DROP INDEX "{name}"')
+
+    teams = [Team.objects.create(name=f"Team {i}") for i in range(16)]
+    Player.objects.bulk_create(Player(name=f"Pool {i}", role="AR") for i in range(200))
+
+    print(f"{'rows':>8}  " + "  ".join(f"{label:>15}" for label in QUERIES) + "   (median ms)")
+    for size in SIZES:
+        grow(size, teams)
+        with connection.cursor() as c:
+            c.execute("ANALYZE")
+        row = [timed(fn, teams[0]) for fn in QUERIES.values()]
+        print(f"{size:>8}  " + "  ".join(f"{ms:>15.3f}" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.simulation import percentile
+
+PLAYER_ID = re.compile(rb"const playerId\s*=\s*(\d+);")
+TEAM_BTN  = re.compile(rb"selectTeam\((\d+),")
+
+MODE_STREAM = "stream"   # load the board once, then hold /board/stream/ open (what browsers do)
+MODE_POLL   = "poll"     # reload the board every `interval` seconds
+
+STREAM_RETRY = 3.0       # matches the "retry:" the stream sends
+
+
+class BoardLoadTest:
+
+    """
+    Spectators plus one auctioneer against a running server, on plain
+    asyncio sockets (one connection per request, like a browser refresh).
+
+    In stream mode (the default) each spectator loads the public board
+    once and then holds /board/stream/ open, reconnecting with
+    Last-Event-ID when the server closes it. On a 204 (no stream slot
+    free) it falls back to ETag polling, like the board's own script.
+    In poll mode each spectator reloads the board every `interval`
+    seconds (jittered), sending back the last ETag unless etag=False.
+
+    The auctioneer loads the control page, sells the player on the block
+    to a random open team (or marks them unsold) and repeats every
+    `sell_interval` seconds, continuing through transitions. It runs
+    alone for `baseline` seconds first, so the report can show how much
+    slower its requests get once the spectators are connected.
+
+    Server-side query counts are the caller's job (see load_board).
+    """
+
+    def __init__(self, url, spectators=300, duration=30, interval=1.0,
+                 sell_interval=0.5, sessionid="", etag=True, seed=1, timeout=30,
+                 mode=MODE_STREAM, baseline=5.0):
+        parts = urlsplit(url)
+        self.host          = parts.hostname or "127.0.0.1"
+        self.port          = parts.port or 80
+        self.spectators    = spectators
+        self.duration      = duration
+        self.interval      = interval
+        self.sell_interval = sell_interval
+        self.sessionid     = sessionid
+        self.etag          = etag
+        self.timeout       = timeout
+        self.mode          = mode
+        self.baseline      = baseline
+        self.rng           = random.Random(seed)
+
+        self.samples  = defaultdict(list)   # op → [ms]
+        self.statuses = defaultdict(Counter)
+        self.errors   = Counter()
+        self.streams  = Counter()           # opened / events / fallbacks / max_open
+        self.open_streams = 0
+        self.loaded       = False           # spectators connected yet (auctioneer ops are split on this)
+
+    # ─────────────────────────────────────────────
+    # HTTP (stdlib only)
+    # ─────────────────────────────────────────────
+
+    async def request(self, op, method, path, headers=None, form=None):
+        body  = urlencode(form).encode() if form else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: close"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if form is not None:
+            lines += ["Content-Type: application/x-www-form-urlencoded", f"Content-Length: {len(body)}"]
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+        start = time.perf_counter()
+        try:
+            status, head, content = await asyncio.wait_for(self._exchange(raw), self.timeout)
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            self.errors[f"{op}: {type(e).__name__}"] += 1
+            return None, {}, b""
+        self.samples[op].append((time.perf_counter() - start) * 1000)
+        self.statuses[op][status] += 1
+        return status, head, content
+
+    async def _exchange(self, raw):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+
+        head, _, content = response.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return int(status_line.split()[1]), headers, content
+
+    async def hold_stream(self, deadline, last_id=None):
+        """
+        Open /board/stream/ and read it until the deadline or until the
+        server closes it. HTTP/1.0 so the body comes unchunked. Returns
+        (status, last event id); the "stream" op times the response head.
+        """
+        lines = ["GET /board/stream/ HTTP/1.0", f"Host: {self.host}:{self.port}", "Accept: text/event-stream"]
+        if last_id is not None:
+            lines.append(f"Last-Event-ID: {last_id}")
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            self.errors[f"stream: {type(e).__name__}"] += 1
+            return None, last_id
+
+        try:
+            writer.write(raw)
+            await writer.drain()
+            head   = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout)
+            status = int(head.split(b" ", 2)[1])
+            self.samples["stream"].append((time.perf_counter() - start) * 1000)
+            self.statuses["stream"][status] += 1
+            if status != 200:
+                return status, last_id
+
+            self.streams["opened"] += 1
+            self.open_streams      += 1
+            self.streams["max_open"] = max(self.streams["max_open"], self.open_streams)
+            try:
+                while (left := deadline - time.monotonic()) > 0:
+                    line = await asyncio.wait_for(reader.readline(), left)
+                    if not line:
+                        break   # server ended the stream (STREAM_LIFETIME)
+                    if line.startswith(b"id: "):
+                        last_id = int(line[4:])
+                        self.streams["events"] += 1
+            except asyncio.TimeoutError:
+                pass            # deadline reached while idle
+            finally:
+                self.open_streams -= 1
+            return status, last_id
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            self.errors[f"stream: {type(e).__name__}"] += 1
+            return None, last_id
+        finally:
+            writer.close()
+
+    # ─────────────────────────────────────────────
+    # CLIENTS
+    # ─────────────────────────────────────────────
+
+    async def spectator(self, deadline):
+        await asyncio.sleep(self.rng.random() * self.interval)   # don't all arrive at once
+        if self.mode == MODE_POLL:
+            await self.poll(deadline)
+            return
+
+        status, head, _ = await self.request("board", "GET", "/")
+        last_id = None
+        while time.monotonic() < deadline:
+            status, last_id = await self.hold_stream(deadline, last_id)
+            if status == 204:
+                self.streams["fallbacks"] += 1
+                await self.poll(deadline, head.get("etag"))
+                return
+            await asyncio.sleep(min(STREAM_RETRY, max(0, deadline - time.monotonic())))
+
+    async def poll(self, deadline, etag=None):
+        while time.monotonic() < deadline:
+            headers = {"If-None-Match": etag} if etag and self.etag else {}
+            status, head, _ = await self.request("board", "GET", "/", headers)
+            if status == 200:
+                etag = head.get("etag", etag)
+            await asyncio.sleep(self.interval * (0.5 + self.rng.random()))
+
+    def op(self, name):
+        """Auctioneer ops from the baseline (no spectators yet) are reported as '<op> idle'."""
+        return name if self.loaded else f"{name} idle"
+
+    async def auctioneer(self, deadline):
+        cookie = {"Cookie": f"sessionid={self.sessionid}"} if self.sessionid else {}
+        while time.monotonic() < deadline:
+            status, _, page = await self.request(self.op("control"), "GET", "/auction/", cookie)
+            if status != 200:
+                self.errors[f"control page: HTTP {status}"] += 1
+                return
+
+            found  = PLAYER_ID.search(page)
+            player = int(found.group(1)) if found else 0
+            if player:
+                teams = [int(t) for t in TEAM_BTN.findall(page)]
+                if teams and self.rng.random() > 0.2:
+                    await self.request(self.op("sell"), "POST", "/auction/sell/", cookie, {
+                        "player_id": player, "team_id": self.rng.choice(teams),
+                        "amount": 100, "force": "true", "extra": "true",
+                    })
+                else:
+                    await self.request(self.op("unsold"), "POST", "/auction/unsold/", cookie, {"player_id": player})
+            elif b"/auction/continue/" in page:
+                await self.request(self.op("continue"), "GET", "/auction/continue/", cookie)
+            else:
+                break   # nothing left to auction; spectators keep going
+
+            await asyncio.sleep(self.sell_interval)
+
+    # ─────────────────────────────────────────────
+    # RUN / REPORT
+    # ─────────────────────────────────────────────
+
+    def run(self):
+        return asyncio.run(self._run())
+
+    async def _run(self):
+        started    = time.perf_counter()
+        connect_at = time.monotonic() + self.baseline
+        deadline   = connect_at + self.duration
+        auctioneer = asyncio.create_task(self.auctioneer(deadline))
+
+        await asyncio.sleep(self.baseline)
+        self.loaded = True
+        await asyncio.gather(*(self.spectator(deadline) for _ in range(self.spectators)))
+        await auctioneer
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        ops = {}
+        for op, times in sorted(self.samples.items()):
+            times   = sorted(times)
+            ops[op] = {
+                "count":    len(times),
+                "per_sec":  round(len(times) / elapsed, 1),
+                "p50_ms":   round(percentile(times, 50), 2),
+                "p95_ms":   round(percentile(times, 95), 2),
+                "p99_ms":   round(percentile(times, 99), 2),
+                "max_ms":   round(times[-1], 2),
+                "statuses": {str(code): n for code, n in sorted(self.statuses[op].items())},
+            }
+
+        # How much the spectators slow the auctioneer down
+        slowdown = {}
+        for op in ("control", "sell", "unsold", "continue"):
+            idle, loaded = ops.get(f"{op} idle"), ops.get(op)
+            if idle and loaded:
+                slowdown[op] = {
+                    "idle_p50_ms":    idle["p50_ms"],
+                    "loaded_p50_ms":  loaded["p50_ms"],
+                    "added_p50_ms":   round(loaded["p50_ms"] - idle["p50_ms"], 2),
+                    "idle_p95_ms":    idle["p95_ms"],
+                    "loaded_p95_ms":  loaded["p95_ms"],
+                    "added_p95_ms":   round(loaded["p95_ms"] - idle["p95_ms"], 2),
+                }
+
+        return {
+            "params": {"spectators": self.spectators, "duration": self.duration, "mode": self.mode,
+                       "baseline": self.baseline, "interval": self.interval,
+                       "sell_interval": self.sell_interval, "etag": self.etag},
+            "ops":      ops,
+            "streams":  dict(self.streams),
+            "slowdown": slowdown,
+            "errors":   dict(self.errors),
+        }
+
+
+class QueryCounter:
+
+    """
+    Counts queries on every DB connection opened while installed, split
+    by the kind of request the current server thread is handling.
+    Wrap the WSGI app with wsgi() so each request tags its thread.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.lock   = threading.Lock()
+        self.local  = threading.local()
+
+    def wsgi(self, app, kind_for_path):
+        def tagged(environ, start_response):
+            self.local.kind = kind_for_path(environ.get("PATH_INFO", ""))
+            return app(environ, start_response)
+        return tagged
+
+    def install(self, sender, connection, **kwargs):
+        # connection_created receiver
+        if self._count not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self._count)
+
+    def _count(self, execute, sql, params, many, context):
+        with self.lock:
+            self.counts[getattr(self.local, "kind", "other")] += 1
+        return execute(sql, params, many, context)
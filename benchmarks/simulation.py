@@ -0,0 +1,163 @@
+import random
+import time
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Count
+
+from auction.models import Player, Team, TournamentConfig, AuctionState
+from auction.services.auction_engine import AuctionEngine
+from auction.services.bidding_service import BiddingService
+
+# Same mix and places as generate_players.py
+ROLE_MIX = ["BAT"] * 60 + ["BOWL"] * 50 + ["AR"] * 40 + ["PLY"] * 50
+PLACES   = ["Bangalore", "Mumbai", "Delhi", "Chennai", "Hyderabad",
+            "Kolkata", "Ahmedabad", "Jaipur", "Lucknow", "Pune",
+            "Mangalore", "Mysore", "Udupi", "Hubli", "Belgaum"]
+
+UNSOLD_CHANCE = 0.25   # main rounds; rebid rounds use half
+UNDO_CHANCE   = 0.03
+REDO_CHANCE   = 0.5    # of undos that are redone straight away
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(1, round(q / 100 * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+class AuctionSimulator:
+
+    """
+    Plays a whole auction day through AuctionEngine and BiddingService:
+    every category, pass 2, rebids, PLY auto-drops, undos and redos.
+    Players left over once every squad is full are marked not playing.
+    Each engine / bidding call is timed and its queries counted.
+    Runs against whatever database is connected — the bench_auction
+    command gives it a throwaway test database.
+    """
+
+    def __init__(self, teams=16, players=200, seed=1):
+        self.teams   = teams
+        self.players = players
+        self.seed    = seed
+        self.rng     = random.Random(seed)
+        self.samples = defaultdict(list)   # op → [(ms, queries)]
+
+    # ─────────────────────────────────────────────
+    # SEED
+    # ─────────────────────────────────────────────
+
+    def seed_data(self):
+        config = TournamentConfig.objects.create()
+        Team.objects.bulk_create(
+            Team(name=f"Team {i}", remaining_points=config.total_points) for i in range(1, self.teams + 1)
+        )
+        roles = [ROLE_MIX[i % len(ROLE_MIX)] for i in range(self.players)]
+        Player.objects.bulk_create((
+            Player(
+                name       = f"Player{i}",
+                role       = role,
+                base_price = config.base_price_for_role(role),
+                phone      = f"9{self.rng.randint(100000000, 999999999)}",
+                place      = self.rng.choice(PLACES),
+            )
+            for i, role in enumerate(roles, start=1)
+        ), batch_size=500)
+
+    # ─────────────────────────────────────────────
+    # RUN
+    # ─────────────────────────────────────────────
+
+    def run(self, max_steps=100_000):
+        self.seed_data()
+        self.engine  = AuctionEngine(rng=self.rng)
+        self.bidding = BiddingService()
+        self.bidding.engine = self.engine
+
+        self.timed("start", self.engine.activate_auction)
+
+        for _ in range(max_steps):
+            state = AuctionState.get()
+            if state.awaiting_transition:
+                self.timed("transition", self.engine.confirm_transition)
+                continue
+
+            player = self.timed("next", self.engine.ensure_current_player)
+            if player is not None:
+                self.play(player, state)
+            elif not AuctionState.get().awaiting_transition:
+                break   # every pool is empty
+
+        return self.report()
+
+    def play(self, player, state):
+        unsold_chance = UNSOLD_CHANCE / (2 if state.phase == AuctionState.PHASE_REBID else 1)
+        team_id       = None if self.rng.random() < unsold_chance else self.pick_team(player, state)
+
+        if team_id is None and self.squads_full():
+            self.timed("not_playing", self.bidding.mark_not_playing, player.pk)
+        elif team_id is None:
+            self.timed("unsold", self.bidding.mark_unsold, player.pk)
+        else:
+            amount = self.engine.config.base_price_for_role(player.role)
+            ok, _, _ = self.timed("sell", self.bidding.sell_player, player.pk, team_id, amount)
+            if not ok:
+                self.timed("sell", self.bidding.sell_player, player.pk, team_id, amount, force=True)
+
+        if self.rng.random() < UNDO_CHANCE:
+            self.timed("undo", self.bidding.undo_last_action)
+            if self.rng.random() < REDO_CHANCE:
+                self.timed("redo", self.bidding.redo_last_undo)
+
+    def pick_team(self, player, state):
+        teams   = list(Team.objects.all())
+        blocked = self.engine.get_blocked_team_ids(state, teams)
+        slots   = self.engine.config.bidding_slots
+        open_   = [t.pk for t in teams if t.pk not in blocked and t.squad_size < slots]
+        return self.rng.choice(open_) if open_ else None
+
+    def squads_full(self):
+        return not Team.objects.filter(squad_size__lt=self.engine.config.bidding_slots).exists()
+
+    def timed(self, op, fn, *args, **kwargs):
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start  = time.perf_counter()
+            result = fn(*args, **kwargs)
+            ms     = (time.perf_counter() - start) * 1000
+        self.samples[op].append((ms, queries[0]))
+        return result
+
+    # ─────────────────────────────────────────────
+    # REPORT
+    # ─────────────────────────────────────────────
+
+    def report(self):
+        ops = {}
+        for op, rows in sorted(self.samples.items()):
+            times   = sorted(ms for ms, _ in rows)
+            queries = [q for _, q in rows]
+            ops[op] = {
+                "count":         len(rows),
+                "p50_ms":        round(percentile(times, 50), 3),
+                "p95_ms":        round(percentile(times, 95), 3),
+                "p99_ms":        round(percentile(times, 99), 3),
+                "max_ms":        round(times[-1], 3),
+                "queries_mean":  round(sum(queries) / len(queries), 2),
+                "queries_max":   max(queries),
+            }
+
+        outcome = dict(Player.objects.order_by().values_list("status").annotate(n=Count("pk")))
+        return {
+            "params":  {"teams": self.teams, "players": self.players, "seed": self.seed},
+            "ops":     ops,
+            "outcome": outcome,
+        }
@@ -1,6 +1,7 @@
 
 from pathlib import Path
 import os
+import django
 import dj_database_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,17 +28,19 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
 'django.middleware.security.SecurityMiddleware',
 'whitenoise.middleware.WhiteNoiseMiddleware',
+'auction.middleware.RequestMetricsMiddleware',
 'django.contrib.sessions.middleware.SessionMiddleware',
 'django.middleware.common.CommonMiddleware',
 'django.middleware.csrf.CsrfViewMiddleware',
 'django.contrib.auth.middleware.AuthenticationMiddleware',
 'django.contrib.messages.middleware.MessageMiddleware',
+'auction.middleware.StateCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [{
-'BACKEND': 'django.template.backends.django.DjangoTemplates',
+'BACKEND': 'auction.utils.metrics.TimedDjangoTemplates',
 'DIRS': [BASE_DIR / 'templates'],
 'APP_DIRS': True,
 'OPTIONS': {'context_processors': [
@@ -58,6 +61,40 @@ DATABASES = {
     )
 }
 
+# SQLite: WAL lets the board keep reading while a command writes, and
+# IMMEDIATE transactions take the write lock at BEGIN so parallel auction
+# commands queue up instead of failing on a lock upgrade (Django 5.1+).
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and django.VERSION >= (5, 1):
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'init_command':     'PRAGMA journal_mode=WAL;',
+        'transaction_mode': 'IMMEDIATE',
+        'timeout':          20,
+    })
+
+# Tests on SQLite use a file DB so the threaded concurrency tests can share
+# it across connections (an in-memory test DB is private to each one).
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', str(BASE_DIR / 'test_db.sqlite3'))
+
+# Rendered board fragments (team cards). Local memory is per process; set
+# CACHE_BACKEND=file so every gunicorn worker shares one on-disk cache.
+if os.environ.get('CACHE_BACKEND', 'locmem') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND':  'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / '.cache')),
+            'OPTIONS':  {'MAX_ENTRIES': 2000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND':  'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'auction',
+            'OPTIONS':  {'MAX_ENTRIES': 2000},
+        }
+    }
+
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
@@ -68,6 +105,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = '/admin/login/'
 
+# Open /board/stream/ connections per process. Each one holds a gthread
+# thread, so keep this well under --threads; boards over the cap poll.
+BOARD_STREAM_LIMIT = int(os.environ.get('BOARD_STREAM_LIMIT', '40'))
+
+# Per-request query / timing windows for /auction/metrics/. Requests at or
+# over either threshold are also logged to logs/system.log (0 logs all).
+REQUEST_METRICS      = os.environ.get('REQUEST_METRICS', 'true').lower() == 'true'
+SLOW_REQUEST_MS      = float(os.environ.get('SLOW_REQUEST_MS', '500'))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', '50'))
+
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 